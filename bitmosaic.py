@@ -31,6 +31,7 @@ from bitmosaic.core.mosaic import Mosaic
 from bitmosaic.core.secret import Recovery
 from bitmosaic.core.secret import Secret
 from bitmosaic.core.secret import Vault
+from bitmosaic.core.serializer import BitmosaicReader
 from bitmosaic.drawing.color import HtmlColor
 from bitmosaic.drawing.color import Palette
 from bitmosaic.drawing.image import Bitmosaic
@@ -60,6 +61,11 @@ palette = Palette.sample()
 image = None
 
 eel.init("bitmosaic/gui")
+try:
+    Bitmosaic.warm_fonts()
+except OSError:
+    # Without the font file the bitmosaic can't be created, the error is reported when creating it
+    pass
 
 
 def __color_from_str(value):
@@ -402,17 +408,18 @@ def recover_secret_from_file(bitmosaic_txt: str, recovery_txt: str):
                "You have to select the bitmosaic txt file and recovery txt file.\r" \
                "The file location must be: app directory -> data -> output", None
     try:
-        data = util.read_txt_file(bitmosaic_file)
         recovery = Recovery.create_from_file(recovery_txt)
         if not recovery.is_complete():
             return ErrorCodes.recovery_info_incomplete.value, "The recovery information is not complete", None
 
-        mosaic = Mosaic.from_recovery(data, recovery)
-        result = (ErrorCodes.no_error, " ".join(mosaic.recover_secret(recovery).data), None)
+        with BitmosaicReader(bitmosaic_file) as reader:
+            result = (ErrorCodes.no_error, " ".join(Mosaic.recover_from_records(reader, recovery).data), None)
     except ValueException as e:
         result = (e.error_code, e.message)
+    except FileException as e:
+        result = (e.error_code.value, e.message, None)
     except IOError:
-        result = (ErrorCodes.file_read, "Error reading bitmosaic txt file", None)
+        result = (ErrorCodes.file_error.value, "Error reading bitmosaic txt file", None)
     return result
 
 
@@ -421,10 +428,6 @@ def recover_secret_from_form(bitmosaic_txt: str, cols: str, rows: str, col: str,
     bitmosaic_file = util.get_output_directory(bitmosaic_txt)
     if not __exist_file(bitmosaic_file):
         return ErrorCodes.recovery_info_incomplete, "You have to select the bitmosaic txt file", None
-    try:
-        data = util.read_txt_file(bitmosaic_file)
-    except IOError:
-        return ErrorCodes.file_read, "Error reading bitmosaic txt file", None
     if components != '':
         try:
             components = V2Component.components_from_string(components)
@@ -449,10 +452,14 @@ def recover_secret_from_form(bitmosaic_txt: str, cols: str, rows: str, col: str,
     try:
         recovery = Recovery(name="Recovery", origin=origin, v2_components=components,
                             cols=cols, rows=rows, length=length)
-        mosaic = Mosaic.from_recovery(data, recovery)
-        result = (ErrorCodes.no_error, mosaic.recover_secret(recovery).data, None)
+        with BitmosaicReader(bitmosaic_file) as reader:
+            result = (ErrorCodes.no_error, Mosaic.recover_from_records(reader, recovery).data, None)
     except ValueException as e:
         result = (e.error_code, e.message)
+    except FileException as e:
+        result = (e.error_code.value, e.message, None)
+    except IOError:
+        result = (ErrorCodes.file_error.value, "Error reading bitmosaic txt file", None)
     return result
 
 
@@ -22,12 +22,50 @@ import re
 import time
 import unicodedata
 import bitmosaic.util as util
+from concurrent.futures import ProcessPoolExecutor
 from xeger import Xeger
 from bitmosaic.exception import ErrorCodes
 from bitmosaic.exception import FileException
 from bitmosaic.exception import ValueException
 
 
+_wordlists = {}
+
+
+def load_wordlist(file_path: str) -> ([str], set):
+    """
+    Returns the words of the file and the set with their NFD normalized forms.
+
+    The parsed wordlists are kept in a process wide cache, keyed by the file path and validated with the file's
+    modification time and size, so the domains built from the same file share the same lists.
+
+    :param str file_path: the complete path of the wordlist file.
+    :raises FileException: if there is some error while reading the file content.
+    :return: ([str], set)
+    """
+    try:
+        stat = os.stat(file_path)
+        cached = _wordlists.get(file_path)
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1], cached[2]
+        with open(file_path, "r", encoding="utf-8") as data_file:
+            data = data_file.read().split("\n")
+    except Exception:
+        raise FileException(ErrorCodes.file_error, "There was a problem reading the data domain file(s)")
+    index = {unicodedata.normalize("NFD", item) for item in data}
+    _wordlists[file_path] = ((stat.st_mtime_ns, stat.st_size), data, index)
+    return data, index
+
+
+def clear_wordlist_cache():
+    """
+    Removes all the wordlists from the cache.
+
+    :return: None
+    """
+    _wordlists.clear()
+
+
 class DataDomain(abc.ABC):
 
     """
@@ -45,6 +83,9 @@ class DataDomain(abc.ABC):
         returns a random value from data
         if 0
 
+    contains_all(items: [str]) -> bool
+        returns if all the items are in the data domain
+
     """
 
     @property
@@ -65,6 +106,15 @@ class DataDomain(abc.ABC):
     def random(self, count: int, max_length: int) -> [str]:
         pass
 
+    def contains_all(self, items: [str]) -> bool:
+        """
+        Checks if all the items are in the data domain.
+
+        :param [str] items: the strings to check.
+        :return: bool
+        """
+        return all(self.contains(item) for item in set(items))
+
 
 class DictionaryDomain(DataDomain):
 
@@ -135,6 +185,7 @@ class DictionaryDomain(DataDomain):
         if not os.path.exists(self._file_path):
             raise FileException(self._file_name, "The file {0} does not exist".format(self._file_name))
         self._data = []
+        self._index = set()
         try:
             self.__load_data()
         except FileException as e:
@@ -157,28 +208,23 @@ class DictionaryDomain(DataDomain):
 
     def __load_data(self):
         """
-        Loads the data from the file into the data list.
+        Loads the data from the file into the data list and the index with the NFD normalized items.
+
+        The lists are shared with the other domains built from the same file, so they must not be modified.
 
         :raises FileException: if there is some error while reading the file content.
         :return: None
         """
-        try:
-            with open(self._file_path, "r", encoding="utf-8") as data_file:
-                self._data = data_file.read().split("\n")
-        except Exception:
-            raise FileException(ErrorCodes.file_error, "There was a problem reading the data domain file(s)")
+        self._data, self._index = load_wordlist(str(self._file_path))
 
     def contains(self, item: str) -> bool:
         """
-        Checks if the item is in list.
+        Checks if the item is in list. The comparison is made between the NFD normalized forms.
 
         :param str item: the string to find.
         :return: bool
         """
-        for data in self._data:
-            if unicodedata.normalize("NFD", data) == unicodedata.normalize("NFD", item):
-                return True
-        return False
+        return unicodedata.normalize("NFD", item) in self._index
 
     def random(self, count=1, max_length=0) -> [str]:
         """
@@ -197,19 +243,36 @@ class DictionaryDomain(DataDomain):
         return random.choices(valid, k=count)
 
 
+def _generate_regex_items(regex: str, count: int, max_length: int) -> [str]:
+    """
+    Generates count random strings that match the regex. Used by the worker processes of RegexDomain.
+
+    :param str regex: the regular expression.
+    :param int count: the number of strings.
+    :param int max_length: the maximum length for the repetitions in the regex.
+    :return: [str]
+    """
+    generator = Xeger(limit=max_length)
+    pattern = re.compile(regex)
+    return [generator.xeger(pattern) for _ in range(count)]
+
+
 class RegexDomain(DataDomain):
 
     """
     This class uses a regex as data domain.
     Conforms the DataDomain protocol.
 
+    The regex is compiled once and a generator is kept for each max_length, so generating items doesn't rebuild
+    them for every string.
+
     Properties:
     -----------
     hash : str
         read only property that return the object's hash.
 
     data : [str]
-        read only property that returns the data as list of strings.
+        read only property that returns the data as list of strings. The data is generated on the first access.
 
     regex : str
         the regular expression as string.
@@ -220,10 +283,11 @@ class RegexDomain(DataDomain):
     contains(item: str)
         Returns if the item match the regex.
 
-    random(count: int, max_length: int)
+    random(count: int, max_length: int, processes: int)
         Returns a list with random items.
         The count parameter indicates the length of the list.
         The maximum length of each item can be limited by the max_length parameter.
+        The items can be generated by several worker processes.
 
     """
 
@@ -237,7 +301,9 @@ class RegexDomain(DataDomain):
 
     @property
     def data(self) -> [str]:
-        return self.random()
+        if self._data is None:
+            self._data = self.random()
+        return self._data
 
     @property
     def regex(self) -> str:
@@ -250,10 +316,12 @@ class RegexDomain(DataDomain):
         """
         self._name = regex
         try:
-            re.compile(regex)
+            self._pattern = re.compile(regex)
             self._regex = regex
         except re.error:
             raise ValueException(regex, re.error.msg)
+        self._generators = {}
+        self._data = None
 
     def __eq__(self, other: DataDomain):
         return type(other) == RegexDomain and self._regex == other.regex
@@ -274,31 +342,46 @@ class RegexDomain(DataDomain):
         :param str item: the string to check.
         :return: bool
         """
-        return not re.match(self._regex, item) is None
+        return self._pattern.match(item) is not None
 
-    def __random(self, max_length=5) -> str:
+    def __generator(self, max_length=5) -> Xeger:
         """
-        Returns a random item from the data list.
+        Returns the generator for the max_length, creating it the first time.
 
         :param int max_length: the maximum length for the strings returned.
-        :return: str
+        :raises ValueException: if max_length is not greater than 0
+        :return: Xeger
         """
         if max_length <= 0:
             raise ValueException(max_length, "max_length must be greater than 0")
-        x = Xeger(limit=max_length)
-        return x.xeger(self._regex)
+        generator = self._generators.get(max_length)
+        if generator is None:
+            generator = Xeger(limit=max_length)
+            self._generators[max_length] = generator
+        return generator
 
-    def random(self, count=1, max_length=5) -> [str]:
+    def random(self, count=1, max_length=5, processes=1) -> [str]:
         """
         Returns a random list of items from the data list.
 
         :param int count: the number of items.
         :param int max_length: the maximum length for the strings returned.
+        :param int processes: the number of worker processes used to generate the items, 1 to generate them in
+            the current process.
         :return: [str]
         """
+        generator = self.__generator(max_length)
+        if count <= 0:
+            return []
+        if processes <= 1 or count < processes:
+            return [generator.xeger(self._pattern) for _ in range(count)]
+
+        chunks = [count // processes + (1 if index < count % processes else 0) for index in range(processes)]
         items = []
-        while len(items) < count:
-            items.append(self.__random(max_length))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for chunk in executor.map(_generate_regex_items, [self._regex] * processes, chunks,
+                                      [max_length] * processes):
+                items.extend(chunk)
         return items
 
 
@@ -319,6 +402,14 @@ class Domain(DataDomain):
 
     data : [str]
         returns the items for the domain
+
+    Methods
+    -------
+    contains(item: str) -> bool
+        returns if the item is in the generated data or in any of the domains
+
+    contains_all(items: [str]) -> bool
+        returns if all the items are in the generated data or in any of the domains
     """
 
     @property
@@ -340,6 +431,7 @@ class Domain(DataDomain):
     def __init__(self):
         self._domains = []
         self._data = []
+        self._index = set()
 
     def __len__(self) -> int:
         return len(self._data)
@@ -402,25 +494,43 @@ class Domain(DataDomain):
             random_items = data_domain.random(count=number_of_items)
             self._data.extend(random_items)
         random.shuffle(self._data)
+        self._index = set(self._data)
         self._time = time.time() - start_time
 
     def contains(self, item: str) -> bool:
         """
-        Checks if the item is in _data list.
+        Checks if the item is in _data list or in any of the domains.
 
         :param str item: the string to check.
         :return: bool
         """
-        if self._data.__contains__(item):
-            return True
-        else:
-            for domain in self._domains:
-                if type(domain) is RegexDomain and domain.contains(item):
-                    return True
-                elif type(domain) is not RegexDomain:
-                    if domain.contains(item):
-                        return True
-        return False
+        return self.contains_all([item])
+
+    def contains_all(self, items: [str]) -> bool:
+        """
+        Checks if all the items are in _data list or in any of the domains.
+
+        The items are looked up in the index of the generated data first, then in the dictionary domains and
+        finally matched against the regex domains.
+
+        :param [str] items: the strings to check.
+        :return: bool
+        """
+        pending = [item for item in set(items) if item not in self._index]
+        for domain in self.__lookup_order():
+            if len(pending) == 0:
+                break
+            pending = [item for item in pending if not domain.contains(item)]
+        return len(pending) == 0
+
+    def __lookup_order(self) -> [DataDomain]:
+        """
+        Returns the domains with the regex domains at the end, as matching a regex is slower than a lookup.
+
+        :return: [DataDomain]
+        """
+        return ([domain for domain in self._domains if type(domain) is not RegexDomain] +
+                [domain for domain in self._domains if type(domain) is RegexDomain])
 
     def random(self, count: int, max_length=0) -> [str]:
         """
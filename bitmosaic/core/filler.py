@@ -21,6 +21,7 @@ import random
 import bitmosaic.util as util
 from PIL import Image
 from bitmosaic.drawing.color import Color
+from bitmosaic.drawing.color import ColorRaster
 from bitmosaic.drawing.color import Palette
 from bitmosaic.drawing.color import RGBAColor
 from bitmosaic.exception import FileException
@@ -31,6 +32,66 @@ from bitmosaic.exception import NoImageSelectedException
 # from bitmosaic.core.mosaic import Tessera
 
 
+_resized_images = {}
+
+
+def load_resized_image(image_path, cols: int, rows: int, valid_formats: tuple) -> (int, int, bytes):
+    """
+    Returns the size the image is resized to and the rgb values of its pixels, 3 bytes per pixel.
+
+    The image is resized to cols pixels wide, or rows pixels high for portrait images, keeping its aspect ratio. The
+    large images are downscaled while they are decoded (draft for JPEG, reduce for the rest) down to 8 pixels per
+    resized pixel, before the bilinear resize. The images in other modes than L, RGB and RGBA (palette or bilevel
+    images, like the GIF ones) are converted to rgb first, since they can't be reduced.
+
+    The resized images are kept in a process wide cache, keyed by the file path and the size and validated with the
+    file's modification time and size, so the fillers built from the same picture don't decode it again.
+
+    :param image_path: the path of the image file.
+    :param int cols: the number of cols.
+    :param int rows: the number of rows.
+    :param tuple valid_formats: the image formats accepted.
+    :raises InvalidFormatException: if the image format is not valid.
+    :raises FileException: if there is some error while reading the image.
+    :return: (int, int, bytes)
+    """
+    try:
+        stat = os.stat(image_path)
+        cached = _resized_images.get((str(image_path), cols, rows))
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+
+        image = Image.open(image_path)
+        if image.format not in valid_formats:
+            extension = os.path.splitext(image_path)[1]
+            raise InvalidFormatException(extension, "The image format is not valid")
+
+        width, height = image.size
+        resized_cols = round(width / (width / cols)) if width >= height else round(width / (height / rows))
+        resized_rows = round(height / (width / cols)) if width >= height else round(height / (height / rows))
+        image.draft("RGB", (resized_cols * 8, resized_rows * 8))
+        if image.mode not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGB")
+        factor = min(image.width // (resized_cols * 8), image.height // (resized_rows * 8))
+        if factor > 1:
+            image = image.reduce(factor)
+        pixels = image.resize((resized_cols, resized_rows), Image.BILINEAR).convert("RGB").tobytes()
+    except (IOError, ValueError):
+        raise FileException(image_path, "There was a problem with the image file")
+    result = (resized_cols, resized_rows, pixels)
+    _resized_images[(str(image_path), cols, rows)] = ((stat.st_mtime_ns, stat.st_size), result)
+    return result
+
+
+def clear_resized_image_cache():
+    """
+    Removes all the resized images from the cache.
+
+    :return: None
+    """
+    _resized_images.clear()
+
+
 class MatrixFiller(abc.ABC):
     """
     Filler interface.
@@ -86,6 +147,9 @@ class ColorFiller(MatrixFiller):
     get_item() -> object
         returns a random RGBAColor as value for matrix initialization
 
+    fill(raster: ColorRaster)
+        sets the colors of all the cells in the raster
+
     """
 
     @property
@@ -114,6 +178,15 @@ class ColorFiller(MatrixFiller):
         """
         return RGBAColor.random()
 
+    def fill(self, raster: ColorRaster):
+        """
+        Sets the colors of all the cells in the raster, one by one with get_item.
+
+        :param ColorRaster raster: the raster to fill
+        """
+        for index in range(len(raster)):
+            raster.set_color(index, self.get_item((index % raster.cols, index // raster.cols)))
+
 
 class PaletteFiller(ColorFiller):
     """
@@ -132,6 +205,12 @@ class PaletteFiller(ColorFiller):
     get_item() -> object
         returns a random RGBAColor from the palette
 
+    fill(raster: ColorRaster)
+        sets a random color from the palette in all the cells of the raster
+
+    random_indexes(count: int) -> bytes
+        returns count random indexes of the palette colors
+
     """
 
     def __init__(self, cols: int, rows: int, palette=Palette.sample()):
@@ -151,6 +230,46 @@ class PaletteFiller(ColorFiller):
         """
         return self._palette.random()
 
+    def fill(self, raster: ColorRaster):
+        """
+        Overrides parent fill().
+
+        Picks the random palette colors for all the cells at once. The raster keeps the palette index of each cell
+        when the palette has up to 256 colors.
+
+        :param ColorRaster raster: the raster to fill
+        """
+        colors = self._palette.colors
+        contrast_values = [color.contrasted_color().tuple()[0] for color in colors]
+        if len(colors) > 256:
+            rgb_values = [bytes(color.tuple()) for color in colors]
+            indexes = random.choices(range(len(colors)), k=len(raster))
+            raster.fill(b"".join([rgb_values[index] for index in indexes]),
+                        bytes([contrast_values[index] for index in indexes]))
+            return
+        raster.fill_indexed(self.random_indexes(len(raster)), [color.tuple() for color in colors],
+                            bytes(contrast_values))
+
+    def random_indexes(self, count: int) -> bytes:
+        """
+        Returns count random indexes of the palette colors, 1 byte per index. The palette can't have more than 256
+        colors.
+
+        The indexes are taken from random bytes: the bytes over the largest multiple of the number of colors are
+        discarded, so all the colors have the same probability, and the rest are mapped to their modulo.
+
+        :param int count: the number of indexes
+        :return: bytes
+        """
+        number = len(self._palette.colors)
+        modulo = bytes(value % number for value in range(256))
+        discarded = bytes(range(256 - 256 % number, 256))
+        indexes = bytearray()
+        while len(indexes) < count:
+            missing = count - len(indexes) + count // 8 + 16
+            indexes += random.getrandbits(missing * 8).to_bytes(missing, "little").translate(modulo, discarded)
+        return bytes(indexes[:count])
+
 
 class ImageFiller(ColorFiller):
     """
@@ -169,6 +288,9 @@ class ImageFiller(ColorFiller):
     get_item() -> object
         returns a random HtmlColor as value for matrix initialization
 
+    fill(raster: ColorRaster)
+        copies the pixels of the resized image into the raster
+
     """
 
     __valid_image_formats = ("GIF", "JPEG", "PNG")
@@ -181,30 +303,14 @@ class ImageFiller(ColorFiller):
         """
         super().__init__(name="ImageFiller", cols=cols, rows=rows)
         self._image_path = util.get_image_input_directory(image_name)
-        self._resized_image = None
+        self._pixels = None
         self.__resize_image()
 
     def __resize_image(self):
         if self._image_path is None:
             raise NoImageSelectedException("No image was selected")
-        try:
-            image = Image.open(self._image_path)
-            if image.format not in self.__valid_image_formats:
-                extension = os.path.splitext(self._image_path)[1]
-                raise InvalidFormatException(extension, "The image format is not valid")
-
-            width, height = image.size
-            cols = width / self._cols
-            rows = height / self._rows
-            if width >= height:
-                self._cols = round(width / cols)
-                self._rows = round(height / cols)
-            else:
-                self._rows = round(height / rows)
-                self._cols = round(width / rows)
-            self._resized_image = image.resize((self._cols, self._rows), Image.BILINEAR)
-        except IOError:
-            raise FileException(self._image_path, "There was a problem with the image file")
+        self._cols, self._rows, self._pixels = load_resized_image(self._image_path, self._cols, self._rows,
+                                                                  self.__valid_image_formats)
 
     def get_item(self, point: tuple = None) -> Color:
         """
@@ -219,13 +325,26 @@ class ImageFiller(ColorFiller):
         if point is None:
             return RGBAColor.random()
 
-        if self._resized_image is not None:
-            pixel = self._resized_image.getpixel(point)
-            color = RGBAColor(pixel[0], pixel[1], pixel[2])
+        if self._pixels is not None:
+            index = (point[1] * self._cols + point[0]) * 3
+            color = RGBAColor(self._pixels[index], self._pixels[index + 1], self._pixels[index + 2])
         else:
             color = RGBAColor(255, 153, 0)
         return color
 
+    def fill(self, raster: ColorRaster):
+        """
+        Overrides parent fill().
+
+        Copies all the pixels of the resized image into the raster at once.
+
+        :param ColorRaster raster: the raster to fill
+        """
+        if self._pixels is None:
+            super().fill(raster)
+            return
+        raster.fill(self._pixels)
+
 
 class RecoveryFiller(MatrixFiller):
     """
@@ -19,6 +19,7 @@
 import random
 import re
 import secrets
+from array import array
 from copy import deepcopy
 from bitmosaic.core.filler import MatrixFiller
 from bitmosaic.exception import ErrorCodes
@@ -56,6 +57,8 @@ class Point:
 
     """
 
+    __slots__ = ("_x", "_y")
+
     @property
     def x(self) -> int:
         return self._x
@@ -73,10 +76,10 @@ class Point:
         self._y = y
 
     def __add__(self, other):
-        return Point(self._x + other.x, self.y + other.y)
+        return Point(self._x + other.x, self._y + other.y)
 
     def __sub__(self, other):
-        return Point(self._x - other.x, self.y - other.y)
+        return Point(self._x - other.x, self._y - other.y)
 
     def __le__(self, other):
         return self._x <= other.x and self._y <= other.y
@@ -88,11 +91,14 @@ class Point:
         return self._x >= other.x and self._y >= other.y
 
     def __gt__(self, other):
-        return self._x > other.x and self.y > other.y
+        return self._x > other.x and self._y > other.y
 
     def __eq__(self, other):
         return self._x == other.x and self._y == other.y
 
+    def __hash__(self):
+        return hash((self._x, self._y))
+
     def __ne__(self, other):
         return not self.__eq__(other)
 
@@ -103,7 +109,7 @@ class Point:
         return "({0}, {1})".format(self._x, self._y)
 
     def tuple(self):
-        return self.x, self.y
+        return self._x, self._y
 
     @classmethod
     def zero(cls) -> 'Point':
@@ -152,6 +158,9 @@ class V2Component:
     random_fake_component() -> V2Component
         Returns a random V2Component from the __fake_components list
 
+    random_fake_components(count: int) -> [V2Component]
+        Returns a list of count random V2Component from the __fake_components list
+
     components_from_string(text: str) -> {V2Component}
         Return a set of V2Component from a given string
     """
@@ -228,6 +237,16 @@ class V2Component:
             cls.__init_fake_components()
         return random.choice(cls.__fake_components)
 
+    @classmethod
+    def random_fake_components(cls, count: int) -> ['V2Component']:
+        """Returns a list of random fake components from the __fake_components private list
+        :param int count: the number of components
+        :return: [V2Component]
+        """
+        if len(cls.__fake_components) == 0:
+            cls.__init_fake_components()
+        return random.choices(cls.__fake_components, k=count)
+
     @classmethod
     def components_from_string(cls, text: str) -> set:
         """
@@ -325,6 +344,78 @@ class V2Point:
         return cls(V2Component.random_fake_component(), V2Component.random_fake_component())
 
 
+class EmptyCells:
+
+    """This class keeps track of the empty cells of a matrix, identified by their flat index (row * cols + col).
+
+    It combines an occupancy map, an array with the empty indexes and a map with the position of each index in that
+    array, so checking, adding, removing and picking a random empty cell are O(1) operations.
+
+
+    Methods
+    -------
+
+    add(index: int)
+        Marks the cell at index as empty
+
+    discard(index: int)
+        Marks the cell at index as not empty
+
+    random() -> int
+        Returns the index of a random empty cell, or None if there are no empty cells
+
+    """
+
+    def __init__(self, size: int):
+        """
+        :param int size: the number of cells
+        """
+        self._empty = bytearray(size)
+        self._cells = array("l")
+        self._positions = array("l", [-1]) * size
+
+    def __contains__(self, index: int) -> bool:
+        return self._empty[index] == 1
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def add(self, index: int):
+        """Marks the cell at index as empty
+        :param int index: the flat index of the cell
+        """
+        if self._empty[index]:
+            return
+        self._empty[index] = 1
+        self._positions[index] = len(self._cells)
+        self._cells.append(index)
+
+    def discard(self, index: int):
+        """Marks the cell at index as not empty. The last empty index takes the place of the removed one.
+        :param int index: the flat index of the cell
+        """
+        if not self._empty[index]:
+            return
+        position = self._positions[index]
+        last = self._cells.pop()
+        if last != index:
+            self._cells[position] = last
+            self._positions[last] = position
+        self._positions[index] = -1
+        self._empty[index] = 0
+
+    def random(self) -> int:
+        """Returns the index of a random empty cell
+        :return: int
+        """
+        if len(self._cells) == 0:
+            return None
+        return self._cells[random.randrange(len(self._cells))]
+
+
 class Matrix:
 
     """This class defines a Matrix, the object where the data will be stored.
@@ -337,6 +428,8 @@ class Matrix:
         the number of cols in the matrix
     rows : int
         the number of rows in the matrix
+    empty_count : int
+        the number of cells in the matrix which content is not set
 
 
     Methods
@@ -354,6 +447,33 @@ class Matrix:
     remove_element(element: object)
         Removes the element from the matrix, if found
 
+    get_at(x: int, y: int) -> object
+        Returns the content at the x and y coordinates, without creating a Point
+
+    get_flat(index: int) -> object
+        Returns the content at the flat index
+
+    set_flat(item: object, index: int, replace: bool)
+        Sets the item at the flat index
+
+    empty_indexes() -> [int]
+        Returns the flat indexes of the cells which content is not set, in ascending order
+
+    iter_row(y: int)
+        Iterates over the content of the row y
+
+    iter_rows()
+        Iterates over the rows of the matrix, each one as a list
+
+    is_empty(point: Point) -> bool
+        Returns True if the content at point is not set
+
+    is_empty_at(x: int, y: int) -> bool
+        Returns True if the content at the x and y coordinates is not set
+
+    flat_index(point: Point) -> int
+        Returns the index of the normalized point in the flat storage (row * cols + col)
+
     normalize_point(point: Point) -> Point
         Returns a point with each component in the range of matrix indexes. Example,
         for a 4x4 matrix -> Point(5, 5) === Point(1, 1)
@@ -379,12 +499,16 @@ class Matrix:
     def rows(self) -> int:
         return self._rows
 
+    @property
+    def empty_count(self) -> int:
+        return len(self.__empty)
+
     def __init__(self, cols: int, rows: int, filler: MatrixFiller):
         """
         :param cols: the number of cols for the matrix
         :param rows: the number of rows for the matrix
         """
-        self.__empty = []
+        self.__empty = EmptyCells(cols * rows)
         self._cols = cols
         self._rows = rows
         self._matrix = []
@@ -412,46 +536,95 @@ class Matrix:
         if self._rows != other.rows or self._cols != other.cols:
             return False
 
-        for y in range(self._rows):
-            for x in range(self._cols):
-                if self.get_element(Point(x, y)) != other.get_element(Point(x, y)):
-                    return False
+        for index in range(len(self)):
+            if self.get_flat(index) != other.get_flat(index):
+                return False
         return True
 
     def __str__(self):
         result = ""
-        for y in range(0, self._rows):
-            for x in range(0, self._cols):
-                result += "{0}".format(self._matrix[y][x])
+        for index in range(len(self)):
+            result += "{0}".format(self._get(index))
         return result
 
     def __repr__(self):
         result = ""
         for y in range(0, self._rows):
             for x in range(0, self._cols):
-                result += "{0} | ".format(self._matrix[y][x])
+                result += "{0} | ".format(self._get(y * self._cols + x))
             result += "\n"
         return "Matrix {0}".format(result)
 
     def _create_matrix(self):
-        """Creates a new matrix with the number of rows and cols, filled with None"""
+        """Creates a new matrix with the number of rows and cols, filled with the filler items"""
+        self._allocate()
         for r in range(self._rows):
-            row = []
             for c in range(self._cols):
-                item = self._filler.get_item(Point(c, r).tuple())
-                row.append(item)
+                item = self._filler.get_item((c, r))
                 if item is None:
-                    self.__empty.append(Point(c, r))
-            self._matrix.append(row)
+                    self.__empty.add(r * self._cols + c)
+                else:
+                    self._put(r * self._cols + c, item)
+
+    def _allocate(self):
+        """Allocates the storage for the matrix items, with every item set to None"""
+        self._matrix = [None] * (self._cols * self._rows)
+
+    def _get(self, index: int) -> object:
+        """Returns the item stored at the flat index
+        :param int index: the flat index
+        :return: object
+        """
+        return self._matrix[index]
+
+    def _put(self, index: int, item: object):
+        """Stores the item at the flat index
+        :param int index: the flat index
+        :param object item: the item to store
+        """
+        self._matrix[index] = item
+
+    def flat_index(self, point: Point) -> int:
+        """Returns the index of the normalized point in the flat storage (row * cols + col)
+        :param Point point: the point
+        :return: int
+        """
+        return (point.y % self._rows) * self._cols + point.x % self._cols
 
     def get_item(self, point: Point) -> object:
         """Gets the content of the point in the matrix
         :param Point point: the point to get the element
         :return: object
         """
-        point = self.normalize_point(point)
-        item = self._matrix[point.y][point.x]
-        return item
+        return self._get(self.flat_index(point))
+
+    def get_at(self, x: int, y: int) -> object:
+        """Gets the content at the x and y coordinates in the matrix
+        :param int x: the x coordinate (col)
+        :param int y: the y coordinate (row)
+        :return: object
+        """
+        return self._get((y % self._rows) * self._cols + x % self._cols)
+
+    def get_flat(self, index: int) -> object:
+        """Gets the content at the flat index (row * cols + col) in the matrix
+        :param int index: the flat index
+        :return: object
+        """
+        return self._get(index)
+
+    def iter_row(self, y: int):
+        """Iterates over the content of a row
+        :param int y: the row
+        """
+        start = (y % self._rows) * self._cols
+        for index in range(start, start + self._cols):
+            yield self._get(index)
+
+    def iter_rows(self):
+        """Iterates over the rows of the matrix, each one as a list"""
+        for y in range(self._rows):
+            yield list(self.iter_row(y))
 
     def set_item(self, item: object, point: Point, replace=False):
         """Sets the item at the point in matrix
@@ -459,23 +632,59 @@ class Matrix:
         :param Point point: the point where the element should be located
         :param bool replace: to force replace the content in point
         """
-        point = self.normalize_point(point)
+        self.set_flat(item, self.flat_index(point), replace)
+
+    def set_flat(self, item: object, index: int, replace=False):
+        """Sets the item at the flat index (row * cols + col) in matrix
+        :param object item: the element we want to set in matrix
+        :param int index: the flat index where the element should be located
+        :param bool replace: to force replace the content at index
+        """
+        if not replace and index not in self.__empty:
+            return
+        self.__empty.discard(index)
+        self._put(index, item)
+
+    def empty_indexes(self) -> [int]:
+        """Returns the flat indexes of the cells which content is not set, in ascending order
+        :return: [int]
+        """
+        return sorted(self.__empty)
 
-        if not replace and point not in self.__empty:
+    def _mark_filled(self, indexes: [int]):
+        """Marks the cells at the flat indexes as not empty, for subclasses that store items in bulk
+        :param [int] indexes: the flat indexes of the cells
+        """
+        if len(indexes) == len(self.__empty) and all(index in self.__empty for index in indexes):
+            self.__empty = EmptyCells(len(self))
             return
-        if point in self.__empty:
-            self.__empty.remove(point)
-        self._matrix[point.y][point.x] = item
+        for index in indexes:
+            self.__empty.discard(index)
 
     def remove_item(self, point: Point):
         """Removes the element at point from the matrix
         :param Point point: the point where the element should be removed
         """
-        point = self.normalize_point(point)
-        if point in self.__empty:
+        index = self.flat_index(point)
+        if index in self.__empty:
             return
-        self._matrix[point.y][point.x] = None
-        self.__empty.append(point)
+        self._put(index, None)
+        self.__empty.add(index)
+
+    def is_empty(self, point: Point) -> bool:
+        """Checks if the content at point is not set
+        :param Point point: the point to check
+        :return: bool
+        """
+        return self.flat_index(point) in self.__empty
+
+    def is_empty_at(self, x: int, y: int) -> bool:
+        """Checks if the content at the x and y coordinates is not set
+        :param int x: the x coordinate (col)
+        :param int y: the y coordinate (row)
+        :return: bool
+        """
+        return (y % self._rows) * self._cols + x % self._cols in self.__empty
 
     def normalize_point(self, point: Point) -> Point:
         """Returns a point with each component in the range of matrix indexes.
@@ -502,6 +711,7 @@ class Matrix:
         if not empty_point:
             return Point(secrets.randbelow(self._cols), secrets.randbelow(self._rows))
         else:
-            if len(self.__empty) == 0:
+            index = self.__empty.random()
+            if index is None:
                 return None
-            return random.choice(self.__empty)
+            return Point(index % self._cols, index // self._cols)
@@ -16,8 +16,11 @@
 # along with Bitmosaic. If not, see <https://www.gnu.org/licenses/>.
 
 
+import itertools
 import random
 import secrets
+import string
+from array import array
 from bitmosaic.core.data_domain import Domain
 from bitmosaic.core.filler import ColorFiller
 from bitmosaic.core.filler import PaletteFiller
@@ -28,14 +31,15 @@ from bitmosaic.core.matrix import Matrix
 from bitmosaic.core.matrix import Point
 from bitmosaic.core.matrix import V2Point
 from bitmosaic.core.matrix import V2Component
+from bitmosaic.core.planner import PlacementEngine
 from bitmosaic.core.secret import Secret
 from bitmosaic.core.secret import Vault
 from bitmosaic.core.secret import Recovery
 from bitmosaic.drawing.color import Color
+from bitmosaic.drawing.color import ColorRaster
 from bitmosaic.exception import ErrorCodes
 from bitmosaic.exception import IncompleteSecretException
 from bitmosaic.exception import InvalidComponentException
-from bitmosaic.exception import MosaicItemCollisionException
 from bitmosaic.exception import ValueException
 
 
@@ -165,6 +169,239 @@ class Tessera:
         return cls(point, secret, V2Point(first_component, second_component))
 
 
+class TesseraView(Tessera):
+    """
+    A tessera read from a TesseraMatrix. The matrix doesn't store Tessera objects, so setting the data or the
+    v2_point of a view writes them through to the cell it was read from, in the same way as changing a Tessera stored
+    in a Matrix changes the matrix. Nothing is written if the cell has been emptied since.
+
+    Properties
+    ----------
+
+    matrix : TesseraMatrix
+        The matrix the tessera was read from
+
+    index : int
+        The flat index of the tessera's cell in the matrix
+
+    """
+
+    @property
+    def matrix(self) -> 'TesseraMatrix':
+        return self._matrix
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @Tessera.data.setter
+    def data(self, value: str):
+        self._data = value
+        self.__write_through()
+
+    @Tessera.v2_point.setter
+    def v2_point(self, value: V2Point):
+        self._v2_point = value
+        self.__write_through()
+
+    def __init__(self, matrix: 'TesseraMatrix', index: int, position: Point, data: str, v2_point: V2Point):
+        """
+        :param TesseraMatrix matrix: the matrix the tessera was read from
+        :param int index: the flat index of the tessera's cell
+        :param Point position: the position in the mosaic
+        :param str data: the data
+        :param V2Point v2_point: the point to get the next tessera
+        """
+        super().__init__(position, data, v2_point)
+        self._matrix = matrix
+        self._index = index
+
+    def __write_through(self):
+        """Stores the tessera's data and v2_point in its cell of the matrix, if the cell is not empty"""
+        if self._matrix.data_at(self._index) is not None:
+            self._matrix._put(self._index, self)
+
+
+class TesseraMatrix(Matrix):
+    """
+    A matrix that stores tesserae as columns of arrays instead of one Tessera object per cell.
+
+    For each cell it stores:
+        - The index of its data in a table of distinct words (-1 when the cell is empty)
+        - The labels of its V2Point, packed in a single code
+        - The values of its V2Point components
+
+    Tessera objects are only created when a cell is read with get_item. They are TesseraView objects, so setting
+    their data or their v2_point still changes the matrix.
+
+    Methods
+    -------
+
+    data_at(index: int) -> str
+        returns the data of the tessera at the flat index
+
+    labels_at(index: int) -> str
+        returns the V2Point labels of the tessera at the flat index
+
+    text_rows()
+        iterates over the rows of the matrix in the bitmosaic text format
+
+    records() -> ([str], array, array)
+        returns the words table and, for each cell, the index of its word and the code of its labels
+
+    fill_cells(indexes: [int], data: [str], x_components: [V2Component], y_components: [V2Component])
+        stores a tessera in each of the cells at the flat indexes
+
+    Class Methods
+    -------------
+
+    label_code(labels: str) -> int
+        returns the code for the V2Point labels
+
+    label_pair(code: int) -> str
+        returns the V2Point labels for the code
+
+    """
+
+    _labels = string.ascii_lowercase + string.ascii_uppercase
+    _label_codes = {label: code for code, label in enumerate(_labels)}
+    _label_pairs = [x + y for x, y in itertools.product(_labels, repeat=2)]
+
+    @classmethod
+    def label_code(cls, labels: str) -> int:
+        """Returns the code for the V2Point labels
+        :param str labels: the labels of the x and y components
+        :return: int
+        """
+        return cls._label_codes[labels[0]] * len(cls._labels) + cls._label_codes[labels[1]]
+
+    @classmethod
+    def label_pair(cls, code: int) -> str:
+        """Returns the V2Point labels for the code
+        :param int code: the code of the labels
+        :return: str
+        """
+        return cls._label_pairs[code]
+
+    def __init__(self, cols: int, rows: int, filler: MatrixFiller):
+        """
+        :param int cols: the number of cols for the matrix
+        :param int rows: the number of rows for the matrix
+        :param MatrixFiller filler: the filler used to initialize the matrix
+        """
+        self._words = []
+        self._word_indexes = {}
+        super().__init__(cols, rows, filler)
+
+    def __str__(self):
+        return "".join(self.text_rows())
+
+    def _allocate(self):
+        """Allocates the arrays for the tesserae, with every cell empty"""
+        size = self._cols * self._rows
+        self._word_data = array("i", [-1]) * size
+        self._label_data = array("H", [0]) * size
+        self._x_values = array("i", [0]) * size
+        self._y_values = array("i", [0]) * size
+
+    def _get(self, index: int) -> Tessera:
+        """Creates a view of the tessera stored at the flat index, which writes its changes through to the cell
+        :param int index: the flat index
+        :return: Tessera
+        """
+        word = self._word_data[index]
+        if word < 0:
+            return None
+        x_label, y_label = self._label_pairs[self._label_data[index]]
+        v2_point = V2Point(V2Component(x_label, self._x_values[index]), V2Component(y_label, self._y_values[index]))
+        return TesseraView(self, index, Point(index % self._cols, index // self._cols), self._words[word], v2_point)
+
+    def _put(self, index: int, item: Tessera):
+        """Stores the tessera at the flat index
+        :param int index: the flat index
+        :param Tessera item: the tessera to store, or None to empty the cell
+        """
+        if item is None:
+            self._word_data[index] = -1
+            return
+        self._word_data[index] = self._word_index(item.data)
+        self._label_data[index] = (self._label_codes[item.v2_point.x.label] * len(self._labels) +
+                                   self._label_codes[item.v2_point.y.label])
+        self._x_values[index] = item.v2_point.x.value
+        self._y_values[index] = item.v2_point.y.value
+
+    def _word_index(self, word: str) -> int:
+        """Returns the index of the word in the words table, adding it if needed
+        :param str word: the word
+        :return: int
+        """
+        index = self._word_indexes.get(word)
+        if index is None:
+            index = len(self._words)
+            self._words.append(word)
+            self._word_indexes[word] = index
+        return index
+
+    def data_at(self, index: int) -> str:
+        """Returns the data of the tessera at the flat index, or None if the cell is empty
+        :param int index: the flat index
+        :return: str
+        """
+        word = self._word_data[index]
+        return None if word < 0 else self._words[word]
+
+    def labels_at(self, index: int) -> str:
+        """Returns the V2Point labels of the tessera at the flat index, or None if the cell is empty
+        :param int index: the flat index
+        :return: str
+        """
+        return None if self._word_data[index] < 0 else self._label_pairs[self._label_data[index]]
+
+    def text_rows(self):
+        """Iterates over the rows of the matrix in the bitmosaic text format, each one as a string with the
+        tesserae of the row
+        """
+        words = self._words
+        pairs = self._label_pairs
+        for row in range(self._rows):
+            start = row * self._cols
+            yield "".join("{0}{1}|".format(words[word], pairs[label]) if word >= 0 else "None"
+                          for word, label in zip(self._word_data[start:start + self._cols],
+                                                 self._label_data[start:start + self._cols]))
+
+    def records(self) -> ([str], array, array):
+        """Returns the words table and, for each cell, the index of its word in the table (-1 when the cell is
+        empty) and the code of its V2Point labels. The arrays are the matrix storage, so they must not be modified.
+        :return: ([str], array, array)
+        """
+        return self._words, self._word_data, self._label_data
+
+    def fill_cells(self, indexes: [int], data: [str], x_components: [V2Component], y_components: [V2Component]):
+        """Stores a tessera in each of the cells at the flat indexes, without creating the Tessera objects. The
+        content of the cells is replaced.
+        :param [int] indexes: the flat indexes of the cells
+        :param [str] data: the data for each cell
+        :param [V2Component] x_components: the x component of the V2Point for each cell
+        :param [V2Component] y_components: the y component of the V2Point for each cell
+        :raises ValueException: if the lists don't have the same length
+        """
+        if not len(indexes) == len(data) == len(x_components) == len(y_components):
+            raise ValueException(len(indexes), "The number of cells and tesserae must be the same")
+        word_data = self._word_data
+        label_data = self._label_data
+        x_values = self._x_values
+        y_values = self._y_values
+        label_codes = self._label_codes
+        labels_count = len(self._labels)
+        word_index = self._word_index
+        for index, word, x, y in zip(indexes, data, x_components, y_components):
+            word_data[index] = word_index(word)
+            label_data[index] = label_codes[x.label] * labels_count + label_codes[y.label]
+            x_values[index] = x.value
+            y_values[index] = y.value
+        self._mark_filled(indexes)
+
+
 class Mosaic:
     """
     This class creates a mosaic. A mosaic is made of tesserae.
@@ -187,9 +424,12 @@ class Mosaic:
     rows : int
         number of rows of the mosaic
 
-    matrix : Matrix
+    matrix : TesseraMatrix
         the matrix where the mosaic data is stored
 
+    colors : ColorRaster
+        the raster where the mosaic colors are stored
+
 
     Methods
     -------
@@ -218,6 +458,19 @@ class Mosaic:
     set_tessera(tessera: Tessera, point: Point)
         sets the tessera at point
 
+
+    Class Methods
+    -------------
+
+    recover(bitmosaic_data: str, recovery: Recovery) -> Recovery
+        recovers the secret from the bitmosaic text parsing only the tesserae on its path
+
+    recover_from_records(records, recovery: Recovery) -> Recovery
+        recovers the secret from the raw tesserae, indexed by their flat index
+
+    recover_all(records, recoveries: [Recovery]) -> [Recovery]
+        recovers the secrets of all the recoveries from the same raw tesserae
+
     """
 
     @property
@@ -229,9 +482,13 @@ class Mosaic:
         return self._color_filler.rows
 
     @property
-    def matrix(self) -> Matrix:
+    def matrix(self) -> TesseraMatrix:
         return self.__data_matrix
 
+    @property
+    def colors(self) -> ColorRaster:
+        return self.__color_matrix
+
     @property
     def recoveries(self) -> list:
         return self.__recoveries
@@ -239,8 +496,9 @@ class Mosaic:
     def __init__(self, domain: Domain, color_filler: ColorFiller, data_filler: MatrixFiller = NoneFiller()):
         self._domain = domain
         self._color_filler = color_filler
-        self.__color_matrix = Matrix(self.cols, self.rows, color_filler)
-        self.__data_matrix = Matrix(self.cols, self.rows, data_filler)
+        self.__color_matrix = ColorRaster(self.cols, self.rows)
+        color_filler.fill(self.__color_matrix)
+        self.__data_matrix = TesseraMatrix(self.cols, self.rows, data_filler)
         self.__recoveries = []
 
     def __len__(self):
@@ -257,9 +515,9 @@ class Mosaic:
         Returns the color at point from color matrix.
 
         :param Point point: the point in mosaic.
-        :return: Tessera
+        :return: Color
         """
-        return self.__color_matrix.get_item(point)
+        return self.__color_matrix.color(self.__data_matrix.flat_index(point))
 
     def get_tessera(self, point: Point) -> Tessera:
         """
@@ -286,42 +544,91 @@ class Mosaic:
         data_filler = RecoveryFiller(recovery.cols, recovery.rows, recovery, bitmosaic_data)
         return Mosaic(domain=None, color_filler=color_filler, data_filler=data_filler)
 
+    @classmethod
+    def recover(cls, bitmosaic_data: str, recovery: Recovery) -> Recovery:
+        """
+        Recovers the secret from the bitmosaic text without building the mosaic. Only the tesserae on the secret's
+        path are parsed.
+
+        :param str bitmosaic_data: the bitmosaic as text.
+        :param Recovery recovery: the recovery info used to recover the secret.
+        :raises ValueException: if the recovery info doesn't match the bitmosaic
+        :return: Recovery
+        """
+        return cls.recover_from_records(bitmosaic_data.split("|"), recovery)
+
+    @classmethod
+    def recover_from_records(cls, records, recovery: Recovery) -> Recovery:
+        """
+        Recovers the secret from the raw tesserae of a bitmosaic, in the same way as recover_secret does with a
+        mosaic built from them.
+
+        :param records: the raw tesserae, as a sequence indexed by flat index (row * cols + col).
+        :param Recovery recovery: the recovery info used to recover the secret.
+        :raises ValueException: if the recovery info doesn't match the bitmosaic, or a tessera on the secret's path
+            is not valid
+        :return: Recovery
+        """
+        cols = recovery.cols
+        rows = recovery.rows
+        if len(records) < cols * rows:
+            raise ValueException(len(records), "The bitmosaic doesn't have {0}x{1} tesserae".format(cols, rows))
+        if not Point.zero() <= recovery.origin < Point(cols, rows):
+            raise ValueException(recovery.origin, "The point is not valid for this mosaic")
+
+        point = recovery.origin
+        for index in range(len(recovery)):
+            record = records[point.y * cols + point.x]
+            if len(record) < 2:
+                raise ValueException(record, "The tessera at {0} is not valid".format(point.y * cols + point.x))
+            tessera = Tessera.init_for_recovery(point, record, recovery.components)
+            recovery.data[index] = tessera.data
+            next_point = tessera.next()
+            point = Point(next_point.x % cols, next_point.y % rows)
+        return recovery
+
+    @classmethod
+    def recover_all(cls, records, recoveries: [Recovery]) -> [Recovery]:
+        """
+        Recovers the secrets of all the recoveries from the same raw tesserae, so the bitmosaic is parsed once.
+
+        :param records: the raw tesserae, as a sequence indexed by flat index (row * cols + col).
+        :param [Recovery] recoveries: the recovery info of each secret.
+        :raises ValueException: if some recovery info doesn't match the bitmosaic
+        :return: [Recovery]
+        """
+        return [cls.recover_from_records(records, recovery) for recovery in recoveries]
+
     def hide_secrets(self, vault: Vault):
         """
         Hide the_secrets in the matrix.
 
+        The positions of all the secrets are planned before any tessera is placed, so the matrix is only modified
+        when every secret fits in it.
+
         :param Vault vault: the collection of secrets to hide.
         :raises IncompleteSecretException:
+        :raises ValueException: if some secret's value is not in the domain
+        :raises MosaicItemCollisionException: if the secrets can't be hidden without collisions
         """
         if vault is None or len(vault) == 0:
             raise IncompleteSecretException(vault, "Vault can't be empty")
 
-        for index in range(len(vault)):
-            secret = vault.get_secret(index)
+        the_secrets = [vault.get_secret(index) for index in range(len(vault))]
+        for secret in the_secrets:
             if not secret.is_complete():
                 raise IncompleteSecretException(secret, "The secret needs to be complete to be hidden")
+            if not self._domain.contains_all(secret.data):
+                value = next(value for value in secret.data if not self._domain.contains(value))
+                raise ValueException(value, "'{0}' was not found in domain".format(value))
+
+        plan = PlacementEngine(self.__data_matrix).plan(the_secrets)
 
+        for secret, steps in plan:
             self.__recoveries.append(Recovery(secret.name, secret.origin, secret.components,
                                               self.cols, self.rows, len(secret)))
-
-            rand_min = secrets.randbelow(100)
-            rand_max = random.randint(rand_min, 100)
-            hidden = []
-
-            for index, value in enumerate(secret.data):
-                if not self._domain.contains(value):
-                    raise ValueException(value, "'{0}' was not found in domain".format(value))
-                if index == 0:
-                    point = secret.origin
-                else:
-                    point = hidden[-1].position + hidden[-1].v2_point.to_point()
-                if self.get_tessera(point) is not None:
-                    raise MosaicItemCollisionException(point, "Collision at {0}".format(point))
-                v2_point = self.__v2_point(point, secret, rand_min, rand_max)
-                tessera = Tessera(point, value, v2_point)
-                hidden.append(tessera)
-                self.set_tessera(tessera, tessera.position)
-        del hidden
+            for value, (point, v2_point) in zip(secret.data, steps):
+                self.set_tessera(Tessera(point, value, v2_point), point)
         self.__complete_with_fake_data()
 
     def recover_secret(self, recovery: Recovery) -> Recovery:
@@ -347,47 +654,14 @@ class Mosaic:
     def __complete_with_fake_data(self):
         """
         Completes the empty matrix positions with fake tesserae.
+
+        The empty cells get the domain item at their index, or a random domain item when the index is beyond the
+        domain's length, and a V2Point made of fake components. All of them are stored in one pass.
         """
-        index = 0
-        for row in range(0, self.rows):
-            for col in range(0, self.cols):
-                point = Point(col, row)
-                if self.get_tessera(point) is None:
-                    if index < len(self._domain):
-                        data = self._domain.data[index]
-                    else:
-                        data = self._domain.random(count=1)[0]
-                    tessera = Tessera(point, data, V2Point.random_fake())
-                    self.set_tessera(tessera, point)
-                index += 1
-
-    def __v2_point(self, point: Point, secret: Secret, min_value: int, max_value: int) -> V2Point:
-        """
-        Returns a valid V2Point, used to hide the secret in the mosaic.
-
-        :param Point point: the point for the current tessera
-        :param Secret secret: the secret used to get the valid V2Components
-        :param int min_value: minimum value for the random value for next point coordinates
-        :param int max_value: maximum value for the random value for next point coordinates
-        :return: V2Point
-        """
-        while True:
-            v1 = random.choice(tuple(secret.components))
-            next_x_sign = 1
-            if min_value < secrets.randbelow(100) < max_value:
-                next_x_sign = -1
-            next_x = V2Component(v1.label, v1.value * next_x_sign)
-
-            v2 = random.choice(tuple(secret.components))
-            next_y_sign = 1
-            if min_value < secrets.randbelow(100) < max_value:
-                next_y_sign = -1
-            next_y = V2Component(v2.label, v2.value * next_y_sign)
-
-            v2_point = V2Point(next_x, next_y)
-            empty_destination_point = v2_point.to_point() + point
-
-            if self.get_tessera(empty_destination_point) is None and \
-                    not self.__data_matrix.same_point(empty_destination_point, point):
-                break
-        return v2_point
+        matrix = self.__data_matrix
+        indexes = matrix.empty_indexes()
+        domain_data = self._domain.data
+        data = [domain_data[index] for index in indexes if index < len(domain_data)]
+        data.extend(self._domain.random(count=len(indexes) - len(data)))
+        matrix.fill_cells(indexes, data, V2Component.random_fake_components(len(indexes)),
+                          V2Component.random_fake_components(len(indexes)))
@@ -0,0 +1,257 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# planner.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
+
+import itertools
+import random
+import secrets
+from bitmosaic.core.matrix import Matrix
+from bitmosaic.core.matrix import Point
+from bitmosaic.core.matrix import V2Component
+from bitmosaic.core.matrix import V2Point
+from bitmosaic.core.secret import Secret
+from bitmosaic.exception import MosaicItemCollisionException
+
+
+class VectorPlanner:
+    """
+    Finds the V2Points that lead from a tessera to the next one while a secret is being hidden.
+
+    The reachable offsets are the finite set of (x component, x sign, y component, y sign) combinations of the
+    secret's components. Each combination is weighted as if both components were picked at random and each sign was
+    negative with the probability given by the min_value and max_value range, so trying the offsets that lead to an
+    empty tessera in the weighted order follows the same distribution as picking random combinations until one is
+    valid.
+
+    Properties
+    ----------
+    candidates : list
+        the list of (dx, dy, weight, x_label, y_label) tuples for all the reachable offsets
+
+    Methods
+    -------
+    valid_candidates(matrix: Matrix, point: Point, reserved: set) -> list
+        returns the candidates with some weight that lead from point to an empty cell of the matrix, not in the
+        reserved set
+
+    ordered(candidates: list) -> list
+        returns the candidates in a random order weighted by their weights
+
+    v2_point(candidate: tuple) -> V2Point
+        returns the candidate as V2Point
+
+    """
+
+    @property
+    def candidates(self) -> list:
+        return self._candidates
+
+    def __init__(self, components: set, min_value: int, max_value: int):
+        """
+        :param set components: the V2Component set of the secret
+        :param int min_value: the lower bound (exclusive) of the range of random values in [0, 100) that makes a sign
+            negative
+        :param int max_value: the upper bound (exclusive) of that range
+        """
+        negative = max(0, min(max_value, 100) - max(min_value, -1) - 1) / 100
+        signs = ((1, 1 - negative), (-1, negative))
+        self._candidates = []
+        for (x_component, (x_sign, x_weight)), (y_component, (y_sign, y_weight)) in \
+                itertools.product(itertools.product(components, signs), repeat=2):
+            self._candidates.append((x_component.value * x_sign, y_component.value * y_sign, x_weight * y_weight,
+                                     x_component.label, y_component.label))
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def __repr__(self):
+        return "VectorPlanner({0} candidates)".format(len(self._candidates))
+
+    def valid_candidates(self, matrix: Matrix, point: Point, reserved: set = None) -> list:
+        """
+        Returns the candidates that lead from point to an empty cell in matrix, other than the cell at point. The
+        candidates with weight 0 are left out, since their signs are never picked at random.
+
+        :param Matrix matrix: the matrix where the secret is being hidden.
+        :param Point point: the point of the current tessera.
+        :param set reserved: optional flat indexes of cells that must be considered as not empty.
+        :return: list
+        """
+        cols = matrix.cols
+        rows = matrix.rows
+        x = point.x % cols
+        y = point.y % rows
+        valid = []
+        for candidate in self._candidates:
+            next_x = (x + candidate[0]) % cols
+            next_y = (y + candidate[1]) % rows
+            if candidate[2] > 0 and (next_x != x or next_y != y) and matrix.is_empty_at(next_x, next_y) and \
+                    (reserved is None or next_y * cols + next_x not in reserved):
+                valid.append(candidate)
+        return valid
+
+    @staticmethod
+    def ordered(candidates: list) -> list:
+        """
+        Returns the candidates in a random order where each candidate is ahead of the others with a probability
+        proportional to its weight. The candidates with weight 0 are left out.
+
+        :param list candidates: the candidates to sort.
+        :return: list
+        """
+        return sorted((candidate for candidate in candidates if candidate[2] > 0), reverse=True,
+                      key=lambda candidate: random.random() ** (1 / candidate[2]))
+
+    @staticmethod
+    def v2_point(candidate: tuple) -> V2Point:
+        """
+        Returns the candidate as V2Point.
+
+        :param tuple candidate: the candidate.
+        :return: V2Point
+        """
+        return V2Point(V2Component(candidate[3], candidate[0]), V2Component(candidate[4], candidate[1]))
+
+
+class PlacementEngine:
+    """
+    Plans the position of every item of the secrets in a vault before anything is placed in the matrix.
+
+    Each secret is planned with a depth-first search over the valid V2Points of each step, going back to the previous
+    step when a path gets stuck. The cells used by the planned secrets are reserved on top of the matrix empty cells
+    index. When a secret can't be planned it is moved ahead of the others and the whole vault is planned again.
+
+    Properties
+    ----------
+    max_steps : int
+        the maximum number of V2Points tried for a secret before giving up
+
+    Methods
+    -------
+    plan(the_secrets: [Secret]) -> [(Secret, [(Point, V2Point)])]
+        returns, for each secret, the point and the V2Point of every item
+
+    """
+
+    @property
+    def max_steps(self) -> int:
+        return self._max_steps
+
+    def __init__(self, matrix: Matrix, max_steps: int = 10000):
+        """
+        :param Matrix matrix: the matrix where the secrets will be hidden
+        :param int max_steps: the maximum number of V2Points tried for a secret before giving up
+        """
+        self._matrix = matrix
+        self._max_steps = max_steps
+
+    def __repr__(self):
+        return "PlacementEngine({0}x{1})".format(self._matrix.cols, self._matrix.rows)
+
+    def plan(self, the_secrets: list) -> list:
+        """
+        Plans the position of every item of the secrets.
+
+        :param [Secret] the_secrets: the secrets to plan, in the order their plans are returned.
+        :raises MosaicItemCollisionException: if the secrets can't be placed without collisions
+        :return: [(Secret, [(Point, V2Point)])]
+        """
+        planners = []
+        for secret in the_secrets:
+            rand_min = secrets.randbelow(100)
+            rand_max = random.randint(rand_min, 100)
+            planners.append(VectorPlanner(secret.components, rand_min, rand_max))
+
+        order = list(range(len(the_secrets)))
+        for _ in range(len(the_secrets) + 1):
+            reserved = set()
+            plans = {}
+            failed = None
+            for position in order:
+                steps = self.__plan_secret(the_secrets[position], planners[position], reserved)
+                if steps is None:
+                    failed = position
+                    break
+                plans[position] = steps
+            if failed is None:
+                return [(secret, plans[position]) for position, secret in enumerate(the_secrets)]
+            if failed == order[0]:
+                break
+            order.remove(failed)
+            order.insert(0, failed)
+        secret = the_secrets[failed]
+        raise MosaicItemCollisionException(secret.origin, "The secret '{0}' can't be hidden without collisions"
+                                           .format(secret.name))
+
+    def __plan_secret(self, secret: Secret, planner: VectorPlanner, reserved: set) -> list:
+        """
+        Plans the position of every item of the secret, avoiding the reserved cells. The cells used by the secret
+        are added to the reserved set.
+
+        :param Secret secret: the secret to plan.
+        :param VectorPlanner planner: the planner with the secret's V2Point candidates.
+        :param set reserved: the flat indexes of the cells already used by other secrets.
+        :return: [(Point, V2Point)] or None if the secret can't be planned
+        """
+        cols = self._matrix.cols
+        rows = self._matrix.rows
+        start = self._matrix.flat_index(secret.origin)
+        if start in reserved or not self._matrix.is_empty_at(start % cols, start // cols):
+            return None
+
+        reserved.add(start)
+        indexes = [start]
+        chosen = []
+        options = [self.__options(planner, start, reserved)]
+        steps = 0
+        while steps < self._max_steps:
+            if len(options[-1]) == 0:
+                reserved.discard(indexes.pop())
+                options.pop()
+                if len(indexes) == 0:
+                    return None
+                chosen.pop()
+                continue
+
+            candidate = options[-1].pop()
+            steps += 1
+            chosen.append(candidate)
+            if len(chosen) == len(secret):
+                return [(Point(index % cols, index // cols), VectorPlanner.v2_point(candidate))
+                        for index, candidate in zip(indexes, chosen)]
+
+            x = indexes[-1] % cols
+            y = indexes[-1] // cols
+            index = ((y + candidate[1]) % rows) * cols + (x + candidate[0]) % cols
+            reserved.add(index)
+            indexes.append(index)
+            options.append(self.__options(planner, index, reserved))
+
+        for index in indexes:
+            reserved.discard(index)
+        return None
+
+    def __options(self, planner: VectorPlanner, index: int, reserved: set) -> list:
+        """
+        Returns the valid candidates from the cell at index, in the reversed order they have to be tried.
+
+        :param VectorPlanner planner: the planner with the secret's V2Point candidates.
+        :param int index: the flat index of the current cell.
+        :param set reserved: the flat indexes of the cells that can't be used.
+        :return: list
+        """
+        point = Point(index % self._matrix.cols, index // self._matrix.cols)
+        return list(reversed(planner.ordered(planner.valid_candidates(self._matrix, point, reserved))))
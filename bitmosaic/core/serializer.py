@@ -0,0 +1,593 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# serializer.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic. If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from bitmosaic.core.mosaic import Mosaic
+from bitmosaic.core.mosaic import TesseraMatrix
+from bitmosaic.core.secret import Recovery
+from bitmosaic.exception import ErrorCodes
+from bitmosaic.exception import FileException
+from bitmosaic.exception import InvalidFormatException
+
+
+class BitmosaicReader:
+    """
+    Reads the tesserae of a bitmosaic txt file without loading the whole file. The file is written by write_txt.
+
+    The file is memory mapped and the offsets of its records (the raw tesserae separated by '|') are kept in an
+    index, so a tessera is read by its flat index or by its col and row. When it's asked for, the index is saved in a
+    sidecar file next to the txt file and reused while the txt file doesn't change. Reading a bitmosaic writes
+    nothing by default, so no data is left next to the user's files.
+
+    Properties
+    ----------
+    file_path : str
+        the path of the bitmosaic txt file
+
+    index_path : str
+        the path of the sidecar file with the offsets, or None if it's not used
+
+    offsets : array
+        the offset of each record in the file, followed by the end of the last record plus one
+
+    Methods
+    -------
+    record(index: int) -> str
+        returns the raw tessera at the flat index
+
+    record_at(col: int, row: int, cols: int) -> str
+        returns the raw tessera at col and row of a bitmosaic with cols columns
+
+    close()
+        closes the file
+
+    """
+
+    __header = struct.Struct("<8sqqq")
+    __magic = b"BMIDX001"
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def index_path(self) -> str:
+        return self._index_path
+
+    @property
+    def offsets(self) -> array:
+        return self._offsets
+
+    def __init__(self, file_path: str, use_index_file: bool = False, offsets: array = None):
+        """
+        :param str file_path: the path of the bitmosaic txt file
+        :param bool use_index_file: to load and save the offsets in a sidecar file, default is False
+        :param array offsets: the offsets of another reader of the same file, so the file is not indexed again
+        :raises FileException: if the file can't be read
+        """
+        self._file_path = str(file_path)
+        self._index_path = self._file_path + ".idx" if use_index_file else None
+        self._file = None
+        self._map = None
+        try:
+            self._file = open(self._file_path, "rb")
+            stat = os.fstat(self._file.fileno())
+            if stat.st_size > 0:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError):
+            self.close()
+            raise FileException(ErrorCodes.file_error, "There was a problem reading the file {0}"
+                                .format(self._file_path))
+        self._offsets = offsets if offsets is not None else self.__load_offsets(stat)
+        if self._offsets is None:
+            self._offsets = self.__build_offsets()
+            self.__save_offsets(stat)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.record(index)
+
+    def __repr__(self):
+        return "BitmosaicReader({0}, {1} records)".format(self._file_path, self.__len__())
+
+    def __build_offsets(self) -> array:
+        """
+        Finds the start of every record in the file. The last offset is the end of the last record plus one.
+
+        :return: array
+        """
+        offsets = array("q", [0])
+        if self._map is None:
+            return offsets
+        find = self._map.find
+        position = find(b"|")
+        while position >= 0:
+            offsets.append(position + 1)
+            position = find(b"|", position + 1)
+        return offsets
+
+    def __load_offsets(self, stat: os.stat_result) -> array:
+        """
+        Loads the offsets from the sidecar file if it belongs to the current version of the txt file.
+
+        :param os.stat_result stat: the status of the txt file.
+        :return: array or None if there is no valid sidecar file
+        """
+        if self._index_path is None or not os.path.exists(self._index_path):
+            return None
+        try:
+            with open(self._index_path, "rb") as index_file:
+                magic, size, mtime, count = self.__header.unpack(index_file.read(self.__header.size))
+                if magic != self.__magic or size != stat.st_size or mtime != stat.st_mtime_ns:
+                    return None
+                offsets = array("q")
+                offsets.fromfile(index_file, count)
+                return offsets
+        except (IOError, EOFError, struct.error):
+            return None
+
+    def __save_offsets(self, stat: os.stat_result):
+        """
+        Saves the offsets in the sidecar file. The index is only a cache, so errors are ignored.
+
+        :param os.stat_result stat: the status of the txt file.
+        """
+        if self._index_path is None:
+            return
+        try:
+            with open(self._index_path, "wb") as index_file:
+                index_file.write(self.__header.pack(self.__magic, stat.st_size, stat.st_mtime_ns, len(self._offsets)))
+                self._offsets.tofile(index_file)
+        except IOError:
+            pass
+
+    def record(self, index: int) -> str:
+        """
+        Returns the raw tessera at the flat index.
+
+        :param int index: the flat index (row * cols + col).
+        :raises IndexError: if there is no record at index
+        :raises FileException: if the record is not valid utf-8 text
+        :return: str
+        """
+        if not 0 <= index < self.__len__():
+            raise IndexError(index)
+        try:
+            return self._map[self._offsets[index]:self._offsets[index + 1] - 1].decode("utf-8")
+        except UnicodeDecodeError:
+            raise FileException(ErrorCodes.file_error, "The file {0} is not a bitmosaic txt file"
+                                .format(self._file_path))
+
+    def record_at(self, col: int, row: int, cols: int) -> str:
+        """
+        Returns the raw tessera at col and row.
+
+        :param int col: the tessera's col.
+        :param int row: the tessera's row.
+        :param int cols: the number of cols of the bitmosaic.
+        :return: str
+        """
+        return self.record(row * cols + col)
+
+    def close(self):
+        """
+        Closes the memory map and the file.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BitmosaicContainer:
+    """
+    Reads a bitmosaic binary container with random access and without copying the file to memory.
+
+    The container is written by write_binary and is made of:
+        - A header with the format version, the number of cols and rows and the number of words
+        - The word table: the offset of each word followed by the utf-8 encoded words
+        - A fixed width record for each cell, in flat index order, with the index of its word in the table (-1 when
+          the cell is empty) and the code of its V2Point labels
+
+    The records are returned in the bitmosaic text format, so the container can be used wherever a BitmosaicReader
+    is used.
+
+    Properties
+    ----------
+    file_path : str
+        the path of the container file
+
+    cols : int
+        the number of cols of the bitmosaic
+
+    rows : int
+        the number of rows of the bitmosaic
+
+    Methods
+    -------
+    word(index: int) -> str
+        returns the data of the tessera at the flat index, or None if the cell is empty
+
+    labels(index: int) -> str
+        returns the V2Point labels of the tessera at the flat index, or None if the cell is empty
+
+    record(index: int) -> str
+        returns the raw tessera at the flat index
+
+    record_at(col: int, row: int, cols: int) -> str
+        returns the raw tessera at col and row
+
+    close()
+        closes the file
+
+    """
+
+    magic = b"BMOSAIC\x00"
+    version = 1
+    header = struct.Struct("<8sHIII")
+    offset = struct.Struct("<I")
+    cell = struct.Struct("<iH")
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def cols(self) -> int:
+        return self._cols
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    def __init__(self, file_path: str):
+        """
+        :param str file_path: the path of the container file
+        :raises FileException: if the file can't be read
+        :raises InvalidFormatException: if the file is not a valid container
+        """
+        self._file_path = str(file_path)
+        self._file = None
+        self._map = None
+        try:
+            self._file = open(self._file_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError):
+            self.close()
+            raise FileException(ErrorCodes.file_error, "There was a problem reading the file {0}"
+                                .format(self._file_path))
+        try:
+            magic, version, self._cols, self._rows, self._word_count = self.header.unpack_from(self._map, 0)
+        except struct.error:
+            magic, version = None, None
+        if magic != self.magic or version != self.version:
+            self.close()
+            raise InvalidFormatException(self._file_path, "The file {0} is not a bitmosaic container"
+                                         .format(self._file_path))
+        self._words_start = self.header.size + self.offset.size * (self._word_count + 1)
+        if len(self._map) < self._words_start:
+            self.close()
+            raise InvalidFormatException(self._file_path, "The file {0} is truncated".format(self._file_path))
+        self._cells_start = self._words_start + self.offset.unpack_from(
+            self._map, self.header.size + self.offset.size * self._word_count)[0]
+        if len(self._map) < self._cells_start + self.cell.size * self.__len__():
+            self.close()
+            raise InvalidFormatException(self._file_path, "The file {0} is truncated".format(self._file_path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._cols * self._rows
+
+    def __getitem__(self, index: int) -> str:
+        return self.record(index)
+
+    def __repr__(self):
+        return "BitmosaicContainer({0}, {1}x{2})".format(self._file_path, self._cols, self._rows)
+
+    def __cell(self, index: int) -> tuple:
+        """
+        Returns the word index and the labels code of the cell at the flat index.
+
+        :param int index: the flat index.
+        :raises IndexError: if there is no cell at index
+        :return: tuple
+        """
+        if not 0 <= index < self.__len__():
+            raise IndexError(index)
+        return self.cell.unpack_from(self._map, self._cells_start + self.cell.size * index)
+
+    def word(self, index: int) -> str:
+        """
+        Returns the data of the tessera at the flat index.
+
+        :param int index: the flat index (row * cols + col).
+        :return: str or None if the cell is empty
+        """
+        word = self.__cell(index)[0]
+        if word < 0:
+            return None
+        position = self.header.size + self.offset.size * word
+        start = self.offset.unpack_from(self._map, position)[0]
+        end = self.offset.unpack_from(self._map, position + self.offset.size)[0]
+        return self._map[self._words_start + start:self._words_start + end].decode("utf-8")
+
+    def labels(self, index: int) -> str:
+        """
+        Returns the V2Point labels of the tessera at the flat index.
+
+        :param int index: the flat index (row * cols + col).
+        :return: str or None if the cell is empty
+        """
+        word, code = self.__cell(index)
+        return None if word < 0 else TesseraMatrix.label_pair(code)
+
+    def record(self, index: int) -> str:
+        """
+        Returns the raw tessera at the flat index, as it is written in the bitmosaic text format without the
+        separator.
+
+        :param int index: the flat index (row * cols + col).
+        :return: str
+        """
+        word = self.word(index)
+        return "None" if word is None else word + self.labels(index)
+
+    def record_at(self, col: int, row: int, cols: int = None) -> str:
+        """
+        Returns the raw tessera at col and row.
+
+        :param int col: the tessera's col.
+        :param int row: the tessera's row.
+        :param int cols: the number of cols of the bitmosaic, taken from the header by default.
+        :return: str
+        """
+        return self.record(row * (self._cols if cols is None else cols) + col)
+
+    def close(self):
+        """
+        Closes the memory map and the file.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def write_binary(matrix: TesseraMatrix, file_path: str):
+    """
+    Writes the matrix as a bitmosaic binary container.
+
+    :param TesseraMatrix matrix: the matrix with the tesserae.
+    :param str file_path: the path of the container file.
+    :return: None
+    """
+    words, word_data, label_data = matrix.records()
+    _write_container(file_path, matrix.cols, matrix.rows, words, word_data, label_data)
+
+
+def txt_to_binary(txt_path: str, binary_path: str, cols: int, rows: int):
+    """
+    Converts a bitmosaic txt file to a bitmosaic binary container. The text format doesn't store the size of the
+    bitmosaic, so it must be provided.
+
+    :param str txt_path: the path of the bitmosaic txt file.
+    :param str binary_path: the path of the container file.
+    :param int cols: the number of cols of the bitmosaic.
+    :param int rows: the number of rows of the bitmosaic.
+    :raises FileException: if the txt file can't be read
+    :raises InvalidFormatException: if the txt file doesn't have cols x rows tesserae
+    :return: None
+    """
+    words = []
+    word_indexes = {}
+    word_data = array("i")
+    label_data = array("H")
+    with BitmosaicReader(txt_path, use_index_file=False) as reader:
+        if len(reader) != cols * rows:
+            raise InvalidFormatException(len(reader), "The bitmosaic has {0} tesserae instead of {1}x{2}"
+                                         .format(len(reader), cols, rows))
+        for index in range(len(reader)):
+            record = reader.record(index)
+            word = record[:-2]
+            word_index = word_indexes.get(word)
+            if word_index is None:
+                word_index = len(words)
+                words.append(word)
+                word_indexes[word] = word_index
+            word_data.append(word_index)
+            try:
+                label_data.append(TesseraMatrix.label_code(record[-2:]))
+            except (KeyError, IndexError):
+                raise InvalidFormatException(record, "Invalid tessera at {0}: {1}".format(index, record))
+    _write_container(binary_path, cols, rows, words, word_data, label_data)
+
+
+def binary_to_txt(binary_path: str, txt_path: str):
+    """
+    Converts a bitmosaic binary container to a bitmosaic txt file.
+
+    :param str binary_path: the path of the container file.
+    :param str txt_path: the path of the bitmosaic txt file.
+    :raises FileException: if the container can't be read
+    :raises InvalidFormatException: if the file is not a valid container
+    :return: None
+    """
+    with BitmosaicContainer(binary_path) as container, \
+            open(txt_path, "w", encoding="utf-8", buffering=1 << 16) as file:
+        for row in range(container.rows):
+            file.write("".join(_txt_record(container, index)
+                               for index in range(row * container.cols, (row + 1) * container.cols)))
+
+
+def _txt_record(container: BitmosaicContainer, index: int) -> str:
+    """
+    Returns the tessera at the flat index of the container as it is written in the bitmosaic text format.
+
+    :param BitmosaicContainer container: the container.
+    :param int index: the flat index.
+    :return: str
+    """
+    word = container.word(index)
+    return "None" if word is None else "{0}{1}|".format(word, container.labels(index))
+
+
+def _write_container(file_path: str, cols: int, rows: int, words: [str], word_data: array, label_data: array):
+    """
+    Writes the bitmosaic binary container.
+
+    :param str file_path: the path of the container file.
+    :param int cols: the number of cols.
+    :param int rows: the number of rows.
+    :param [str] words: the words table.
+    :param array word_data: the index of the word of each cell, or -1 if the cell is empty.
+    :param array label_data: the code of the V2Point labels of each cell.
+    :return: None
+    """
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    cell = BitmosaicContainer.cell
+    with open(file_path, "wb", buffering=1 << 16) as file:
+        file.write(BitmosaicContainer.header.pack(BitmosaicContainer.magic, BitmosaicContainer.version, cols, rows,
+                                                  len(words)))
+        file.write(struct.pack("<{0}I".format(len(offsets)), *offsets))
+        file.write(b"".join(encoded))
+        for row in range(rows):
+            start = row * cols
+            file.write(b"".join(cell.pack(word, label) for word, label in
+                                zip(word_data[start:start + cols], label_data[start:start + cols])))
+
+
+def write_txt(matrix: TesseraMatrix, file_path: str, buffer_size: int = 1 << 16):
+    """
+    Writes the matrix in the bitmosaic text format, row by row, so the whole text is never built in memory.
+
+    :param TesseraMatrix matrix: the matrix with the tesserae.
+    :param str file_path: the path of the bitmosaic txt file.
+    :param int buffer_size: the size of the write buffer.
+    :return: None
+    """
+    with open(file_path, "w", encoding="utf-8", buffering=buffer_size) as file:
+        for row in matrix.text_rows():
+            file.write(row)
+
+
+def recover_from_file(file_path: str, recoveries: [Recovery], processes: int = 1,
+                      use_index_file: bool = False) -> [Recovery]:
+    """
+    Recovers the secrets of all the recoveries from the same bitmosaic txt file, which is indexed only once.
+
+    The data of the given recoveries is filled in and the same recovery objects are returned, in the same order, with
+    any number of processes.
+
+    :param str file_path: the path of the bitmosaic txt file.
+    :param [Recovery] recoveries: the recovery info of each secret.
+    :param int processes: the number of worker processes used to recover the secrets, 1 to recover them in the
+        current process. The workers read the file with the offsets indexed by the current process.
+    :param bool use_index_file: to load and save the offsets in a sidecar file next to the txt file, default is False
+    :raises FileException: if the file can't be read
+    :raises ValueException: if some recovery info doesn't match the bitmosaic
+    :return: [Recovery]
+    """
+    with BitmosaicReader(file_path, use_index_file=use_index_file) as reader:
+        if processes <= 1 or len(recoveries) < 2:
+            return Mosaic.recover_all(reader, recoveries)
+        offsets = reader.offsets
+
+    processes = min(processes, len(recoveries))
+    chunks = [recoveries[index::processes] for index in range(processes)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for index, chunk in enumerate(executor.map(_recover_chunk, [file_path] * processes, chunks,
+                                                   [offsets] * processes)):
+            # The workers recover copies of the recoveries
+            for recovery, recovered in zip(recoveries[index::processes], chunk):
+                recovery.data[:] = recovered.data
+    return recoveries
+
+
+def _recover_chunk(file_path: str, recoveries: [Recovery], offsets: array) -> [Recovery]:
+    """
+    Recovers the secrets of the recoveries from the bitmosaic txt file. Used by the worker processes of
+    recover_from_file.
+
+    :param str file_path: the path of the bitmosaic txt file.
+    :param [Recovery] recoveries: the recovery info of each secret.
+    :param array offsets: the offsets of the records in the file.
+    :return: [Recovery]
+    """
+    with BitmosaicReader(file_path, offsets=offsets) as reader:
+        return Mosaic.recover_all(reader, recoveries)
+
+
+def main(arguments: [str] = None):
+    """
+    Converts bitmosaic files between the text format and the binary container.
+
+    python -m bitmosaic.core.serializer to-binary bitmosaic.txt bitmosaic.bin --cols 64 --rows 64
+    python -m bitmosaic.core.serializer to-txt bitmosaic.bin bitmosaic.txt
+
+    :param [str] arguments: the command line arguments, sys.argv by default.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(prog="python -m bitmosaic.core.serializer",
+                                     description="Converts bitmosaic files between the text and binary formats")
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_binary = commands.add_parser("to-binary", help="converts a bitmosaic txt file to a binary container")
+    to_binary.add_argument("source")
+    to_binary.add_argument("destination")
+    to_binary.add_argument("--cols", type=int, required=True)
+    to_binary.add_argument("--rows", type=int, required=True)
+    to_txt = commands.add_parser("to-txt", help="converts a binary container to a bitmosaic txt file")
+    to_txt.add_argument("source")
+    to_txt.add_argument("destination")
+
+    options = parser.parse_args(arguments)
+    try:
+        if options.command == "to-binary":
+            txt_to_binary(options.source, options.destination, options.cols, options.rows)
+        else:
+            binary_to_txt(options.source, options.destination)
+    except (FileException, InvalidFormatException) as e:
+        sys.exit(e.message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# cache.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic. If not, see <https://www.gnu.org/licenses/>.
+
+import math
+import os
+from PIL import Image
+from PIL import ImageDraw
+from PIL import ImageFont
+
+_fonts = {}
+
+
+def load_font(font_path, size: int) -> ImageFont:
+    """
+    Returns the font of the file with the size.
+
+    The fonts are kept in a process wide cache, keyed by the file path and the size and validated with the file's
+    modification time and size, so the builds and the recovery cards of the same process don't open and parse the
+    font file again.
+
+    :param font_path: the path of the font file.
+    :param int size: the font size.
+    :raises OSError: if the font file can't be read.
+    :return: ImageFont
+    """
+    font_path = str(font_path)
+    stat = os.stat(font_path)
+    cached = _fonts.get((font_path, size))
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    font = ImageFont.truetype(font_path, size)
+    _fonts[(font_path, size)] = ((stat.st_mtime_ns, stat.st_size), font)
+    return font
+
+
+def warm_fonts(font_path, sizes: [int]):
+    """
+    Loads the font of the file with each one of the sizes in the cache.
+
+    :param font_path: the path of the font file.
+    :param [int] sizes: the font sizes.
+    :raises OSError: if the font file can't be read.
+    :return: None
+    """
+    for size in sizes:
+        load_font(font_path, size)
+
+
+def clear_font_cache():
+    """
+    Removes all the fonts from the cache.
+
+    :return: None
+    """
+    _fonts.clear()
+
+
+class TextCache:
+    """
+    Renders the text of the tesserae reusing the rasterized text and its measurements.
+
+    The text is made of lines drawn one below the other and centered, in the same way as ImageDraw.multiline_text
+    does. Each line is made of one or more runs of text drawn one after the other, so a line like the coordinates of
+    a tessera can be split in runs that repeat along the mosaic.
+
+    Each run is rasterized once for each subpixel offset as an alpha mask, with the same FreeType call that
+    ImageDraw.text uses, and then composited with ImageDraw.bitmap in the text color. The masks don't depend on the
+    color, so one cache serves every text color of a font.
+
+    Properties
+    ----------
+    font : ImageFont
+        the font used to render the text
+
+    spacing : int
+        the number of pixels between lines
+
+    Methods
+    -------
+    bbox(lines: list) -> tuple
+        returns the bounding box of the lines drawn at (0, 0)
+
+    draw(draw: ImageDraw, xy: tuple, lines: list, fill: tuple) -> tuple
+        draws the lines with their top left corner at xy and returns the box of the pixels they touch
+
+    """
+
+    @property
+    def font(self) -> ImageFont:
+        return self._font
+
+    @property
+    def spacing(self) -> int:
+        return self._spacing
+
+    def __init__(self, font: ImageFont, spacing: int = 4):
+        """
+        :param ImageFont font: the font used to render the text
+        :param int spacing: the number of pixels between lines
+        """
+        self._font = font
+        self._spacing = spacing
+        self._measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+        self._line_spacing = self._measure.textbbox((0, 0), "A", font)[3] + spacing
+        self._lengths = {}
+        self._bboxes = {}
+        self._masks = {}
+
+    def __len__(self):
+        return len(self._masks)
+
+    def __repr__(self):
+        return "TextCache({0} masks, {1} runs measured)".format(len(self._masks), len(self._lengths))
+
+    def __length(self, run: str) -> float:
+        """
+        Returns the advance of the run.
+
+        :param str run: the text run.
+        :return: float
+        """
+        length = self._lengths.get(run)
+        if length is None:
+            length = self._measure.textlength(run, self._font)
+            self._lengths[run] = length
+        return length
+
+    def __run_bbox(self, run: str) -> tuple:
+        """
+        Returns the bounding box of the run drawn at (0, 0).
+
+        :param str run: the text run.
+        :return: tuple
+        """
+        bbox = self._bboxes.get(run)
+        if bbox is None:
+            bbox = self._measure.textbbox((0, 0), run, self._font)
+            self._bboxes[run] = bbox
+        return bbox
+
+    def __mask(self, run: str, fraction_x: float, fraction_y: float) -> tuple:
+        """
+        Returns the alpha mask of the run drawn at the subpixel offset, the position of the pen in the mask and the
+        box of the mask's non zero pixels.
+
+        :param str run: the text run.
+        :param float fraction_x: the fractional part of the x coordinate.
+        :param float fraction_y: the fractional part of the y coordinate.
+        :return: (Image, int, int, tuple)
+        """
+        key = (run, fraction_x, fraction_y)
+        mask = self._masks.get(key)
+        if mask is None:
+            # The glyphs can be drawn out of the bounding box (accents, for example), so there is a margin of the
+            # font size around it
+            left, top, right, bottom = self.__run_bbox(run)
+            margin = self._font.size
+            origin_x = margin - math.floor(min(left, 0))
+            origin_y = margin - math.floor(min(top, 0))
+            image = Image.new("L", (math.ceil(right) + origin_x + margin, math.ceil(bottom) + origin_y + margin), 0)
+            ImageDraw.Draw(image).text((origin_x + fraction_x, origin_y + fraction_y), run, fill=255, font=self._font)
+            mask = (image, origin_x, origin_y, image.getbbox())
+            self._masks[key] = mask
+        return mask
+
+    def __layout(self, lines: list) -> list:
+        """
+        Returns the position of each run of the lines drawn at (0, 0).
+
+        :param list lines: the lines, each one as a string or as a tuple of strings with its runs.
+        :return: [(float, float, str)]
+        """
+        lines = [(line,) if isinstance(line, str) else tuple(line) for line in lines]
+        widths = [sum(self.__length(run) for run in line) for line in lines]
+        max_width = max(widths) if len(widths) > 0 else 0
+        runs = []
+        for index, (line, width) in enumerate(zip(lines, widths)):
+            x = (max_width - width) / 2
+            y = index * self._line_spacing
+            for run in line:
+                runs.append((x, y, run))
+                x += self.__length(run)
+        return runs
+
+    def bbox(self, lines: list) -> tuple:
+        """
+        Returns the bounding box of the lines drawn at (0, 0).
+
+        :param list lines: the lines, each one as a string or as a tuple of strings with its runs.
+        :return: tuple
+        """
+        left = top = math.inf
+        right = bottom = -math.inf
+        for x, y, run in self.__layout(lines):
+            run_left, run_top, run_right, run_bottom = self.__run_bbox(run)
+            left = min(left, x + run_left)
+            top = min(top, y + run_top)
+            right = max(right, x + run_right)
+            bottom = max(bottom, y + run_bottom)
+        if left == math.inf:
+            return 0, 0, 0, 0
+        return left, top, right, bottom
+
+    def draw(self, draw: ImageDraw, xy: tuple, lines: list, fill: tuple) -> tuple:
+        """
+        Draws the lines with their top left corner at xy.
+
+        :param ImageDraw draw: the image draw where the text will be drawn.
+        :param tuple xy: the position of the text.
+        :param list lines: the lines, each one as a string or as a tuple of strings with its runs.
+        :param tuple fill: the text color.
+        :return: the (left, top, right, bottom) box of the pixels touched by the text, or None if there are none
+        """
+        ink = None
+        for x, y, run in self.__layout(lines):
+            if run == "":
+                continue
+            x += xy[0]
+            y += xy[1]
+            # The position is split in its floor and its fractional part, so moving the text by whole pixels moves
+            # the same mask
+            integer_x = math.floor(x)
+            integer_y = math.floor(y)
+            mask, origin_x, origin_y, mask_ink = self.__mask(run, x - integer_x, y - integer_y)
+            mask_x = integer_x - origin_x
+            mask_y = integer_y - origin_y
+            draw.bitmap((mask_x, mask_y), mask, fill=fill)
+            if mask_ink is not None:
+                run_ink = (mask_x + mask_ink[0], mask_y + mask_ink[1], mask_x + mask_ink[2], mask_y + mask_ink[3])
+                ink = run_ink if ink is None else (min(ink[0], run_ink[0]), min(ink[1], run_ink[1]),
+                                                   max(ink[2], run_ink[2]), max(ink[3], run_ink[3]))
+        return ink
@@ -20,6 +20,7 @@ import colorsys
 import random
 import re
 from bitmosaic.exception import InvalidColorException
+from bitmosaic.exception import ValueException
 
 
 class Color(abc.ABC):
@@ -55,6 +56,158 @@ class Color(abc.ABC):
     def tuple(self):
         pass
 
+    def packed(self):
+        """
+        Returns the current color as packed color, with 255 as alpha value.
+
+        :return: PackedColor
+        """
+        return PackedColor.from_rgba(*self.tuple())
+
+
+class PackedColor:
+
+    """
+    Defines an immutable color packed in an int as 0xRRGGBBAA. The rgb tuple and the black or white color contrasting
+    with it are computed once, when the color is created, and the colors are compared and hashed by the packed value,
+    so they can be used as keys of dicts and sets. The contrasting color is the one of the color the packed color comes
+    from, so a packed HtmlColor keeps the contrast of HtmlColor.contrasted_color().
+
+    HtmlColor and RGBAColor objects convert into a PackedColor with packed().
+
+    Properties
+    ----------
+    value : int
+        returns the packed value, 0xRRGGBBAA
+
+    r : int
+        returns the red value for the color
+
+    g : int
+        returns the green value for the color
+
+    b : int
+        returns the blue value for the color
+
+    a : int
+        returns the alpha value for the color
+
+    rgb : tuple
+        returns the rgb values as tuple (r, g, b)
+
+    contrast : int
+        returns the grey value (0 or 255) of the black or white color contrasting with the color
+
+    Methods
+    -------
+    contrasted_rgb() -> tuple
+        returns the rgb values of the black or white color contrasting with the color
+
+    html_color() -> Color
+        returns the color as HtmlColor object
+
+    rgba_color() -> Color
+        returns the color as RGBAColor object
+
+    Class Methods
+    -------------
+    from_rgba(r: int, g: int, b: int, a: int, contrast: int) -> PackedColor
+        returns the packed color for the rgba values
+
+    """
+
+    __slots__ = ("_value", "_rgb", "_contrast")
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    @property
+    def r(self) -> int:
+        return self._rgb[0]
+
+    @property
+    def g(self) -> int:
+        return self._rgb[1]
+
+    @property
+    def b(self) -> int:
+        return self._rgb[2]
+
+    @property
+    def a(self) -> int:
+        return self._value & 0xFF
+
+    @property
+    def rgb(self) -> tuple:
+        return self._rgb
+
+    @property
+    def contrast(self) -> int:
+        return self._contrast
+
+    def __init__(self, value: int, contrast: int = None):
+        """
+        :param int value: the packed value, 0xRRGGBBAA
+        :param int contrast: the grey value (0 or 255) of the contrasting color. By default, black for the colors
+            whose average rgb value is over 128 and white for the rest, as RGBAColor.contrasted_color() does.
+        :raises ValueException: if the value doesn't fit in 32 bits
+        """
+        if not 0 <= value <= 0xFFFFFFFF:
+            raise ValueException(value, "The packed color must be between 0x00000000 and 0xFFFFFFFF")
+        self._value = value
+        self._rgb = (value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF)
+        self._contrast = (0 if sum(self._rgb) > 384 else 255) if contrast is None else contrast
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PackedColor):
+            return NotImplemented
+        return self._value == other._value
+
+    def __hash__(self) -> int:
+        return hash(self._value)
+
+    def __repr__(self) -> str:
+        return "PackedColor(0x{0:08X})".format(self._value)
+
+    def contrasted_rgb(self) -> tuple:
+        """
+        Returns the rgb values of the black or white color contrasting with the color.
+
+        :return: tuple
+        """
+        return self._contrast, self._contrast, self._contrast
+
+    def html_color(self) -> Color:
+        """
+        Returns the color in html format, without the alpha value.
+
+        :return: Color
+        """
+        return HtmlColor("#{0:06X}".format(self._value >> 8))
+
+    def rgba_color(self) -> Color:
+        """
+        Returns the color in rgba format.
+
+        :return: Color
+        """
+        return RGBAColor(*self._rgb, self.a)
+
+    @classmethod
+    def from_rgba(cls, r: int, g: int, b: int, a: int = 255, contrast: int = None) -> 'PackedColor':
+        """
+        Returns the packed color for the rgba values, each one between 0 and 255.
+
+        :param int r: the red value
+        :param int g: the green value
+        :param int b: the blue value
+        :param int a: the alpha value
+        :param int contrast: the grey value of the contrasting color, the default one if None
+        :return: PackedColor
+        """
+        return cls(r << 24 | g << 16 | b << 8 | a, contrast)
+
 
 class HtmlColor(Color):
 
@@ -88,6 +241,9 @@ class HtmlColor(Color):
     tuple() -> tuple
         returns the rgb values as tuple (r, g, b), in decimal format
 
+    packed() -> PackedColor
+        returns the color as PackedColor object
+
     Class Methods
     -------------
 
@@ -128,9 +284,18 @@ class HtmlColor(Color):
                 raise e
         else:
             raise InvalidColorException(hex_code, "The hex code for color is not valid")
+        value = int(self._code, 16)
+        r, g, b = value >> 16, (value >> 8) & 0xFF, value & 0xFF
+        self._packed = PackedColor(value << 8 | 0xFF, 0 if (r % 255 + g % 255 + b) / 3 > 128 else 255)
+        self._contrasted = None
 
     def __eq__(self, other) -> bool:
-        return self.code == other.code
+        if not isinstance(other, HtmlColor):
+            return NotImplemented
+        return self._packed == other._packed
+
+    def __hash__(self) -> int:
+        return hash(self._packed)
 
     def __len__(self) -> int:
         return len(self._code)
@@ -147,8 +312,9 @@ class HtmlColor(Color):
 
         :return: Color
         """
-        color = "#000" if (int(self.r, 16) % 255 + int(self.g, 16) % 255 + int(self.b, 16)) / 3 > 128 else "#FFF"
-        return HtmlColor(color)
+        if self._contrasted is None:
+            self._contrasted = HtmlColor("#000" if self._packed.contrast == 0 else "#FFF")
+        return self._contrasted
 
     def rgba_color(self, alpha: int = 255) -> Color:
         """
@@ -157,7 +323,7 @@ class HtmlColor(Color):
         :param int alpha: the alpha value for the color
         :return: Color
         """
-        return RGBAColor(int(self.r, 16), int(self.g, 16), int(self.b, 16), alpha)
+        return RGBAColor(*self._packed.rgb, alpha)
 
     def tuple(self) -> tuple:
         """
@@ -165,8 +331,15 @@ class HtmlColor(Color):
 
         :return: tuple
         """
-        rgb = self.rgba_color()
-        return rgb.r, rgb.g, rgb.b
+        return self._packed.rgb
+
+    def packed(self) -> PackedColor:
+        """
+        Returns the current color as packed color, with 255 as alpha value.
+
+        :return: PackedColor
+        """
+        return self._packed
 
     @staticmethod
     def _six_digits_code(code: str) -> str:
@@ -249,6 +422,9 @@ class RGBAColor(Color):
     tuple() -> tuple
         returns the rgb values as tuple (r, g, b)
 
+    packed() -> PackedColor
+        returns the color as PackedColor object
+
     Class Methods
     -------------
 
@@ -284,9 +460,16 @@ class RGBAColor(Color):
         self._g = g % 256
         self._b = b % 256
         self._a = a % 256
+        self._packed = None
+        self._contrasted = None
 
     def __eq__(self, other) -> bool:
-        return str(self) == str(other)
+        if not isinstance(other, RGBAColor):
+            return NotImplemented
+        return self.packed() == other.packed()
+
+    def __hash__(self) -> int:
+        return hash(self.packed())
 
     def __repr__(self) -> str:
         return "RGBAColor({0}, {1}, {2}, {3})".format(self._r, self._g, self._b, self._a)
@@ -300,8 +483,10 @@ class RGBAColor(Color):
 
         :return: Color
         """
-        value = 0 if (self._r + self._g + self._b) / 3 > 128 else 255
-        return RGBAColor(value, value, value)
+        if self._contrasted is None:
+            value = self.packed().contrast
+            self._contrasted = RGBAColor(value, value, value)
+        return self._contrasted
 
     def html_color(self) -> Color:
         """
@@ -309,7 +494,7 @@ class RGBAColor(Color):
 
         :return: Color
         """
-        return HtmlColor("#{:02x}{:02x}{:02x}".format(self.r % 256, self.g % 256, self.b % 256).upper())
+        return self.packed().html_color()
 
     def tuple(self):
         """
@@ -319,6 +504,17 @@ class RGBAColor(Color):
         """
         return self._r, self._g, self._b
 
+    def packed(self) -> PackedColor:
+        """
+        Returns the current color as packed color. It is created the first time it's needed, since most of the
+        RGBAColor objects are never compared nor hashed.
+
+        :return: PackedColor
+        """
+        if self._packed is None:
+            self._packed = PackedColor.from_rgba(self._r, self._g, self._b, self._a)
+        return self._packed
+
     @classmethod
     def random(cls) -> Color:
         """
@@ -335,7 +531,8 @@ class RGBAColor(Color):
 class Palette:
 
     """
-    Represents a color palette.
+    Represents a color palette. Along with the list of colors, in the order they were added, it keeps an index of the
+    colors by their packed value, so adding and removing a color doesn't compare it with every color of the palette.
 
     Properties
     ----------
@@ -364,6 +561,7 @@ class Palette:
 
     def __init__(self):
         self._colors = []
+        self._index = {}
 
     def __len__(self):
         return len(self._colors)
@@ -374,13 +572,40 @@ class Palette:
     def __str__(self):
         return "{0}".format(self._colors)
 
-    def add_color(self, color: Color):
+    def __contains__(self, color) -> bool:
+        return self.__key(self.__html_color(color)) in self._index
+
+    @staticmethod
+    def __html_color(color):
+        """
+        Returns the color as HtmlColor, the format of the palette colors. A string that isn't a valid html color is
+        returned as is.
+
+        :param color: the color, as Color or as html code
+        :return: Color
+        """
         if type(color) is RGBAColor:
             color = color.html_color()
         elif type(color) is str:
             if HtmlColor.is_valid(color):
                 color = HtmlColor(color)
-        if color not in self._colors:
+        return color
+
+    @staticmethod
+    def __key(color):
+        """
+        Returns the key of the color in the palette index: its packed value, or the color itself if it isn't a Color.
+
+        :param color: the color
+        :return: PackedColor
+        """
+        return color.packed() if isinstance(color, Color) else color
+
+    def add_color(self, color: Color):
+        color = self.__html_color(color)
+        key = self.__key(color)
+        if key not in self._index:
+            self._index[key] = color
             self._colors.append(color)
 
     def add_colors(self, colors: [Color]):
@@ -388,13 +613,10 @@ class Palette:
             self.add_color(color)
 
     def remove_color(self, color: Color):
-        if type(color) is RGBAColor:
-            color = color.html_color()
-        elif type(color) is str:
-            if HtmlColor.is_valid(color):
-                color = HtmlColor(color)
-        if color in self._colors:
-            self._colors.remove(color)
+        key = self.__key(self.__html_color(color))
+        if key in self._index:
+            stored = self._index.pop(key)
+            del self._colors[next(index for index, item in enumerate(self._colors) if item is stored)]
 
     def random(self) -> Color:
         """
@@ -436,3 +658,180 @@ class Palette:
             new_color = RGBAColor(round(r * 255), round(g * 255), round(b * 255))
             colors.append(new_color)
         return colors
+
+
+class ColorRaster:
+
+    """
+    Stores the colors of a cols x rows grid as a contiguous buffer of rgb bytes, without creating a Color object per
+    cell. Along with each color it keeps the value (0 or 255) of the black or white color that contrasts with it.
+
+    The cells are identified by their flat index (row * cols + col).
+
+    Properties
+    ----------
+    cols : int
+        the number of cols
+
+    rows : int
+        the number of rows
+
+    data : bytearray
+        the rgb values for all the cells, 3 bytes per cell
+
+    contrast : bytearray
+        the contrasted grey value for all the cells, 1 byte per cell
+
+    indexes : bytearray
+        the palette index of each cell, 1 byte per cell, or None if the raster wasn't filled from a palette
+
+    table : [(tuple, int)]
+        the rgb values and the contrasted grey value of each palette index, or None if the raster wasn't filled from a
+        palette
+
+    Methods
+    -------
+    rgb(index: int) -> tuple
+        returns the (r, g, b) tuple for the cell
+
+    contrasted_rgb(index: int) -> tuple
+        returns the (r, g, b) tuple for the color contrasting with the cell's color
+
+    color(index: int) -> Color
+        returns the cell's color as RGBAColor
+
+    set_color(index: int, color: Color)
+        sets the cell's color
+
+    fill(data: bytes, contrast: bytes)
+        replaces the content of all cells at once
+
+    fill_indexed(indexes: bytes, table: [tuple], contrast_table: bytes)
+        replaces the content of all cells at once with the colors of a palette
+
+    """
+
+    @property
+    def cols(self) -> int:
+        return self._cols
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def data(self) -> bytearray:
+        return self._data
+
+    @property
+    def contrast(self) -> bytearray:
+        return self._contrast
+
+    @property
+    def indexes(self) -> bytearray:
+        return self._indexes
+
+    @property
+    def table(self) -> [(tuple, int)]:
+        return self._table
+
+    def __init__(self, cols: int, rows: int):
+        """
+        :param int cols: the number of cols
+        :param int rows: the number of rows
+        """
+        self._cols = cols
+        self._rows = rows
+        self._data = bytearray(cols * rows * 3)
+        self._contrast = bytearray(cols * rows)
+        self._indexes = None
+        self._table = None
+
+    def __len__(self):
+        return self._cols * self._rows
+
+    def __repr__(self):
+        return "ColorRaster({0}x{1})".format(self._cols, self._rows)
+
+    def rgb(self, index: int) -> tuple:
+        """
+        Returns the rgb values of the cell's color as tuple.
+
+        :param int index: the flat index of the cell
+        :return: tuple
+        """
+        return tuple(self._data[index * 3:index * 3 + 3])
+
+    def contrasted_rgb(self, index: int) -> tuple:
+        """
+        Returns the rgb values of the black or white color contrasting with the cell's color.
+
+        :param int index: the flat index of the cell
+        :return: tuple
+        """
+        value = self._contrast[index]
+        return value, value, value
+
+    def color(self, index: int) -> Color:
+        """
+        Returns the cell's color.
+
+        :param int index: the flat index of the cell
+        :return: Color
+        """
+        return RGBAColor(*self.rgb(index))
+
+    def set_color(self, index: int, color: Color):
+        """
+        Sets the cell's color.
+
+        :param int index: the flat index of the cell
+        :param Color color: the color
+        """
+        self._data[index * 3:index * 3 + 3] = bytes(color.tuple())
+        self._contrast[index] = color.contrasted_color().tuple()[0]
+        self._indexes = None
+        self._table = None
+
+    def fill(self, data: bytes, contrast: bytes = None):
+        """
+        Replaces the colors of all the cells.
+
+        :param bytes data: the rgb values, 3 bytes per cell
+        :param bytes contrast: the contrasted grey values, 1 byte per cell. Calculated from data if not provided.
+        :raises ValueException: if the length of data or contrast doesn't match the number of cells
+        """
+        if len(data) != len(self._data) or (contrast is not None and len(contrast) != len(self._contrast)):
+            raise ValueException(len(data), "The color data doesn't match the raster size")
+        self._data[:] = data
+        if contrast is None:
+            contrast = bytes(0 if r + g + b > 384 else 255 for r, g, b in zip(data[0::3], data[1::3], data[2::3]))
+        self._contrast[:] = contrast
+        self._indexes = None
+        self._table = None
+
+    def fill_indexed(self, indexes: bytes, table: [tuple], contrast_table: bytes = None):
+        """
+        Replaces the colors of all the cells with the colors of a palette. The indexes are kept along with the table
+        of the palette colors, and the rgb and contrast values of the cells are expanded from the table with
+        bytes.translate, one channel at a time.
+
+        :param bytes indexes: the palette index of each cell, 1 byte per cell
+        :param [tuple] table: the rgb values of each palette color, at most 256
+        :param bytes contrast_table: the contrasted grey value of each palette color. Calculated from table if not
+        provided.
+        :raises ValueException: if the length of indexes doesn't match the number of cells, or some index isn't in the
+        table
+        """
+        if len(indexes) != len(self._contrast):
+            raise ValueException(len(indexes), "The color indexes don't match the raster size")
+        if not 0 < len(table) <= 256 or (len(indexes) > 0 and max(indexes) >= len(table)):
+            raise ValueException(len(table), "The color indexes don't match the palette table")
+        if contrast_table is None:
+            contrast_table = bytes(0 if r + g + b > 384 else 255 for r, g, b in table)
+        padding = bytes(256 - len(table))
+        for channel in range(3):
+            self._data[channel::3] = indexes.translate(bytes(rgb[channel] for rgb in table) + padding)
+        self._contrast[:] = indexes.translate(bytes(contrast_table) + padding)
+        self._indexes = bytearray(indexes)
+        self._table = [(tuple(rgb), value) for rgb, value in zip(table, contrast_table)]
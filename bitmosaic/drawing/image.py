@@ -20,13 +20,19 @@ from enum import Enum
 from enum import auto
 from PIL import Image
 from PIL import ImageDraw
-from PIL import ImageFont
+from bitmosaic.drawing.cache import load_font
+from bitmosaic.drawing.cache import warm_fonts
 from bitmosaic.drawing.color import Color
 from bitmosaic.drawing.color import RGBAColor
+from bitmosaic.drawing.png import PNGWriter
+from bitmosaic.drawing.render import RenderSpec
+from bitmosaic.drawing.render import render_bands
+from bitmosaic.drawing.render import render_image
 from bitmosaic.core.matrix import Point
 from bitmosaic.core.mosaic import Mosaic
-from bitmosaic.core.mosaic import Tessera
 from bitmosaic.core.secret import Recovery
+from bitmosaic.core.serializer import write_binary
+from bitmosaic.core.serializer import write_txt
 
 
 class Margin:
@@ -76,6 +82,14 @@ class Bitmosaic:
         the tessera's border's color
     coordinates : bool
         indicates if the tessera content should show the tessera's coordinates
+    processes : int
+        the number of processes rendering the image in bands, default is 1 (no process pool)
+    stream_rows : int
+        the number of tessera rows rendered at a time when the image is streamed to the png file, so the whole image is
+        never in memory. Default is 0, the image is rendered in memory and saved with Pillow
+    use_palette : bool
+        indicates if the image is saved as a palette image (one byte per pixel) when the mosaic has few colors, as
+        with a PaletteFiller
 
     Properties
     ----------
@@ -99,6 +113,9 @@ class Bitmosaic:
     save():
         saves the bitmosaic image and extra files (when needed)
 
+    warm_fonts():
+        loads the fonts used by the bitmosaic in the font cache
+
     """
 
     mode = "RGB"
@@ -109,6 +126,9 @@ class Bitmosaic:
     tessera_border_width = 1
     tessera_border_color = RGBAColor(50, 50, 50)
     coordinates = True
+    processes = 1
+    stream_rows = 0
+    use_palette = True
 
     @property
     def border_correction(self) -> int:
@@ -153,55 +173,85 @@ class Bitmosaic:
     def __str__(self):
         return str(self._mosaic)
 
-    def save(self, bitmosaic_txt=True, recovery_txt = True, recovery_cards=True):
+    def save(self, bitmosaic_txt=True, recovery_txt = True, recovery_cards=True, bitmosaic_bin=False):
         """
         Saves the files for the bitmosaic.
 
         :param bool bitmosaic_txt: to save the bitmosaic as text file.
         :param bool recovery_txt: to save the recovery info as text file.
         :param bool recovery_cards: to save the recovery cards.
+        :param bool bitmosaic_bin: to save the bitmosaic as binary container.
         """
         self.__draw()
         self.__save_txt(bitmosaic=bitmosaic_txt, recovery=recovery_txt)
+        if bitmosaic_bin:
+            write_binary(self._mosaic.matrix, util.get_output_directory("bitmosaic.bin"))
         if recovery_cards:
             self.__save_recovery_cards()
 
-    def __draw(self):
+    @classmethod
+    def warm_fonts(cls):
         """
-        Draws an saves a bitmosaic png file.
+        Loads the fonts used by the bitmosaic image and the recovery cards in the font cache, so the first build
+        doesn't have to wait for them.
         """
-        size = (self.width, self.height)
+        content_size = round((cls.tessera_side - cls.tessera_border_width * 2) / 10)
+        card_size = cls.__card_font_size(round(2.5 * 150))
+        warm_fonts(util.get_fonts_directory("Code2003-W8nn.ttf"), [content_size, card_size])
 
-        image = Image.new(self.mode, size, self.color.tuple())
-        draw = ImageDraw.Draw(image, self.mode)
+    @staticmethod
+    def __card_font_size(width: int) -> int:
+        """
+        Returns the font size for a recovery card.
 
-        font_file = util.get_fonts_directory("Code2003-W8nn.ttf")
-        font = ImageFont.truetype(font_file, round((self.tessera_side - self.tessera_border_width * 2) / 10))
+        :param int width: the card width in pixels.
+        :return: int
+        """
+        return round(width / 25)
 
-        for col in range(self.cols):
-            for row in range(self.rows):
-                tessera = self._mosaic.get_tessera(Point(col, row))
-                color = self._mosaic.get_color(Point(col, row))
-                self.__draw_in_content(tessera, color, draw, font)
+    def __draw(self):
+        """
+        Draws an saves a bitmosaic png file.
+        """
+        spec = self.__render_spec()
+        file = util.get_output_directory("bitmosaic.png")
+        if self.stream_rows > 0:
+            with PNGWriter(file, spec.width, spec.height, mode=spec.output_mode, dpi=(self.dpi, self.dpi),
+                           palette=spec.palette) as writer:
+                for _, band in render_bands(spec, spec.bands(self.stream_rows), processes=self.processes):
+                    writer.write(band)
+        else:
+            image = render_image(spec, processes=self.processes)
+            image.save(str(file), dpi=(self.dpi, self.dpi))
 
-        if self.framed:
-            for col in range(-1, self.cols - 1):
-                self.__draw_in_frame(col, 0, FramePosition.top, draw, font)
-                self.__draw_in_frame(col, self.rows, FramePosition.bottom, draw, font)
-            for row in range(0, self.rows - 2):
-                self.__draw_in_frame(0, row, FramePosition.left, draw, font)
-                self.__draw_in_frame(self.cols, row, FramePosition.right, draw, font)
+    def __render_spec(self) -> RenderSpec:
+        """
+        Returns the description of the bitmosaic image used to render it.
 
-        file = util.get_output_directory("bitmosaic.png")
-        image.save(str(file), dpi=(self.dpi, self.dpi))
+        :return: RenderSpec
+        """
+        def color_tuple(color: Color):
+            return None if color is None else color.tuple()
+
+        spec = RenderSpec(cols=self._mosaic.cols, rows=self._mosaic.rows, records=self._mosaic.matrix.records(),
+                          colors=self._mosaic.colors, font_path=str(util.get_fonts_directory("Code2003-W8nn.ttf")),
+                          mode=self.mode, color=self.color.tuple(), framed=self.framed,
+                          tessera_side=self.tessera_side, tessera_border_width=self.tessera_border_width,
+                          tessera_border_color=color_tuple(self.tessera_border_color), coordinates=self.coordinates,
+                          margin=(Margin.top, Margin.right, Margin.bottom, Margin.left),
+                          frame_color=color_tuple(Frame.color), frame_border_width=Frame.border_width,
+                          frame_border_color=color_tuple(Frame.border_color),
+                          frame_text_color=color_tuple(Frame.text_color), frame_show_text=Frame.show_text)
+        if self.use_palette:
+            spec.palette = spec.bounded_palette()
+        return spec
 
     def __save_txt(self, bitmosaic=True, recovery=True):
         """
         Saves the bitmosaic as txt file and the recovery info for the mosaic's secrets.
         """
         if bitmosaic:
-            with open(util.get_output_directory("bitmosaic.txt"), "w", encoding="utf-8") as file:
-                file.write(str(self))
+            write_txt(self._mosaic.matrix, util.get_output_directory("bitmosaic.txt"))
 
         if recovery:
             for recovery_info in self._mosaic.recoveries:
@@ -216,78 +266,6 @@ class Bitmosaic:
         for recovery_info in self._mosaic.recoveries:
             self.__draw_recovery_card(recovery_info)
 
-    def __draw_in_content(self, tessera: Tessera, color: Color, draw: ImageDraw, font: ImageFont):
-        """
-        Draws a tessera in the content zone of the bitmosaic image.
-
-        :param Tessera tessera: the tessera to draw.
-        :param Color color: the image background color.
-        :param ImageDraw draw: the image draw where the tessera will be drawn.
-        :param ImageFont font: the font used to write the tessera's content.
-        """
-        # Drawing the border
-        border_start = self.__point_in_content(tessera.position)
-        border_end = border_start + Point(self.tessera_side - 1, self.tessera_side - 1)
-        border_color = self.tessera_border_color.tuple() or None
-        draw.rectangle([border_start.tuple(), border_end.tuple()], border_color)
-
-        # Drawing the fill
-        border_point = Point(self.tessera_border_width, self.tessera_border_width)
-        fill_start = border_start + border_point if self.tessera_border_color is not None else border_start
-        fill_end = border_end - border_point if self.tessera_border_color is not None else border_end
-        fill_color = color.tuple() or None
-        draw.rectangle([fill_start.tuple(), fill_end.tuple()], fill_color)
-
-        # Drawing the tessera content
-        text = "{0}\n\n{1}\n\n{2}".format(tessera.position if self.coordinates else "", tessera.data,
-                                          tessera.v2_point.labels())
-        text_size = draw.multiline_textbbox((fill_start.x, fill_start.y), text, font)
-        text_x = fill_start.x + self.tessera_side / 2 - self.tessera_border_width - (text_size[2] - text_size[0]) / 2
-        text_y = fill_start.y + self.tessera_side / 2 - self.tessera_border_width - (text_size[3] - text_size[1]) / 2
-        text_point = Point(text_x, text_y)
-        text_color = color.contrasted_color().tuple() or None
-        draw.multiline_text(text_point.tuple(), text, fill=text_color, font=font, align="center")
-
-    def __draw_in_frame(self, col: int, row: int, position: FramePosition, draw: ImageDraw, font: ImageFont):
-        """
-        Draws a tessera in the frame zone of the bitmosaic image.
-
-        :param int col: the col for the tessera.
-        :param int row: the row for the tessera.
-        :param FramePosition position: the position in the frame.
-        :param ImageDraw draw: the image draw where the tessera will be drawn.
-        :param ImageFont font: the font used to write the tessera's content.
-        """
-        # Drawing the border
-        border_start = self.__point_in_frame(Point(col, row), position)
-        border_end = border_start + Point(self.tessera_side - 1, self.tessera_side - 1)
-        border_color = None if Frame.border_color is None else Frame.border_color.tuple()
-        draw.rectangle([border_start.tuple(), border_end.tuple()], border_color)
-
-        # Drawing the fill
-        border_point = Point(Frame.border_width, Frame.border_width)
-        fill_start = border_start + border_point if Frame.border_color is not None else border_start
-        fill_end = border_end - border_point if Frame.border_color is not None else border_end
-        background_color = None if Frame.color is None else Frame.color.tuple()
-        draw.rectangle([fill_start.tuple(), fill_end.tuple()], background_color)
-
-        # Drawing the tessera content
-        if Frame.show_text:
-            if col == -1 or col == self.cols - 2:
-                text = ""
-            else:
-                text = "\n\n{0}\n\n".format(
-                    col if position == FramePosition.top or position == FramePosition.bottom else row)
-
-            text_size = draw.multiline_textbbox((fill_start.x, fill_start.y), text, font)
-            text_x = fill_start.x + self.tessera_side / 2 - self.tessera_border_width - (
-                        text_size[2] - text_size[0]) / 2
-            text_y = fill_start.y + self.tessera_side / 2 - self.tessera_border_width - (
-                        text_size[3] - text_size[1]) / 2
-            text_point = Point(text_x, text_y)
-            text_color = None if Frame.text_color is None else Frame.text_color.tuple()
-            draw.multiline_text(text_point.tuple(), text, fill=text_color, font=font, align="center")
-
     def __draw_recovery_card(self, recovery_info: Recovery, dpi=150, width_inches=2.5, height_inches=3.5):
         """
         Saves the recovery info as image.
@@ -306,8 +284,7 @@ class Bitmosaic:
         background_color = RGBAColor(255, 255, 255)
         image = Image.new(mode, size, background_color.tuple())
         draw = ImageDraw.Draw(image, mode)
-        font_file = util.get_fonts_directory("Code2003-W8nn.ttf")
-        font = ImageFont.truetype(font_file, round(width / 25))
+        font = load_font(util.get_fonts_directory("Code2003-W8nn.ttf"), self.__card_font_size(width))
 
         border_start = Point(border_margin, border_margin)
         border_end = Point(width - border_margin, height - border_margin)
@@ -331,40 +308,3 @@ class Bitmosaic:
         draw.multiline_text(text_point.tuple(), text, fill=text_color.tuple(), font=font, align="center")
         image.save(util.get_output_directory("recovery_{0}.png".format(recovery_info.name).replace(" ", "_")),
                    dpi=(dpi, dpi))
-
-    def __point_in_frame(self, point: Point, position: FramePosition) -> Point:
-        """
-        Gets the x and y image coordinates for a point in the frame
-
-        :param Point point: the point.
-        :param FramePosition position: the position in the frame.
-        :return: Point
-        """
-        if position == FramePosition.top:
-            x = Margin.left + point.x * self.tessera_side + self.tessera_side + self.border_correction
-            y = Margin.top + point.y + self.border_correction
-        elif position == FramePosition.right:
-            x = self.width - Margin.right - self.tessera_side - self.border_correction
-            y = Margin.top + point.y * self.tessera_side + self.tessera_side + self.border_correction
-        elif position == FramePosition.bottom:
-            x = Margin.left + point.x * self.tessera_side + self.tessera_side + self.border_correction
-            y = self.height - Margin.bottom - self.tessera_side - self.border_correction
-        else:
-            x = Margin.left + self.border_correction
-            y = Margin.top + point.y * self.tessera_side + self.tessera_side + self.border_correction
-        return Point(x, y)
-
-    def __point_in_content(self, point: Point) -> Point:
-        """
-        Gets the x and y image coordinates for a point in the image content (not frame)
-
-        :param Point point: the point.
-        :return: Point
-        """
-        x = Margin.left + self.border_correction + (self.tessera_side if self.framed else 0) + point.x * self.tessera_side
-        y = Margin.top + self.border_correction + (self.tessera_side if self.framed else 0) + point.y * self.tessera_side
-        return Point(x, y)
-
-
-
-
@@ -0,0 +1,187 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# png.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic. If not, see <https://www.gnu.org/licenses/>.
+
+import struct
+import zlib
+from PIL import Image
+from PIL import ImageChops
+from bitmosaic.exception import InvalidFormatException
+from bitmosaic.exception import ValueException
+
+
+class PNGWriter:
+    """
+    Writes a png file band by band, so the whole image is never in memory. Pillow needs the whole image to save it as
+    png, so the file is written here: the rows of each band are filtered, compressed in a single zlib stream and
+    written as IDAT chunks as soon as there is enough compressed data.
+
+    Every row uses the Up filter (the difference with the row above), which is computed for the whole band at once
+    with ImageChops. The rows inside a tessera are almost equal, so most of the filtered bytes are zero.
+
+    Properties
+    ----------
+    width : int
+        the image width
+
+    height : int
+        the image height
+
+    mode : str
+        the image mode: L, P, RGB or RGBA
+
+    rows_written : int
+        the number of rows already written
+
+    Methods
+    -------
+    write(band: Image)
+        appends the rows of the band to the image
+
+    close()
+        finishes the png file, all the rows must be written before
+
+    """
+
+    _signature = b"\x89PNG\r\n\x1a\n"
+    _color_types = {"L": 0, "P": 3, "RGB": 2, "RGBA": 6}
+    _up_filter = b"\x02"
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def rows_written(self) -> int:
+        return self._rows_written
+
+    def __init__(self, file_path, width: int, height: int, mode: str = "RGB", dpi: tuple = None,
+                 palette: [tuple] = None, compress_level: int = 6, chunk_size: int = 1 << 20):
+        """
+        :param file_path: the path of the png file.
+        :param int width: the image width.
+        :param int height: the image height.
+        :param str mode: the image mode: L, P, RGB or RGBA.
+        :param tuple dpi: the horizontal and vertical resolution saved in the file, None to not save it.
+        :param [tuple] palette: the rgb colors of a P image, at most 256.
+        :param int compress_level: the zlib compression level.
+        :param int chunk_size: the size of the compressed data written in each IDAT chunk.
+        :raises InvalidFormatException: if the mode is not supported or a P image doesn't have a valid palette.
+        """
+        if mode not in self._color_types:
+            raise InvalidFormatException(mode, "The png writer supports L, P, RGB and RGBA images")
+        if mode == "P" and (palette is None or not 0 < len(palette) <= 256):
+            raise InvalidFormatException(palette, "A P image needs a palette with 1 to 256 colors")
+        self._width = width
+        self._height = height
+        self._mode = mode
+        self._rows_written = 0
+        self._chunk_size = chunk_size
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._previous_row = Image.new(mode, (width, 1))
+        self._file = open(file_path, "wb")
+        self._file.write(self._signature)
+        self.__write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, self._color_types[mode], 0, 0, 0))
+        if mode == "P":
+            self.__write_chunk(b"PLTE", bytes(value for color in palette for value in color[:3]))
+        if dpi is not None:
+            # The same rounding Pillow uses, so the dpi read back is the same as with Image.save
+            self.__write_chunk(b"pHYs", struct.pack(">IIB", int(dpi[0] / 0.0254 + 0.5), int(dpi[1] / 0.0254 + 0.5), 1))
+
+    def __repr__(self):
+        return "PNGWriter({0}x{1} {2}, {3} rows written)".format(self._width, self._height, self._mode,
+                                                                 self._rows_written)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def __write_chunk(self, chunk_type: bytes, data: bytes):
+        """
+        Writes a png chunk.
+
+        :param bytes chunk_type: the four letters of the chunk type.
+        :param bytes data: the chunk data.
+        """
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def __flush(self, final: bool = False):
+        """
+        Writes the pending compressed data in IDAT chunks.
+
+        :param bool final: to write the data even if it doesn't fill a chunk.
+        """
+        while len(self._pending) >= self._chunk_size or (final and len(self._pending) > 0):
+            self.__write_chunk(b"IDAT", bytes(self._pending[:self._chunk_size]))
+            del self._pending[:self._chunk_size]
+
+    def write(self, band: Image):
+        """
+        Appends the rows of the band to the image.
+
+        :param Image band: the band, with the image width and mode.
+        :raises ValueException: if the band doesn't fit in the image.
+        """
+        if band.mode != self._mode or band.width != self._width:
+            raise ValueException(band.size, "The band must have the mode and the width of the image")
+        if self._rows_written + band.height > self._height:
+            raise ValueException(band.height, "The band exceeds the image height")
+        if band.height == 0:
+            return
+
+        above = Image.new(self._mode, band.size)
+        above.paste(self._previous_row, (0, 0))
+        above.paste(band.crop((0, 0, self._width, band.height - 1)), (0, 1))
+        filtered = ImageChops.subtract_modulo(band, above).tobytes()
+        stride = len(filtered) // band.height
+        self._pending += self._compressor.compress(
+            b"".join(self._up_filter + filtered[start:start + stride] for start in range(0, len(filtered), stride)))
+        self._previous_row = band.crop((0, band.height - 1, self._width, band.height))
+        self._rows_written += band.height
+        self.__flush()
+
+    def close(self):
+        """
+        Finishes the png file, all the rows must be written before.
+
+        :raises ValueException: if some rows are not written.
+        """
+        if self._file.closed:
+            return
+        if self._rows_written != self._height:
+            self._file.close()
+            raise ValueException(self._rows_written, "Not all the rows of the image were written")
+        self._pending += self._compressor.flush()
+        self.__flush(final=True)
+        self.__write_chunk(b"IEND", b"")
+        self._file.close()
@@ -0,0 +1,759 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# render.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic. If not, see <https://www.gnu.org/licenses/>.
+
+import math
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from PIL import ImageDraw
+from bitmosaic.core.mosaic import TesseraMatrix
+from bitmosaic.drawing.cache import TextCache
+from bitmosaic.drawing.cache import load_font
+from bitmosaic.drawing.color import ColorRaster
+
+
+class RenderSpec:
+    """
+    Describes a bitmosaic image with plain values: the mosaic records, the colors raster and the style. It doesn't
+    keep references to the mosaic or to the font, so it can be sent to other processes to render bands of the image.
+
+    The colors are tuples (or None to skip the drawing, as ImageDraw does) and the margin is the tuple (top, right,
+    bottom, left).
+
+    When the spec has a palette, the bands are drawn with the indexes of the palette colors, so the rendered image is a
+    palette (P mode) image with one byte per pixel.
+
+    Properties
+    ----------
+    width : int
+        the image width
+
+    height : int
+        the image height
+
+    font_size : int
+        the size of the font used to write the tesserae content
+
+    output_mode : str
+        the mode of the rendered image, P when the spec has a palette
+
+    Methods
+    -------
+    bands(rows_per_band: int) -> [(int, int)]
+        returns the top and bottom of the bands with the height of rows_per_band tesserae covering the image
+
+    bounded_palette(max_colors: int) -> [tuple]
+        returns the palette for the colors used by the image, or None if it uses more than max_colors colors
+
+    """
+
+    def __init__(self, cols: int, rows: int, records: tuple, colors: ColorRaster, font_path: str, mode: str = "RGB",
+                 color: tuple = (255, 153, 0), framed: bool = True, tessera_side: int = 150,
+                 tessera_border_width: int = 1, tessera_border_color: tuple = (50, 50, 50), coordinates: bool = True,
+                 margin: tuple = (20, 20, 20, 20), frame_color: tuple = (60, 60, 60), frame_border_width: int = 1,
+                 frame_border_color: tuple = (50, 50, 50), frame_text_color: tuple = (255, 255, 255),
+                 frame_show_text: bool = True, background_pass: bool = True, palette: [tuple] = None):
+        """
+        :param int cols: the number of cols of the mosaic.
+        :param int rows: the number of rows of the mosaic.
+        :param tuple records: the words table, the word indexes and the label codes of the mosaic's matrix.
+        :param ColorRaster colors: the mosaic's colors.
+        :param str font_path: the path of the font file.
+        :param str mode: the image mode.
+        :param tuple color: the background color for the image.
+        :param bool framed: indicates if the bitmosaic has a frame with col and row numbers.
+        :param int tessera_side: the side in pixels for the tessera.
+        :param int tessera_border_width: the width in pixels for the tessera border.
+        :param tuple tessera_border_color: the tessera's border's color.
+        :param bool coordinates: indicates if the tessera content should show the tessera's coordinates.
+        :param tuple margin: the top, right, bottom and left margins.
+        :param tuple frame_color: the background color for the frame tesserae.
+        :param int frame_border_width: the width in pixels for the frame tesserae border.
+        :param tuple frame_border_color: the frame tesserae border's color.
+        :param tuple frame_text_color: the color for the frame tesserae text.
+        :param bool frame_show_text: indicates if the frame tesserae show the col and row numbers.
+        :param bool background_pass: to draw the backgrounds of all the tesserae at once when it's possible.
+        :param [tuple] palette: the colors of the palette image, None to render an image of the mode.
+        """
+        words, word_data, label_data = records
+        self.cols = cols
+        self.rows = rows
+        self.words = list(words)
+        self.word_data = array(word_data.typecode, word_data)
+        self.label_data = array(label_data.typecode, label_data)
+        self.colors = colors
+        self.font_path = str(font_path)
+        self.mode = mode
+        self.color = color
+        self.framed = framed
+        self.tessera_side = tessera_side
+        self.tessera_border_width = tessera_border_width
+        self.tessera_border_color = tessera_border_color
+        self.coordinates = coordinates
+        self.margin = margin
+        self.frame_color = frame_color
+        self.frame_border_width = frame_border_width
+        self.frame_border_color = frame_border_color
+        self.frame_text_color = frame_text_color
+        self.frame_show_text = frame_show_text
+        self.background_pass = background_pass
+        self.palette = palette
+
+    def __repr__(self):
+        return "RenderSpec({0}x{1}, {2}x{3} pixels)".format(self.cols, self.rows, self.width, self.height)
+
+    @property
+    def border_correction(self) -> int:
+        return self.frame_border_width if self.framed else self.tessera_border_width
+
+    @property
+    def image_cols(self) -> int:
+        return self.cols + (2 if self.framed else 0)
+
+    @property
+    def image_rows(self) -> int:
+        return self.rows + (2 if self.framed else 0)
+
+    @property
+    def width(self) -> int:
+        return self.margin[3] + self.margin[1] + self.image_cols * self.tessera_side + self.border_correction * 2
+
+    @property
+    def height(self) -> int:
+        return self.margin[0] + self.margin[2] + self.image_rows * self.tessera_side + self.border_correction * 2
+
+    @property
+    def font_size(self) -> int:
+        return round((self.tessera_side - self.tessera_border_width * 2) / 10)
+
+    @property
+    def output_mode(self) -> str:
+        return "P" if self.palette is not None else self.mode
+
+    def bounded_palette(self, max_colors: int = 64) -> [tuple]:
+        """
+        Returns the palette for the colors used by the image, or None if it uses more than max_colors colors (for
+        example, the colors of a picture) or it isn't an rgb image.
+
+        The palette has the colors of the image background, the tesserae and the frame, and their text colors. The
+        antialiased text blends its color with the tessera's color, so the rest of the 256 colors are shared among
+        the blends of each pair of tessera and text colors.
+
+        :param int max_colors: the maximum number of colors of the tesserae, the frame and their texts.
+        :return: [tuple]
+        """
+        style = [self.color, self.tessera_border_color]
+        if self.framed:
+            style += [self.frame_color, self.frame_border_color, self.frame_text_color]
+        if self.mode != "RGB" or None in style:
+            return None
+
+        if self.colors.table is not None:
+            # The raster was filled from a palette, so its colors are the ones of the table
+            text_pairs = dict(self.colors.table)
+        else:
+            data = self.colors.data
+            contrast = self.colors.contrast
+            text_pairs = {}
+            for index in range(len(contrast)):
+                text_pairs[bytes(data[index * 3:index * 3 + 3])] = contrast[index]
+                if len(text_pairs) > max_colors:
+                    return None
+        if len(text_pairs) > max_colors:
+            return None
+        text_pairs = [(tuple(rgb), (value, value, value)) for rgb, value in text_pairs.items()]
+        if self.framed and self.frame_show_text:
+            text_pairs.append((self.frame_color, self.frame_text_color))
+
+        palette = list(dict.fromkeys(style + [color for pair in text_pairs for color in pair]))
+        if len(palette) > max_colors:
+            return None
+        levels = (256 - len(palette)) // len(text_pairs)
+        colors = set(palette)
+        for background, text in text_pairs:
+            for level in range(1, levels + 1):
+                alpha = level / (levels + 1)
+                blend = tuple(round(b + (t - b) * alpha) for b, t in zip(background, text))
+                if blend not in colors:
+                    colors.add(blend)
+                    palette.append(blend)
+        return palette
+
+    def bands(self, rows_per_band: int) -> [(int, int)]:
+        """
+        Returns the top and bottom of the bands with the height of rows_per_band tesserae covering the image.
+
+        :param int rows_per_band: the number of tessera rows in each band.
+        :return: [(int, int)]
+        """
+        band_height = max(1, rows_per_band) * self.tessera_side
+        return [(top, min(top + band_height, self.height)) for top in range(0, self.height, band_height)]
+
+
+class PaletteCanvas:
+    """
+    Draws in a palette (P mode) image with rgb colors, through the part of the ImageDraw interface that the band
+    renderer uses. The colors are drawn with their index in the palette, so the colors of the palette are exact.
+
+    The antialiased text can't be blended in the image, since its pixels are palette indexes. For each pair of the
+    color under the text and the text color, a table with a palette color for each one of the 256 blends of the two
+    is built, and the alpha mask of the text is mapped through it. The palette colors between the two (the blend
+    levels of the pair) are used when there are some, so an edge only takes the colors of its gradient, and the
+    nearest palette color otherwise.
+
+    Properties
+    ----------
+    image : Image
+        the palette image
+
+    Methods
+    -------
+    index(color: tuple) -> int
+        returns the index of the color in the palette, or the index of the nearest color if it isn't in the palette
+
+    index_bytes(rgb: bytes) -> bytes
+        returns the palette index of each color of the rgb values
+
+    rectangle(xy: list, fill: tuple)
+        draws a filled rectangle
+
+    bitmap(xy: tuple, bitmap: Image, fill: tuple)
+        draws the fill color with the alpha mask of the bitmap
+
+    """
+
+    @property
+    def image(self) -> Image:
+        return self._image
+
+    def __init__(self, size: tuple, palette: [tuple], color: tuple, previous: 'PaletteCanvas' = None):
+        """
+        :param tuple size: the image size.
+        :param [tuple] palette: the rgb colors of the palette, at most 256.
+        :param tuple color: the background color of the image.
+        :param PaletteCanvas previous: a canvas with the same palette, whose color lookups are reused.
+        """
+        self._palette = [tuple(palette_color[:3]) for palette_color in palette]
+        if previous is not None and previous._palette == self._palette:
+            self._indexes = previous._indexes
+            self._tables = previous._tables
+        else:
+            self._indexes = {}
+            for index, palette_color in enumerate(self._palette):
+                self._indexes.setdefault(palette_color, index)
+            self._tables = {}
+        self._image = Image.new("P", size, self.index(color))
+        self._image.putpalette([value for palette_color in self._palette for value in palette_color])
+        self._draw = ImageDraw.Draw(self._image)
+
+    def __repr__(self):
+        return "PaletteCanvas({0}x{1}, {2} colors)".format(self._image.width, self._image.height, len(self._palette))
+
+    def index(self, color: tuple) -> int:
+        """
+        Returns the index of the color in the palette, or the index of the nearest color if it isn't in the palette.
+
+        :param tuple color: the rgb values of the color.
+        :return: int
+        """
+        color = tuple(color[:3])
+        index = self._indexes.get(color)
+        if index is None:
+            index = min(range(len(self._palette)),
+                        key=lambda candidate: sum((a - b) ** 2 for a, b in zip(self._palette[candidate], color)))
+            self._indexes[color] = index
+        return index
+
+    def index_bytes(self, rgb: bytes) -> bytes:
+        """
+        Returns the palette index of each color of the rgb values.
+
+        :param bytes rgb: the rgb values, 3 bytes per color.
+        :return: bytes
+        """
+        return bytes(self.index(tuple(rgb[start:start + 3])) for start in range(0, len(rgb), 3))
+
+    def rectangle(self, xy: list, fill: tuple):
+        """
+        Draws a filled rectangle.
+
+        :param list xy: the top left and bottom right corners of the rectangle.
+        :param tuple fill: the rgb values of the color.
+        """
+        self._draw.rectangle(xy, self.index(fill))
+
+    def bitmap(self, xy: tuple, bitmap: Image, fill: tuple):
+        """
+        Draws the fill color with the alpha mask of the bitmap, as ImageDraw.bitmap does.
+
+        :param tuple xy: the position of the top left corner of the bitmap.
+        :param Image bitmap: the alpha mask, an L image.
+        :param tuple fill: the rgb values of the color.
+        """
+        x, y = xy
+        box = (max(0, x), max(0, y), min(self._image.width, x + bitmap.width),
+               min(self._image.height, y + bitmap.height))
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return
+        mask = bitmap.crop((box[0] - x, box[1] - y, box[2] - x, box[3] - y))
+        region = self._image.crop(box)
+        text = self.index(fill)
+        under_colors = region.getcolors(256)
+        for _, under in under_colors:
+            piece = Image.frombytes("P", mask.size, mask.point(self.__table(under, text)).tobytes())
+            if len(under_colors) == 1:
+                self._image.paste(piece, box[:2])
+            else:
+                selection = Image.frombytes("L", region.size, region.tobytes())
+                self._image.paste(piece, box[:2], selection.point([255 if index == under else 0
+                                                                   for index in range(256)]))
+
+    def __table(self, under: int, text: int) -> [int]:
+        """
+        Returns the table with the palette index for each alpha value of the text, drawn over the color under it.
+
+        :param int under: the palette index of the color under the text.
+        :param int text: the palette index of the text color.
+        :return: [int]
+        """
+        table = self._tables.get((under, text))
+        if table is None:
+            levels = self.__levels(under, text)
+            if len(levels) > 2:
+                # The level with the nearest alpha is the nearest one, since all of them are on the same line
+                table = []
+                position = 0
+                for alpha in range(256):
+                    while position + 1 < len(levels) and \
+                            levels[position + 1][0] - alpha / 255 < alpha / 255 - levels[position][0]:
+                        position += 1
+                    table.append(levels[position][1])
+            else:
+                # The blends as ImageDraw.bitmap computes them
+                background = self._palette[under]
+                ink = self._palette[text]
+                table = []
+                for alpha in range(256):
+                    blend = []
+                    for b, t in zip(background, ink):
+                        value = b * (255 - alpha) + t * alpha + 128
+                        blend.append(((value >> 8) + value) >> 8)
+                    table.append(self.index(tuple(blend)))
+            self._tables[(under, text)] = table
+        return table
+
+    def __levels(self, under: int, text: int) -> [(float, int)]:
+        """
+        Returns the palette colors between the two colors, as (alpha, index) tuples sorted by alpha. The alpha of a
+        color is the one of the blend of the two colors it matches, allowing for the rounding of the blend.
+
+        :param int under: the palette index of the color under the text.
+        :param int text: the palette index of the text color.
+        :return: [(float, int)]
+        """
+        background = self._palette[under]
+        ink = self._palette[text]
+        channel = max(range(3), key=lambda index: abs(ink[index] - background[index]))
+        span = ink[channel] - background[channel]
+        if span == 0:
+            return [(0.0, under)]
+        levels = {0.0: under, 1.0: text}
+        for index, palette_color in enumerate(self._palette):
+            alpha = (palette_color[channel] - background[channel]) / span
+            if 0 < alpha < 1 and alpha not in levels and \
+                    all(abs(b + (t - b) * alpha - p) <= 1 for b, t, p in zip(background, ink, palette_color)):
+                levels[alpha] = index
+        return sorted(levels.items())
+
+
+class BandRenderer:
+    """
+    Renders horizontal bands of a bitmosaic image.
+
+    Each band is drawn in its own image, translated so its top is at y = 0, with every tessera (content and frame)
+    close enough to the band to touch it, in the same order as the whole image is drawn. The text is positioned with
+    the floor of its coordinates, so translating it by whole pixels doesn't change its rasterization, and stitching the
+    bands gives the same pixels as drawing the whole image at once.
+
+    The borders and fills of the content tesserae are drawn first for the whole band with a few bulk operations, and
+    then the text of each tessera is drawn over them; the frame is drawn in the same way after the content. Drawing
+    each tessera on its own, a tessera's fill covers the text of the tesserae drawn before it that overflows into it,
+    so when a text overflows its tessera, the tesserae it reaches are marked and their border and fill are drawn again
+    just before their text. The result is the same as drawing each tessera on its own, in order.
+
+    Methods
+    -------
+    render(top: int, bottom: int) -> Image
+        returns the band of the image between the top and the bottom rows of pixels
+
+    """
+
+    def __init__(self, spec: RenderSpec):
+        """
+        :param RenderSpec spec: the description of the image.
+        """
+        self._spec = spec
+        self._font = load_font(spec.font_path, spec.font_size)
+        self._text_cache = TextCache(self._font)
+        self._canvas = None
+
+    def __repr__(self):
+        return "BandRenderer({0})".format(self._spec)
+
+    def render(self, top: int, bottom: int) -> Image:
+        """
+        Returns the band of the image between the top and the bottom rows of pixels.
+
+        :param int top: the first row of pixels of the band.
+        :param int bottom: the row of pixels after the last one of the band.
+        :return: Image
+        """
+        spec = self._spec
+        if spec.palette is not None:
+            draw = PaletteCanvas((spec.width, bottom - top), spec.palette, spec.color, previous=self._canvas)
+            self._canvas = draw
+            image = draw.image
+        else:
+            image = Image.new(spec.mode, (spec.width, bottom - top), spec.color)
+            draw = ImageDraw.Draw(image, spec.mode)
+        # Without the background pass, each tessera draws its own border and fill
+        backgrounds = not self.__has_background_pass()
+        # The grid cells (col and row in the image, counting the frame) reached by the text of a tessera drawn before
+        overdrawn = set()
+        if not backgrounds:
+            self.__draw_content_backgrounds(top, bottom, image, draw)
+
+        # The tesserae that are at most one tessera away from the band are drawn, so the text that overflows a
+        # tessera is drawn in the bands it reaches
+        side = spec.tessera_side
+        content_top = spec.margin[0] + spec.border_correction + (side if spec.framed else 0)
+        first_row = max(0, (top - content_top) // side - 1)
+        last_row = min(spec.rows, (bottom - content_top) // side + 2)
+        label_pair = TesseraMatrix.label_pair
+        for col in range(spec.cols):
+            for row in range(first_row, last_row):
+                index = row * spec.cols + col
+                word = spec.word_data[index]
+                data = None if word < 0 else spec.words[word]
+                labels = None if word < 0 else label_pair(spec.label_data[index])
+                self.__draw_in_content(col, row, data, labels, spec.colors.rgb(index),
+                                       spec.colors.contrasted_rgb(index), top, draw, backgrounds, overdrawn)
+
+        if spec.framed:
+            if not backgrounds:
+                self.__draw_frame_backgrounds(top, bottom, draw)
+            for col in range(-1, spec.image_cols - 1):
+                # The corners don't have a number
+                number = None if col == -1 or col == spec.image_cols - 2 else col
+                self.__draw_in_frame(col, spec.margin[0] + spec.border_correction, number, top, bottom, draw,
+                                     backgrounds, overdrawn)
+                self.__draw_in_frame(col, spec.height - spec.margin[2] - side - spec.border_correction, number, top,
+                                     bottom, draw, backgrounds, overdrawn)
+            for row in range(0, spec.image_rows - 2):
+                y = spec.margin[0] + row * side + side + spec.border_correction
+                self.__draw_in_frame(-1, y, row, top, bottom, draw, backgrounds, overdrawn)
+                self.__draw_in_frame(spec.image_cols - 2, y, row, top, bottom, draw, backgrounds, overdrawn)
+        return image
+
+    def __has_background_pass(self) -> bool:
+        """
+        Returns if the backgrounds of the tesserae are drawn with the background pass. The pass needs all the
+        tesserae colors (a None color makes ImageDraw draw an outline with its default ink) and an image mode that
+        takes the rgb values of the colors raster.
+
+        :return: bool
+        """
+        spec = self._spec
+        colors = [spec.tessera_border_color] + ([spec.frame_color, spec.frame_border_color] if spec.framed else [])
+        return spec.background_pass and spec.mode in ("RGB", "RGBA") and None not in colors
+
+    def __draw_content_backgrounds(self, top: int, bottom: int, image: Image, draw: ImageDraw):
+        """
+        Draws the borders and the fills of all the content tesserae in the band at once, instead of two rectangles per
+        tessera. The colors raster of the content rows in the band is upscaled (nearest neighbour) to the tessera
+        side and the borders are drawn as grid lines.
+
+        :param int top: the first row of pixels of the band.
+        :param int bottom: the row of pixels after the last one of the band.
+        :param Image image: the image of the band.
+        :param ImageDraw draw: the image draw of the band, or its PaletteCanvas.
+        """
+        spec = self._spec
+        side = spec.tessera_side
+        offset = spec.border_correction + (side if spec.framed else 0)
+        content_x = spec.margin[3] + offset
+        content_y = spec.margin[0] + offset
+        first_row = min(max(0, (top - content_y) // side), spec.rows)
+        last_row = min(max(0, -(-(bottom - content_y) // side)), spec.rows)
+        if first_row < last_row:
+            rgb = spec.colors.data[first_row * spec.cols * 3:last_row * spec.cols * 3]
+            if spec.palette is not None:
+                raster = Image.frombytes("P", (spec.cols, last_row - first_row), draw.index_bytes(rgb))
+            else:
+                raster = Image.frombytes("RGB", (spec.cols, last_row - first_row), bytes(rgb))
+                if spec.mode != "RGB":
+                    raster = raster.convert(spec.mode)
+            # The raster is only upscaled horizontally, and each one of its rows is pasted in the rows of pixels of the
+            # tessera row in the band, which is faster than upscaling it vertically too
+            strips = raster.resize((spec.cols * side, last_row - first_row), Image.NEAREST)
+            for index in range(last_row - first_row):
+                strip = strips.crop((0, index, strips.width, index + 1))
+                strip_y = content_y + (first_row + index) * side - top
+                for y in range(max(0, strip_y), min(bottom - top, strip_y + side)):
+                    image.paste(strip, (content_x, y))
+            self.__draw_grid(content_x, content_y + first_row * side - top, spec.cols, last_row - first_row,
+                             spec.tessera_border_width, spec.tessera_border_color, draw)
+
+    def __draw_frame_backgrounds(self, top: int, bottom: int, draw: ImageDraw):
+        """
+        Draws the borders and the fills of all the frame tesserae in the band at once: each side of the frame is
+        filled with one rectangle and the borders are drawn as grid lines.
+
+        :param int top: the first row of pixels of the band.
+        :param int bottom: the row of pixels after the last one of the band.
+        :param ImageDraw draw: the image draw of the band.
+        """
+        spec = self._spec
+        side = spec.tessera_side
+        frame_x = spec.margin[3] + spec.border_correction
+        frame_y = spec.margin[0] + spec.border_correction - top
+        bottom_y = spec.height - spec.margin[2] - side - spec.border_correction - top
+        right_x = frame_x + (spec.image_cols - 1) * side
+        for x, y, cols, rows in [(frame_x, frame_y, spec.image_cols, 1), (frame_x, bottom_y, spec.image_cols, 1),
+                                 (frame_x, frame_y + side, 1, spec.rows), (right_x, frame_y + side, 1, spec.rows)]:
+            if rows == 0 or y + rows * side <= 0 or y >= bottom - top:
+                continue
+            draw.rectangle([(x, y), (x + cols * side - 1, y + rows * side - 1)], spec.frame_color)
+            self.__draw_grid(x, y, cols, rows, spec.frame_border_width, spec.frame_border_color, draw)
+
+    def __mark_overdrawn(self, cell: tuple, ink: tuple, top: int, overdrawn: set):
+        """
+        Adds the grid cells, other than the tessera's own cell, that are reached by the text of the tessera to the
+        overdrawn set.
+
+        :param tuple cell: the col and row of the tessera in the image grid.
+        :param tuple ink: the box of the pixels touched by the text in the band, or None.
+        :param int top: the first row of pixels of the band.
+        :param set overdrawn: the grid cells reached by the text of the tesserae drawn before.
+        """
+        if ink is None:
+            return
+        spec = self._spec
+        side = spec.tessera_side
+        grid_x = spec.margin[3] + spec.border_correction
+        grid_y = spec.margin[0] + spec.border_correction - top
+        first_col = (ink[0] - grid_x) // side
+        last_col = (ink[2] - 1 - grid_x) // side
+        first_row = (ink[1] - grid_y) // side
+        last_row = (ink[3] - 1 - grid_y) // side
+        if first_col == last_col == cell[0] and first_row == last_row == cell[1]:
+            return
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                overdrawn.add((col, row))
+        overdrawn.discard(cell)
+
+    def __draw_grid(self, x: int, y: int, cols: int, rows: int, border_width: int, border_color: tuple,
+                    draw: ImageDraw):
+        """
+        Draws the borders of a block of tesserae as grid lines. The border of each tessera is inside the tessera, so
+        the line between two tesserae is two borders wide.
+
+        :param int x: the x coordinate of the block.
+        :param int y: the y coordinate of the block in the band.
+        :param int cols: the number of cols of the block.
+        :param int rows: the number of rows of the block.
+        :param int border_width: the width of the tesserae border.
+        :param tuple border_color: the color of the tesserae border.
+        :param ImageDraw draw: the image draw of the band.
+        """
+        if border_width <= 0:
+            return
+        side = self._spec.tessera_side
+        end_x = x + cols * side - 1
+        end_y = y + rows * side - 1
+        for col in range(cols + 1):
+            line_x = x + col * side
+            draw.rectangle([(max(x, line_x - border_width), y), (min(end_x, line_x + border_width - 1), end_y)],
+                           border_color)
+        for row in range(rows + 1):
+            line_y = y + row * side
+            draw.rectangle([(x, max(y, line_y - border_width)), (end_x, min(end_y, line_y + border_width - 1))],
+                           border_color)
+
+    def __draw_in_content(self, col: int, row: int, data: str, labels: str, fill_color: tuple, text_color: tuple,
+                          top: int, draw: ImageDraw, background: bool, overdrawn: set):
+        """
+        Draws a tessera in the content zone of the bitmosaic image.
+
+        :param int col: the tessera's col.
+        :param int row: the tessera's row.
+        :param str data: the tessera's data.
+        :param str labels: the labels of the tessera's V2Point.
+        :param tuple fill_color: the rgb values of the tessera background color.
+        :param tuple text_color: the rgb values of the tessera text color.
+        :param int top: the first row of pixels of the band.
+        :param ImageDraw draw: the image draw of the band.
+        :param bool background: to draw the border and the fill, when they aren't drawn by the background pass.
+        :param set overdrawn: the grid cells reached by the text of the tesserae drawn before.
+        """
+        spec = self._spec
+        side = spec.tessera_side
+        offset = spec.border_correction + (side if spec.framed else 0)
+        border_x = spec.margin[3] + offset + col * side
+        border_y = spec.margin[0] + offset + row * side - top
+        border_end_x = border_x + side - 1
+        border_end_y = border_y + side - 1
+        border_width = spec.tessera_border_width if spec.tessera_border_color is not None else 0
+        fill_x = border_x + border_width
+        fill_y = border_y + border_width
+        cell = (col + 1, row + 1) if spec.framed else (col, row)
+
+        if background or cell in overdrawn:
+            # Drawing the border
+            draw.rectangle([(border_x, border_y), (border_end_x, border_end_y)], spec.tessera_border_color)
+
+            # Drawing the fill
+            draw.rectangle([(fill_x, fill_y), (border_end_x - border_width, border_end_y - border_width)],
+                           fill_color)
+
+        # Drawing the tessera content. The coordinates are split in two runs, so each one is rendered once per col
+        # or row
+        coordinates = ("({0}, ".format(col), "{0})".format(row)) if spec.coordinates else ""
+        lines = [coordinates, "", str(data), "", str(labels)]
+        text_size = self._text_cache.bbox(lines)
+        text_x = fill_x + side / 2 - spec.tessera_border_width - (text_size[2] - text_size[0]) / 2
+        text_y = fill_y + side / 2 - spec.tessera_border_width - (text_size[3] - text_size[1]) / 2
+        self.__mark_overdrawn(cell, self._text_cache.draw(draw, (text_x, text_y), lines, text_color), top, overdrawn)
+
+    def __draw_in_frame(self, col: int, y: int, number: int, top: int, bottom: int, draw: ImageDraw,
+                        background: bool, overdrawn: set):
+        """
+        Draws a tessera in the frame zone of the bitmosaic image, if it is close enough to the band.
+
+        :param int col: the col for the tessera, -1 for the left side of the frame.
+        :param int y: the image y coordinate of the tessera.
+        :param int number: the col or row number written in the tessera, None for the corners.
+        :param int top: the first row of pixels of the band.
+        :param int bottom: the row of pixels after the last one of the band.
+        :param ImageDraw draw: the image draw of the band.
+        :param bool background: to draw the border and the fill, when they aren't drawn by the background pass.
+        :param set overdrawn: the grid cells reached by the text of the tesserae drawn before.
+        """
+        spec = self._spec
+        side = spec.tessera_side
+        if y + side <= top - side or y >= bottom + side:
+            return
+        border_x = spec.margin[3] + col * side + side + spec.border_correction
+        border_y = y - top
+        border_end_x = border_x + side - 1
+        border_end_y = border_y + side - 1
+        border_width = spec.frame_border_width if spec.frame_border_color is not None else 0
+        fill_x = border_x + border_width
+        fill_y = border_y + border_width
+        cell = (col + 1, (y - spec.margin[0] - spec.border_correction) // side)
+
+        if background or cell in overdrawn:
+            # Drawing the border
+            draw.rectangle([(border_x, border_y), (border_end_x, border_end_y)], spec.frame_border_color)
+
+            # Drawing the fill
+            draw.rectangle([(fill_x, fill_y), (border_end_x - border_width, border_end_y - border_width)],
+                           spec.frame_color)
+
+        # Drawing the tessera content
+        if spec.frame_show_text:
+            lines = [""] if number is None else ["", "", str(number), "", ""]
+            text_size = self._text_cache.bbox(lines)
+            text_x = fill_x + side / 2 - spec.tessera_border_width - (text_size[2] - text_size[0]) / 2
+            text_y = fill_y + side / 2 - spec.tessera_border_width - (text_size[3] - text_size[1]) / 2
+            self.__mark_overdrawn(cell, self._text_cache.draw(draw, (text_x, text_y), lines, spec.frame_text_color),
+                                  top, overdrawn)
+
+
+_worker_renderer = None
+
+
+def _init_worker(spec: RenderSpec):
+    """
+    Creates the renderer of a worker process, so the spec is sent once to each worker instead of once per band.
+
+    :param RenderSpec spec: the description of the image.
+    """
+    global _worker_renderer
+    _worker_renderer = BandRenderer(spec)
+
+
+def _render_band(band: tuple) -> Image:
+    """
+    Renders a band in a worker process.
+
+    :param tuple band: the top and bottom of the band.
+    :return: Image
+    """
+    return _worker_renderer.render(*band)
+
+
+def render_bands(spec: RenderSpec, bands: [(int, int)], processes: int = 1):
+    """
+    Iterates over the rendered bands, in the same order as they are given, each one as a (top, Image) tuple.
+
+    With a process pool, only two bands per process are rendered ahead of the one being consumed, so the memory used
+    is bounded when the consumer (the png writer, for example) is slower than the pool.
+
+    :param RenderSpec spec: the description of the image.
+    :param [(int, int)] bands: the top and bottom of each band.
+    :param int processes: the number of processes rendering the bands.
+    """
+    if processes > 1 and len(bands) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(bands)), initializer=_init_worker,
+                                 initargs=(spec,)) as executor:
+            pending = deque()
+            for band in bands:
+                pending.append((band[0], executor.submit(_render_band, band)))
+                if len(pending) >= processes * 2:
+                    top, future = pending.popleft()
+                    yield top, future.result()
+            while pending:
+                top, future = pending.popleft()
+                yield top, future.result()
+    else:
+        renderer = BandRenderer(spec)
+        for band in bands:
+            yield band[0], renderer.render(*band)
+
+
+def render_image(spec: RenderSpec, processes: int = 1) -> Image:
+    """
+    Renders the whole image. With more than one process the image is split in bands, which are rendered in a process
+    pool and stitched together; the result is the same as the one of a single process.
+
+    :param RenderSpec spec: the description of the image.
+    :param int processes: the number of processes rendering the image.
+    :return: Image
+    """
+    if processes <= 1:
+        return BandRenderer(spec).render(0, spec.height)
+    # Several bands per process, so the processes with lighter bands (the margins) don't stay idle
+    rows_per_band = min(16, math.ceil(spec.image_rows / (max(1, processes) * 4)))
+    image = Image.new(spec.output_mode, (spec.width, spec.height))
+    if spec.palette is not None:
+        image.putpalette([value for color in spec.palette for value in color])
+    for top, band in render_bands(spec, spec.bands(rows_per_band), processes):
+        image.paste(band, (0, top))
+    return image
@@ -60,7 +60,7 @@ def read_txt_file(file_path: str):
         with open(file_path, 'r') as file:
             text = file.read()
         return text
-    except IOError:
+    except (IOError, UnicodeDecodeError):
         raise FileException(ErrorCodes.file_error, "There was a problem reading the file {0}".format(file_path))
 
 
@@ -15,6 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
+import tempfile
+import unicodedata
 import unittest
 from bitmosaic.exception import FileException
 from bitmosaic.exception import ValueException
@@ -40,6 +43,12 @@ class TestDictionaryDomain(unittest.TestCase):
         self.assertTrue(self.dictionary_domain.contains("zoo"))
         self.assertFalse(self.dictionary_domain.contains("zoology"))
 
+    def test_contains_normalized(self) -> None:
+        dictionary_domain = data_domain.DictionaryDomain("bip-0039_spanish.txt")
+        self.assertTrue(dictionary_domain.contains(unicodedata.normalize("NFC", "ábaco")))
+        self.assertTrue(dictionary_domain.contains(unicodedata.normalize("NFD", "ábaco")))
+        self.assertFalse(dictionary_domain.contains("abaco"))
+
     def test_random(self) -> None:
         random_items = self.dictionary_domain.random()
         self.assertIsNotNone(random_items)
@@ -59,6 +68,33 @@ class TestDictionaryDomain(unittest.TestCase):
     def test_random_with_invalid_max_length(self) -> None:
         self.assertIsNotNone(self.dictionary_domain.random(max_length=0))
 
+    def test_shared_wordlist(self) -> None:
+        dictionary_domain = data_domain.DictionaryDomain(self.file_name)
+        self.assertIs(dictionary_domain.data, self.dictionary_domain.data)
+
+    def test_clear_wordlist_cache(self) -> None:
+        data_domain.clear_wordlist_cache()
+        dictionary_domain = data_domain.DictionaryDomain(self.file_name)
+        self.assertIsNot(dictionary_domain.data, self.dictionary_domain.data)
+        self.assertEqual(dictionary_domain.data, self.dictionary_domain.data)
+
+    def test_wordlist_reloaded_when_modified(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "words.txt")
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write("one\ntwo")
+            data, index = data_domain.load_wordlist(file_path)
+            self.assertIs(data_domain.load_wordlist(file_path)[0], data)
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write("one\ntwo\nthree")
+            data, index = data_domain.load_wordlist(file_path)
+            self.assertEqual(data, ["one", "two", "three"])
+            self.assertIn("three", index)
+
+    def test_contains_all(self) -> None:
+        self.assertTrue(self.dictionary_domain.contains_all(["zoo", "abandon"]))
+        self.assertFalse(self.dictionary_domain.contains_all(["zoo", "zoology"]))
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -99,6 +135,14 @@ class TestRegexDomain(unittest.TestCase):
         with self.assertRaises(ValueException):
             self.regex_domain.random(max_length=0)
 
+    def test_random_with_processes(self) -> None:
+        random_items = self.regex_domain.random(count=10, processes=2)
+        self.assertEqual(len(random_items), 10)
+        self.assertTrue(all(self.regex_domain.contains(item) for item in random_items))
+
+    def test_data_is_generated_once(self) -> None:
+        self.assertIs(self.regex_domain.data, self.regex_domain.data)
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -154,6 +198,20 @@ class TestDomain(unittest.TestCase):
         item = "1"
         self.assertFalse(self.domain.contains(item))
 
+    def test_contains_item_in_dictionary(self) -> None:
+        self.domain.remove(self.regex_domain)
+        self.assertTrue(self.domain.contains("zoo"))
+        self.assertFalse(self.domain.contains("Zoo"))
+
+    def test_contains_all(self) -> None:
+        self.domain.generate_domain(total_items=1024)
+        items = self.domain.data[:24] + ["zoo", "Word"]
+        self.assertTrue(self.domain.contains_all(items))
+        self.assertFalse(self.domain.contains_all(items + ["1"]))
+
+    def test_contains_all_empty(self) -> None:
+        self.assertTrue(self.domain.contains_all([]))
+
     def test_random_item(self) -> None:
         self.domain.generate_domain(1024)
         self.assertIsNotNone(self.domain.random(count=1))
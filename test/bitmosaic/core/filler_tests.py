@@ -15,7 +15,11 @@
 # You should have received a copy of the GNU General Public License
 # along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
+import tempfile
 import unittest
+from unittest import mock
+from PIL import Image
 import bitmosaic.core.data_domain as data_domain
 import bitmosaic.core.filler as filler
 import bitmosaic.core.matrix as matrix
@@ -24,6 +28,7 @@ import bitmosaic.core.secret as secret
 import bitmosaic.drawing.color as color
 import bitmosaic.drawing.image as image
 import bitmosaic.util as util
+from bitmosaic.exception import FileException
 
 
 class TestNoneFiller(unittest.TestCase):
@@ -84,6 +89,28 @@ class TestPaletteFiller(unittest.TestCase):
         self.assertIsInstance(random_color, color.Color)
         self.assertTrue(random_color in self.palette.colors)
 
+    def test_fill(self) -> None:
+        raster = color.ColorRaster(cols=4, rows=3)
+        self.filler.fill(raster)
+        for index in range(len(raster)):
+            self.assertTrue(raster.color(index).html_color() in self.palette.colors)
+
+    def test_fill_keeps_indexes(self) -> None:
+        raster = color.ColorRaster(cols=4, rows=3)
+        self.filler.fill(raster)
+        self.assertEqual(len(raster.table), len(self.palette))
+        for index in range(len(raster)):
+            self.assertEqual(raster.rgb(index), raster.table[raster.indexes[index]][0])
+            self.assertEqual(raster.contrasted_rgb(index)[0], raster.table[raster.indexes[index]][1])
+
+    def test_random_indexes(self) -> None:
+        palette = color.Palette()
+        palette.add_colors([color.HtmlColor("#00000{0}".format(index)) for index in range(7)])
+        palette_filler = filler.PaletteFiller(cols=0, rows=0, palette=palette)
+        indexes = palette_filler.random_indexes(7000)
+        self.assertEqual(len(indexes), 7000)
+        self.assertEqual(set(indexes), set(range(7)))
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -108,6 +135,59 @@ class TestImageFiller(unittest.TestCase):
         self.assertIsInstance(random_color, color.RGBAColor)
         self.assertEqual(random_color, self.expected_color)
 
+    def test_fill(self) -> None:
+        raster = color.ColorRaster(cols=self.filler.cols, rows=self.filler.rows)
+        self.filler.fill(raster)
+        self.assertEqual(raster.color(0), self.expected_color)
+        self.assertEqual(raster.color(len(raster) - 1),
+                         self.filler.get_item((self.filler.cols - 1, self.filler.rows - 1)))
+
+    def test_resized_image_is_cached(self) -> None:
+        with mock.patch.object(filler.Image, "open") as image_open:
+            cached_filler = filler.ImageFiller(cols=24, rows=12, image_name="wave.jpg")
+            image_open.assert_not_called()
+        self.assertEqual((cached_filler.cols, cached_filler.rows), (self.filler.cols, self.filler.rows))
+        self.assertEqual(cached_filler.get_item((5, 3)), self.filler.get_item((5, 3)))
+
+    def test_clear_resized_image_cache(self) -> None:
+        filler.clear_resized_image_cache()
+        with mock.patch.object(filler.Image, "open", wraps=filler.Image.open) as image_open:
+            filler.ImageFiller(cols=24, rows=12, image_name="wave.jpg")
+            image_open.assert_called_once()
+
+    def test_resized_image_keeps_aspect_ratio(self) -> None:
+        self.assertEqual((self.filler.cols, self.filler.rows), (24, 16))
+
+    def test_large_image_is_reduced(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            image_path = os.path.join(directory, "large.png")
+            large_image = Image.linear_gradient("L").resize((1000, 500)).convert("RGB")
+            large_image.save(image_path)
+            cols, rows, pixels = filler.load_resized_image(image_path, 20, 10, ("PNG",))
+        self.assertEqual((cols, rows), (20, 10))
+        expected = large_image.resize((20, 10), Image.BILINEAR).tobytes()
+        self.assertTrue(all(abs(value - expected_value) <= 2 for value, expected_value in zip(pixels, expected)))
+
+    def test_large_palette_image_is_reduced(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            image_path = os.path.join(directory, "large.gif")
+            large_image = Image.linear_gradient("L").resize((2000, 1000)).convert("RGB")
+            large_image.convert("P", palette=Image.ADAPTIVE, colors=16).save(image_path)
+            cols, rows, pixels = filler.load_resized_image(image_path, 20, 10, ("GIF",))
+            with Image.open(image_path) as saved_image:
+                expected = saved_image.convert("RGB").resize((20, 10), Image.BILINEAR).tobytes()
+        self.assertEqual((cols, rows), (20, 10))
+        self.assertEqual(len(pixels), 20 * 10 * 3)
+        self.assertTrue(all(abs(value - expected_value) <= 16 for value, expected_value in zip(pixels, expected)))
+
+    def test_invalid_image_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            image_path = os.path.join(directory, "invalid.gif")
+            with open(image_path, "wb") as file:
+                file.write(b"GIF89a" + bytes(64))
+            with self.assertRaises(FileException):
+                filler.load_resized_image(image_path, 20, 10, ("GIF",))
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -157,6 +237,11 @@ class TestRecoveryFiller(unittest.TestCase):
         recovery = recovered_mosaic.recover_secret(recovery=self.recovery2)
         self.assertEqual(recovery.data, self.secret2.data)
 
+    def test_recover_secret_from_data(self) -> None:
+        data = util.read_txt_file(util.get_output_directory("bitmosaic.txt"))
+        self.assertEqual(mosaic.Mosaic.recover(data, self.recovery1).data, self.secret1.data)
+        self.assertEqual(mosaic.Mosaic.recover(data, self.recovery2).data, self.secret2.data)
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -52,6 +52,10 @@ class TestPoint(unittest.TestCase):
         point = matrix.Point(7, 3)
         self.assertNotEqual(point, self.other)
 
+    def test_point_hash(self):
+        self.assertEqual(hash(matrix.Point(3, 7)), hash(self.other))
+        self.assertEqual(len({matrix.Point(3, 7), self.other, self.zero}), 2)
+
     def test_point_zero(self) -> None:
         point = matrix.Point(0, 0)
         self.assertEqual(point, self.zero)
@@ -113,6 +117,11 @@ class TestV2Component(unittest.TestCase):
     def test_fake_components(self):
         self.assertIsNotNone(matrix.V2Component.random_fake_component())
 
+    def test_random_fake_components(self):
+        components = matrix.V2Component.random_fake_components(10)
+        self.assertEqual(len(components), 10)
+        self.assertTrue(all(type(component) is matrix.V2Component for component in components))
+
     def test_random_component(self):
         self.assertIsNotNone(matrix.V2Component.random(["a", "b", "c"], range(-10, 10)))
 
@@ -169,6 +178,49 @@ class TestV2Point(unittest.TestCase):
         cls.disconnect()
 
 
+class TestEmptyCells(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.empty_cells = matrix.EmptyCells(10)
+        for index in range(10):
+            self.empty_cells.add(index)
+
+    def test_contains(self) -> None:
+        self.assertEqual(len(self.empty_cells), 10)
+        self.assertTrue(5 in self.empty_cells)
+
+    def test_discard(self) -> None:
+        self.empty_cells.discard(5)
+        self.empty_cells.discard(0)
+        self.empty_cells.discard(5)
+        self.assertEqual(len(self.empty_cells), 8)
+        self.assertFalse(5 in self.empty_cells)
+        self.assertFalse(0 in self.empty_cells)
+        self.assertEqual(sorted(self.empty_cells), [1, 2, 3, 4, 6, 7, 8, 9])
+
+    def test_add_twice(self) -> None:
+        self.empty_cells.discard(3)
+        self.empty_cells.add(3)
+        self.empty_cells.add(3)
+        self.assertEqual(len(self.empty_cells), 10)
+        self.assertTrue(3 in self.empty_cells)
+
+    def test_random(self) -> None:
+        for index in range(9):
+            self.empty_cells.discard(index)
+        self.assertEqual(self.empty_cells.random(), 9)
+        self.empty_cells.discard(9)
+        self.assertIsNone(self.empty_cells.random())
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
+
+
 class TestMatrix(unittest.TestCase):
     def setUp(self) -> None:
         util.testing = True
@@ -232,9 +284,57 @@ class TestMatrix(unittest.TestCase):
         self.matrix.remove_item(to_remove)
         self.assertIsNone(self.matrix.get_item(matrix.Point.zero()))
 
+    def test_get_at(self) -> None:
+        self.assertEqual(self.matrix.get_at(5, 2), self.expected_5_2_value)
+        self.assertEqual(self.matrix.get_at(-1, 0), self.expected_lt_0_value)
+
+    def test_get_flat(self) -> None:
+        self.assertEqual(self.matrix.get_flat(25), self.expected_5_2_value)
+
+    def test_iter_rows(self) -> None:
+        rows = list(self.matrix.iter_rows())
+        self.assertEqual(len(rows), self.matrix.rows)
+        self.assertEqual(rows[2][5], self.expected_5_2_value)
+        self.assertEqual(list(self.matrix.iter_row(2)), rows[2])
+
+    def test_equal(self) -> None:
+        other = matrix.Matrix(cols=10, rows=5, filler=self.none_filler)
+        self.assertNotEqual(self.matrix, other)
+        for y, row in enumerate(self.matrix.iter_rows()):
+            for x, item in enumerate(row):
+                other.set_item(item, matrix.Point(x, y))
+        self.assertEqual(self.matrix, other)
+
     def test_same_point(self) -> None:
         self.assertTrue(self.matrix.same_point(matrix.Point.zero(), self.matrix.normalize_point(matrix.Point(10, 5))))
 
+    def test_random_point_when_full(self) -> None:
+        self.assertEqual(self.matrix.empty_count, 0)
+        self.assertIsNone(self.matrix.random_point())
+
+    def test_random_point_is_empty(self) -> None:
+        self.matrix.remove_item(self.point_5_2)
+        self.matrix.remove_item(self.point_lt_0)
+        for _ in range(20):
+            point = self.matrix.random_point()
+            self.assertTrue(point == self.point_5_2 or point == matrix.Point(9, 0))
+            self.assertTrue(self.matrix.is_empty(point))
+
+    def test_empty_indexes(self) -> None:
+        self.assertEqual(self.matrix.empty_indexes(), [])
+        self.matrix.remove_item(self.point_5_2)
+        self.matrix.remove_item(self.point_lt_0)
+        self.assertEqual(self.matrix.empty_indexes(), [9, 25])
+
+    def test_remove_and_set_item(self) -> None:
+        self.matrix.remove_item(self.point_5_2)
+        self.assertTrue(self.matrix.is_empty(self.point_5_2))
+        self.assertEqual(self.matrix.empty_count, 1)
+        self.matrix.set_item("New", self.point_5_2)
+        self.assertFalse(self.matrix.is_empty(self.point_5_2))
+        self.assertEqual(self.matrix.empty_count, 0)
+        self.assertEqual(self.matrix.get_item(self.point_5_2), "New")
+
     @staticmethod
     def disconnect():
         util.testing = False
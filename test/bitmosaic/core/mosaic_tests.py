@@ -23,6 +23,7 @@ import bitmosaic.core.mosaic as mosaic
 import bitmosaic.core.secret as secret
 import bitmosaic.drawing.color as color
 import bitmosaic.util as util
+from bitmosaic.exception import ValueException
 
 
 class TestTessera(unittest.TestCase):
@@ -48,6 +49,86 @@ class TestTessera(unittest.TestCase):
         cls.disconnect()
 
 
+class TestTesseraMatrix(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.matrix = mosaic.TesseraMatrix(cols=4, rows=3, filler=filler.NoneFiller())
+        v2_point = matrix.V2Point(x=matrix.V2Component(label="a", value=2), y=matrix.V2Component(label="b", value=-5))
+        self.tessera = mosaic.Tessera(position=matrix.Point(x=1, y=2), data="First", v2_point=v2_point)
+        self.matrix.set_item(self.tessera, self.tessera.position)
+
+    def test_get_item(self) -> None:
+        tessera = self.matrix.get_item(matrix.Point(1, 2))
+        self.assertEqual(tessera.position, matrix.Point(1, 2))
+        self.assertEqual(tessera.data, "First")
+        self.assertEqual(tessera.v2_point.labels(), "aB")
+        self.assertEqual(tessera.next(), matrix.Point(3, -3))
+
+    def test_item_writes_through(self) -> None:
+        tessera = self.matrix.get_item(matrix.Point(1, 2))
+        tessera.data = "Second"
+        tessera.v2_point = matrix.V2Point(x=matrix.V2Component(label="c", value=-1),
+                                          y=matrix.V2Component(label="d", value=3))
+        self.assertEqual(self.matrix.data_at(9), "Second")
+        self.assertEqual(self.matrix.get_item(matrix.Point(1, 2)).next(), matrix.Point(0, 5))
+        self.assertEqual(str(self.matrix.get_item(matrix.Point(1, 2))), "SecondCd|")
+
+    def test_item_of_removed_cell(self) -> None:
+        tessera = self.matrix.get_item(matrix.Point(1, 2))
+        self.matrix.remove_item(matrix.Point(1, 2))
+        tessera.data = "Second"
+        self.assertIsNone(self.matrix.data_at(9))
+
+    def test_empty_item(self) -> None:
+        self.assertIsNone(self.matrix.get_item(matrix.Point.zero()))
+        self.assertIsNone(self.matrix.data_at(0))
+        self.assertIsNone(self.matrix.labels_at(0))
+
+    def test_data_and_labels_at(self) -> None:
+        self.assertEqual(self.matrix.data_at(9), "First")
+        self.assertEqual(self.matrix.labels_at(9), "aB")
+
+    def test_remove_item(self) -> None:
+        self.matrix.remove_item(matrix.Point(1, 2))
+        self.assertIsNone(self.matrix.get_item(matrix.Point(1, 2)))
+        self.assertEqual(self.matrix.empty_count, 12)
+
+    def test_text_rows(self) -> None:
+        rows = list(self.matrix.text_rows())
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2], "NoneFirstaB|NoneNone")
+        self.assertEqual("".join(rows), str(self.matrix))
+
+    def test_fill_cells(self) -> None:
+        indexes = self.matrix.empty_indexes()
+        x_components = [matrix.V2Component(label="c", value=1)] * len(indexes)
+        y_components = [matrix.V2Component(label="d", value=-2)] * len(indexes)
+        self.matrix.fill_cells(indexes, ["Fake"] * len(indexes), x_components, y_components)
+        self.assertEqual(self.matrix.empty_count, 0)
+        self.assertEqual(self.matrix.data_at(9), "First")
+        tessera = self.matrix.get_item(matrix.Point.zero())
+        self.assertEqual(tessera.data, "Fake")
+        self.assertEqual(tessera.v2_point.labels(), "cD")
+        self.assertEqual(tessera.next(), matrix.Point(1, -2))
+
+    def test_fill_cells_with_invalid_data(self) -> None:
+        with self.assertRaises(ValueException):
+            self.matrix.fill_cells([0, 1], ["Fake"], [], [])
+
+    def test_str(self) -> None:
+        for index in range(len(self.matrix)):
+            self.matrix.set_item(self.tessera, matrix.Point(index % 4, index // 4))
+        self.assertEqual(str(self.matrix), "FirstaB|" * 12)
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
+
+
 class TestMosaic(unittest.TestCase):
     def setUp(self) -> None:
         util.testing = True
@@ -132,6 +213,34 @@ class TestMosaic(unittest.TestCase):
         self.assertEqual(self.landscape_image_mosaic.recover_secret(recovery=recovery).data,
                          ["this", "is", "my", "other", "secret"])
 
+    def test_recover(self) -> None:
+        self.landscape_image_mosaic.hide_secrets(vault=self.vault)
+        data = str(self.landscape_image_mosaic.matrix)
+        recovery = secret.Recovery(name="Recovering secret 2", origin=self.secret2.origin,
+                                   v2_components=self.secret2.components, cols=self.landscape_image_mosaic.cols,
+                                   rows=self.landscape_image_mosaic.rows, length=5)
+        self.assertEqual(mosaic.Mosaic.recover(data, recovery).data, ["this", "is", "my", "other", "secret"])
+
+    def test_recover_with_invalid_size(self) -> None:
+        self.landscape_image_mosaic.hide_secrets(vault=self.vault)
+        data = str(self.landscape_image_mosaic.matrix)
+        recovery = secret.Recovery(name="Recovering secret 1", origin=self.secret1.origin,
+                                   v2_components=self.secret1.components, cols=self.landscape_image_mosaic.cols + 1,
+                                   rows=self.landscape_image_mosaic.rows, length=3)
+        with self.assertRaises(ValueException):
+            mosaic.Mosaic.recover(data, recovery)
+
+    def test_recover_with_short_record(self) -> None:
+        self.landscape_image_mosaic.hide_secrets(vault=self.vault)
+        records = str(self.landscape_image_mosaic.matrix).split("|")
+        recovery = secret.Recovery(name="Recovering secret 2", origin=self.secret2.origin,
+                                   v2_components=self.secret2.components, cols=self.landscape_image_mosaic.cols,
+                                   rows=self.landscape_image_mosaic.rows, length=5)
+        for short_record in ["", "a"]:
+            records[self.secret2.origin.y * recovery.cols + self.secret2.origin.x] = short_record
+            with self.assertRaises(ValueException):
+                mosaic.Mosaic.recover_from_records(records, recovery)
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -0,0 +1,148 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# planner_tests.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+from unittest import mock
+from bitmosaic.exception import MosaicItemCollisionException
+import bitmosaic.core.filler as filler
+import bitmosaic.core.matrix as matrix
+import bitmosaic.core.planner as planner
+import bitmosaic.core.secret as secret
+import bitmosaic.util as util
+
+
+class TestVectorPlanner(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.components = matrix.V2Component.components_from_string("a:1 b:2 c:3")
+        self.planner = planner.VectorPlanner(self.components, min_value=10, max_value=60)
+        self.matrix = matrix.Matrix(cols=8, rows=8, filler=filler.NoneFiller())
+
+    def fill_matrix(self, except_points: list) -> None:
+        for y in range(self.matrix.rows):
+            for x in range(self.matrix.cols):
+                point = matrix.Point(x, y)
+                if point not in except_points:
+                    self.matrix.set_item(str(point), point)
+
+    def test_candidates(self) -> None:
+        self.assertEqual(len(self.planner), 3 * 3 * 4)
+        self.assertAlmostEqual(sum(candidate[2] for candidate in self.planner.candidates), 3 * 3)
+
+    def test_valid_candidates_are_empty(self) -> None:
+        origin = matrix.Point(2, 3)
+        for candidate in self.planner.valid_candidates(self.matrix, origin):
+            destination = origin + planner.VectorPlanner.v2_point(candidate).to_point()
+            self.assertTrue(self.matrix.is_empty(destination))
+            self.assertFalse(self.matrix.same_point(origin, destination))
+
+    def test_one_empty_destination(self) -> None:
+        self.fill_matrix(except_points=[matrix.Point(0, 6)])
+        valid = self.planner.valid_candidates(self.matrix, matrix.Point(2, 3))
+        self.assertEqual([planner.VectorPlanner.v2_point(candidate).labels() for candidate in valid], ["Bc"])
+
+    def test_without_empty_destination(self) -> None:
+        self.fill_matrix(except_points=[matrix.Point(7, 7)])
+        self.assertEqual(self.planner.valid_candidates(self.matrix, matrix.Point(2, 3)), [])
+
+    def test_reserved_destination(self) -> None:
+        self.fill_matrix(except_points=[matrix.Point(0, 6)])
+        self.assertEqual(self.planner.valid_candidates(self.matrix, matrix.Point(2, 3), reserved={6 * 8}), [])
+
+    def test_positive_signs_first(self) -> None:
+        positive_planner = planner.VectorPlanner(self.components, min_value=50, max_value=50)
+        valid = positive_planner.valid_candidates(self.matrix, matrix.Point.zero())
+        for _ in range(20):
+            labels = planner.VectorPlanner.v2_point(planner.VectorPlanner.ordered(valid)[0]).labels()
+            self.assertEqual(labels, labels.lower())
+
+    def test_zero_weight_candidates(self) -> None:
+        positive_planner = planner.VectorPlanner(self.components, min_value=50, max_value=50)
+        self.fill_matrix(except_points=[matrix.Point(0, 6)])
+        self.assertEqual(positive_planner.valid_candidates(self.matrix, matrix.Point(2, 3)), [])
+        self.assertEqual(len(planner.VectorPlanner.ordered(positive_planner.candidates)), 3 * 3)
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
+
+
+class TestPlacementEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.components = matrix.V2Component.components_from_string("a:1")
+        self.matrix = matrix.Matrix(cols=5, rows=1, filler=filler.NoneFiller())
+        self.engine = planner.PlacementEngine(self.matrix)
+        self.secret1 = secret.Secret(name="Secret 1", data=["one", "two", "three"], origin=matrix.Point.zero(),
+                                     v2_components=self.components)
+        self.secret2 = secret.Secret(name="Secret 2", data=["four"], origin=matrix.Point(1, 0),
+                                     v2_components=self.components)
+
+    def test_plan_one_secret(self) -> None:
+        plan = self.engine.plan([self.secret1])
+        self.assertEqual(len(plan), 1)
+        the_secret, steps = plan[0]
+        self.assertEqual(the_secret, self.secret1)
+        self.assertEqual(steps[0][0], matrix.Point.zero())
+        for (point, v2_point), (next_point, _) in zip(steps, steps[1:]):
+            self.assertTrue(self.matrix.same_point(point + v2_point.to_point(), next_point))
+
+    def test_plan_secrets_without_collisions(self) -> None:
+        # The first secret has to go around the second one, so the range of random values must allow negative signs
+        with mock.patch.object(planner.secrets, "randbelow", return_value=20), \
+                mock.patch.object(planner.random, "randint", return_value=80):
+            for _ in range(20):
+                plan = self.engine.plan([self.secret1, self.secret2])
+                self.assertEqual([item[0] for item in plan], [self.secret1, self.secret2])
+                points = [self.matrix.flat_index(point) for _, steps in plan for point, _ in steps]
+                self.assertEqual(len(points), len(set(points)))
+                self.assertEqual(self.matrix.empty_count, 5)
+
+    def test_plan_avoids_occupied_cells(self) -> None:
+        self.matrix.set_item("Taken", matrix.Point(4, 0))
+        for _ in range(10):
+            steps = self.engine.plan([self.secret1])[0][1]
+            self.assertEqual([point for point, _ in steps], [matrix.Point(0, 0), matrix.Point(1, 0),
+                                                             matrix.Point(2, 0)])
+            self.assertEqual(steps[-1][1].x.label, "a")
+
+    def test_plan_without_negative_signs(self) -> None:
+        self.matrix.set_item("Taken", matrix.Point(1, 0))
+        short_secret = secret.Secret(name="Short", data=["a", "b"], origin=matrix.Point.zero(),
+                                     v2_components=self.components)
+        # rand_min and rand_max are the same, so the signs are never negative and the only empty cell is behind
+        with mock.patch.object(planner.random, "randint", side_effect=lambda low, high: low):
+            with self.assertRaises(MosaicItemCollisionException):
+                self.engine.plan([short_secret])
+
+    def test_infeasible_plan(self) -> None:
+        long_secret = secret.Secret(name="Long", data=["a", "b", "c", "d", "e", "f"], origin=matrix.Point.zero(),
+                                    v2_components=self.components)
+        with self.assertRaises(MosaicItemCollisionException):
+            self.engine.plan([long_secret])
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
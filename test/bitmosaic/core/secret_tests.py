@@ -15,11 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
 import unittest
 import bitmosaic.core.secret as secret
 import bitmosaic.util as util
 from bitmosaic.core.matrix import Point
 from bitmosaic.core.matrix import V2Component
+from bitmosaic.exception import FileException
 
 
 class TestSecret(unittest.TestCase):
@@ -83,6 +85,16 @@ class TestRecovery(unittest.TestCase):
     def test_is_complete(self) -> None:
         self.assertTrue(self.recovery.is_complete())
 
+    def test_create_from_invalid_text_file(self) -> None:
+        file_path = util.get_output_directory("recovery_invalid_text.txt")
+        with open(file_path, "wb") as file:
+            file.write(b"5x3|(0, 0)|\x81\xff|3")
+        try:
+            with self.assertRaises(FileException):
+                secret.Recovery.create_from_file("recovery_invalid_text.txt")
+        finally:
+            os.remove(file_path)
+
     @staticmethod
     def disconnect():
         util.testing = False
@@ -0,0 +1,255 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# serializer_tests.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import bitmosaic.core.data_domain as data_domain
+import bitmosaic.core.filler as filler
+import bitmosaic.core.matrix as matrix
+import bitmosaic.core.mosaic as mosaic
+import bitmosaic.core.secret as secret
+import bitmosaic.core.serializer as serializer
+import bitmosaic.drawing.color as color
+import bitmosaic.util as util
+from bitmosaic.exception import FileException
+from bitmosaic.exception import InvalidFormatException
+
+
+class TestBitmosaicReader(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "bitmosaic.txt")
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write("zooaB|ábacocD|actoreF|")
+        self.components = matrix.V2Component.components_from_string("a:1 b:2 c:3")
+
+    def test_len(self) -> None:
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            self.assertEqual(len(reader), 3)
+
+    def test_record(self) -> None:
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            self.assertEqual(reader.record(0), "zooaB")
+            self.assertEqual(reader[1], "ábacocD")
+            self.assertEqual(reader.record_at(0, 1, cols=2), "actoreF")
+
+    def test_invalid_record(self) -> None:
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            with self.assertRaises(IndexError):
+                reader.record(3)
+
+    def test_invalid_file(self) -> None:
+        with self.assertRaises(FileException):
+            serializer.BitmosaicReader(os.path.join(self.directory.name, "no_exist.txt"))
+
+    def test_invalid_text(self) -> None:
+        with open(self.file_path, "wb") as file:
+            file.write(b"zooaB|\xff\xfeaB|")
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            self.assertEqual(reader.record(0), "zooaB")
+            with self.assertRaises(FileException):
+                reader.record(1)
+
+    def test_index_file(self) -> None:
+        serializer.BitmosaicReader(self.file_path, use_index_file=True).close()
+        self.assertTrue(os.path.exists(self.file_path + ".idx"))
+        with serializer.BitmosaicReader(self.file_path, use_index_file=True) as reader:
+            self.assertEqual(reader.record(2), "actoreF")
+
+    def test_index_file_is_rebuilt(self) -> None:
+        serializer.BitmosaicReader(self.file_path, use_index_file=True).close()
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write("zooaB|")
+        with serializer.BitmosaicReader(self.file_path, use_index_file=True) as reader:
+            self.assertEqual(len(reader), 1)
+
+    def test_shared_offsets(self) -> None:
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            offsets = reader.offsets
+        with mock.patch.object(serializer.BitmosaicReader, "_BitmosaicReader__build_offsets") as build_offsets:
+            with serializer.BitmosaicReader(self.file_path, offsets=offsets) as reader:
+                self.assertEqual(reader.record(2), "actoreF")
+            build_offsets.assert_not_called()
+
+    def test_without_index_file(self) -> None:
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            self.assertIsNone(reader.index_path)
+            self.assertEqual(len(reader), 3)
+        self.assertFalse(os.path.exists(self.file_path + ".idx"))
+
+    def save_mosaic(self, the_secrets: list):
+        domain = data_domain.Domain()
+        domain.add(data_domain.DictionaryDomain("bip-0039_english.txt"))
+        domain.generate_domain(total_items=16 * 8)
+        vault = secret.Vault()
+        for the_secret in the_secrets:
+            vault.add_secret(the_secret)
+        the_mosaic = mosaic.Mosaic(domain=domain,
+                                   color_filler=filler.PaletteFiller(cols=16, rows=8, palette=color.Palette.sample()))
+        the_mosaic.hide_secrets(vault)
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write(str(the_mosaic.matrix))
+
+    def test_recover(self) -> None:
+        the_secret = secret.Secret(name="Secret", data=["act", "action", "actor"], origin=matrix.Point(3, 2),
+                                   v2_components=self.components)
+        self.save_mosaic([the_secret])
+        recovery = secret.Recovery(name="Recovery", origin=the_secret.origin, v2_components=self.components, cols=16,
+                                   rows=8, length=3)
+        with serializer.BitmosaicReader(self.file_path) as reader:
+            self.assertEqual(mosaic.Mosaic.recover_from_records(reader, recovery).data, the_secret.data)
+
+    def test_recover_from_file(self) -> None:
+        the_secrets = [secret.Secret(name="Secret {0}".format(index), data=["act", "action", "actor", "zoo"],
+                                     origin=matrix.Point(index * 3, index), v2_components=self.components)
+                       for index in range(4)]
+        self.save_mosaic(the_secrets)
+        recoveries = [secret.Recovery(name=the_secret.name, origin=the_secret.origin, v2_components=self.components,
+                                      cols=16, rows=8, length=4) for the_secret in the_secrets]
+        files = sorted(os.listdir(self.directory.name))
+        recovered = serializer.recover_from_file(self.file_path, recoveries)
+        self.assertTrue(all(recovery is given for recovery, given in zip(recovered, recoveries)))
+        self.assertEqual([recovery.data for recovery in recovered], [the_secret.data for the_secret in the_secrets])
+        self.assertEqual(sorted(os.listdir(self.directory.name)), files)
+
+    def test_recover_from_file_with_processes(self) -> None:
+        the_secrets = [secret.Secret(name="Secret {0}".format(index), data=["act", "action", "actor", "zoo"],
+                                     origin=matrix.Point(index * 3, index), v2_components=self.components)
+                       for index in range(3)]
+        self.save_mosaic(the_secrets)
+        recoveries = [secret.Recovery(name=the_secret.name, origin=the_secret.origin, v2_components=self.components,
+                                      cols=16, rows=8, length=4) for the_secret in the_secrets]
+        files = sorted(os.listdir(self.directory.name))
+        recovered = serializer.recover_from_file(self.file_path, recoveries, processes=2)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), files)
+        self.assertTrue(all(recovery is given for recovery, given in zip(recovered, recoveries)))
+        self.assertEqual([recovery.data for recovery in recoveries], [the_secret.data for the_secret in the_secrets])
+        self.assertEqual([recovery.name for recovery in recovered], [the_secret.name for the_secret in the_secrets])
+        self.assertEqual([recovery.data for recovery in recovered], [the_secret.data for the_secret in the_secrets])
+
+    def test_recover_from_file_with_index_file(self) -> None:
+        the_secrets = [secret.Secret(name="Secret {0}".format(index), data=["act", "action", "actor", "zoo"],
+                                     origin=matrix.Point(index * 3, index), v2_components=self.components)
+                       for index in range(3)]
+        self.save_mosaic(the_secrets)
+        recoveries = [secret.Recovery(name=the_secret.name, origin=the_secret.origin, v2_components=self.components,
+                                      cols=16, rows=8, length=4) for the_secret in the_secrets]
+        recovered = serializer.recover_from_file(self.file_path, recoveries, processes=2, use_index_file=True)
+        self.assertEqual([recovery.data for recovery in recovered], [the_secret.data for the_secret in the_secrets])
+        self.assertTrue(os.path.exists(self.file_path + ".idx"))
+
+    def test_write_txt(self) -> None:
+        the_matrix = mosaic.TesseraMatrix(cols=3, rows=2, filler=filler.NoneFiller())
+        v2_point = matrix.V2Point(x=matrix.V2Component(label="a", value=2), y=matrix.V2Component(label="b", value=-5))
+        the_matrix.set_item(mosaic.Tessera(position=matrix.Point(1, 1), data="ábaco", v2_point=v2_point),
+                            matrix.Point(1, 1))
+        serializer.write_txt(the_matrix, self.file_path)
+        with open(self.file_path, "rb") as file:
+            self.assertEqual(file.read(), str(the_matrix).encode("utf-8"))
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.disconnect()
+
+
+class TestBitmosaicContainer(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.directory = tempfile.TemporaryDirectory()
+        self.txt_path = os.path.join(self.directory.name, "bitmosaic.txt")
+        self.binary_path = os.path.join(self.directory.name, "bitmosaic.bin")
+        domain = data_domain.Domain()
+        domain.add(data_domain.DictionaryDomain("bip-0039_spanish.txt"))
+        domain.generate_domain(total_items=16 * 8)
+        self.components = matrix.V2Component.components_from_string("a:1 b:2 c:3")
+        self.secret = secret.Secret(name="Secret", data=["ábaco", "acción", "ácido"], origin=matrix.Point(3, 2),
+                                    v2_components=self.components)
+        vault = secret.Vault()
+        vault.add_secret(self.secret)
+        self.mosaic = mosaic.Mosaic(domain=domain,
+                                    color_filler=filler.PaletteFiller(cols=16, rows=8, palette=color.Palette.sample()))
+        self.mosaic.hide_secrets(vault)
+        serializer.write_txt(self.mosaic.matrix, self.txt_path)
+
+    def test_write_binary(self) -> None:
+        serializer.write_binary(self.mosaic.matrix, self.binary_path)
+        with serializer.BitmosaicContainer(self.binary_path) as container:
+            self.assertEqual((container.cols, container.rows), (16, 8))
+            self.assertEqual(len(container), 16 * 8)
+            self.assertEqual(container.word(2 * 16 + 3), "ábaco")
+            self.assertEqual(container.labels(5), self.mosaic.matrix.labels_at(5))
+            self.assertEqual(container.record_at(3, 2), str(self.mosaic.matrix.get_item(matrix.Point(3, 2)))[:-1])
+
+    def test_recover(self) -> None:
+        serializer.write_binary(self.mosaic.matrix, self.binary_path)
+        recovery = secret.Recovery(name="Recovery", origin=self.secret.origin, v2_components=self.components, cols=16,
+                                   rows=8, length=3)
+        with serializer.BitmosaicContainer(self.binary_path) as container:
+            self.assertEqual(mosaic.Mosaic.recover_from_records(container, recovery).data, self.secret.data)
+
+    def test_txt_to_binary_and_back(self) -> None:
+        serializer.txt_to_binary(self.txt_path, self.binary_path, cols=16, rows=8)
+        converted_path = os.path.join(self.directory.name, "converted.txt")
+        serializer.binary_to_txt(self.binary_path, converted_path)
+        with open(self.txt_path, "rb") as txt_file, open(converted_path, "rb") as converted_file:
+            self.assertEqual(converted_file.read(), txt_file.read())
+
+    def test_txt_to_binary_with_invalid_size(self) -> None:
+        with self.assertRaises(InvalidFormatException):
+            serializer.txt_to_binary(self.txt_path, self.binary_path, cols=16, rows=9)
+
+    def test_invalid_container(self) -> None:
+        with self.assertRaises(InvalidFormatException):
+            serializer.BitmosaicContainer(self.txt_path)
+
+    def test_truncated_container(self) -> None:
+        serializer.write_binary(self.mosaic.matrix, self.binary_path)
+        with open(self.binary_path, "rb") as file:
+            data = file.read()
+        header = serializer.BitmosaicContainer.header
+        bad_word_count = header.pack(serializer.BitmosaicContainer.magic, serializer.BitmosaicContainer.version, 16,
+                                     8, 100000)
+        for content in [data[:header.size], data[:header.size + 10], bad_word_count, data[:-1]]:
+            with open(self.binary_path, "wb") as file:
+                file.write(content)
+            close = serializer.BitmosaicContainer.close
+            with mock.patch.object(serializer.BitmosaicContainer, "close", autospec=True, side_effect=close) as closed:
+                with self.assertRaises(InvalidFormatException):
+                    serializer.BitmosaicContainer(self.binary_path)
+                closed.assert_called_once()
+
+    def test_main(self) -> None:
+        converted_path = os.path.join(self.directory.name, "converted.txt")
+        serializer.main(["to-binary", self.txt_path, self.binary_path, "--cols", "16", "--rows", "8"])
+        serializer.main(["to-txt", self.binary_path, converted_path])
+        with open(self.txt_path, "rb") as txt_file, open(converted_path, "rb") as converted_file:
+            self.assertEqual(converted_file.read(), txt_file.read())
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.disconnect()
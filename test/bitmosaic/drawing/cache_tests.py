@@ -0,0 +1,113 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# cache_tests.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+from unittest import mock
+from PIL import Image
+from PIL import ImageDraw
+from PIL import ImageFont
+import bitmosaic.drawing.cache as cache
+import bitmosaic.util as util
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.font = ImageFont.truetype(str(util.get_fonts_directory("Code2003-W8nn.ttf")), 15)
+        self.text_cache = cache.TextCache(self.font)
+        self.lines = [("(12, ", "34)"), "", "ábaco", "", "aB"]
+        self.text = "(12, 34)\n\nábaco\n\naB"
+
+    def test_bbox(self) -> None:
+        draw = ImageDraw.Draw(Image.new("RGB", (10, 10)))
+        self.assertEqual(self.text_cache.bbox(self.lines), draw.multiline_textbbox((0, 0), self.text, self.font))
+
+    def test_draw(self) -> None:
+        for xy in [(10, 20), (10.5, 20), (7.5, 13.5)]:
+            expected = Image.new("RGB", (120, 120), (200, 100, 50))
+            ImageDraw.Draw(expected).multiline_text(xy, self.text, fill=(0, 0, 0), font=self.font, align="center")
+            image = Image.new("RGB", (120, 120), (200, 100, 50))
+            self.text_cache.draw(ImageDraw.Draw(image), xy, self.lines, (0, 0, 0))
+            self.assertEqual(image.tobytes(), expected.tobytes())
+
+    def test_draw_translated(self) -> None:
+        image = Image.new("RGB", (120, 120), (200, 100, 50))
+        self.text_cache.draw(ImageDraw.Draw(image), (10.5, 60.5), self.lines, (0, 0, 0))
+        translated = Image.new("RGB", (120, 60), (200, 100, 50))
+        self.text_cache.draw(ImageDraw.Draw(translated), (10.5, 0.5), self.lines, (0, 0, 0))
+        self.assertEqual(translated.tobytes(), image.crop((0, 60, 120, 120)).tobytes())
+
+    def test_draw_returns_ink_box(self) -> None:
+        image = Image.new("L", (120, 120), 0)
+        ink = self.text_cache.draw(ImageDraw.Draw(image), (7.5, 13.5), self.lines, 255)
+        self.assertEqual(ink, image.getbbox())
+        self.assertIsNone(self.text_cache.draw(ImageDraw.Draw(image), (7.5, 13.5), ["", ""], 255))
+
+    def test_masks_are_reused(self) -> None:
+        draw = ImageDraw.Draw(Image.new("RGB", (120, 120)))
+        self.text_cache.draw(draw, (10, 20), self.lines, (0, 0, 0))
+        count = len(self.text_cache)
+        self.text_cache.draw(draw, (30, 40), self.lines, (255, 255, 255))
+        self.assertEqual(len(self.text_cache), count)
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
+
+
+class TestFontCache(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        cache.clear_font_cache()
+        self.font_path = util.get_fonts_directory("Code2003-W8nn.ttf")
+
+    def test_font_is_shared(self) -> None:
+        font = cache.load_font(self.font_path, 15)
+        self.assertIs(cache.load_font(str(self.font_path), 15), font)
+        self.assertEqual(font.size, 15)
+
+    def test_font_sizes(self) -> None:
+        self.assertIsNot(cache.load_font(self.font_path, 15), cache.load_font(self.font_path, 16))
+        self.assertEqual(cache.load_font(self.font_path, 16).size, 16)
+
+    def test_warm_fonts(self) -> None:
+        cache.warm_fonts(self.font_path, [12, 15])
+        with mock.patch.object(cache.ImageFont, "truetype") as truetype:
+            cache.load_font(self.font_path, 12)
+            cache.load_font(self.font_path, 15)
+            truetype.assert_not_called()
+
+    def test_clear_font_cache(self) -> None:
+        font = cache.load_font(self.font_path, 15)
+        cache.clear_font_cache()
+        self.assertIsNot(cache.load_font(self.font_path, 15), font)
+
+    def test_invalid_font(self) -> None:
+        with self.assertRaises(OSError):
+            cache.load_font(util.get_fonts_directory("no_exist.ttf"), 15)
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
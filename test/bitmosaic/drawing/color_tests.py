@@ -18,6 +18,7 @@
 import unittest
 import bitmosaic.drawing.color as color
 import bitmosaic.util as util
+from bitmosaic.exception import ValueException
 
 
 class TestHtmlColor(unittest.TestCase):
@@ -58,6 +59,27 @@ class TestHtmlColor(unittest.TestCase):
         self.assertIsNotNone(random_color)
         self.assertNotEqual(random_color.code, "None")
 
+    def test_tuple(self) -> None:
+        self.assertEqual(self.html_color_1.tuple(), (170, 187, 204))
+        self.assertEqual(color.HtmlColor("#aabbcc").tuple(), (170, 187, 204))
+
+    def test_packed(self) -> None:
+        self.assertEqual(self.html_color_1.packed().value, 0xAABBCCFF)
+        self.assertEqual(self.html_color_1.packed(), self.rgba_color_1.packed())
+
+    def test_hash(self) -> None:
+        self.assertEqual(hash(self.html_color_1), hash(self.html_color_2))
+        self.assertEqual(len({self.html_color_1, self.html_color_2, color.HtmlColor("#aabbcc")}), 1)
+
+    def test_contrasted_color_is_reused(self) -> None:
+        self.assertIs(self.html_color_0.contrasted_color(), self.html_color_0.contrasted_color())
+        self.assertEqual(color.HtmlColor("#FFFFFF").contrasted_color().code, "#FFFFFF")
+
+    def test_packed_contrast(self) -> None:
+        for code in ["#FF8080", "#FFFFFF", "#000000", self.html_color_0.code, self.html_color_1.code]:
+            html_color = color.HtmlColor(code)
+            self.assertEqual(html_color.packed().contrasted_rgb(), html_color.contrasted_color().tuple())
+
 
 class TesRgbaColor(unittest.TestCase):
     def setUp(self) -> None:
@@ -87,6 +109,73 @@ class TesRgbaColor(unittest.TestCase):
         random_color = color.RGBAColor.random()
         self.assertIsNotNone(random_color)
 
+    def test_alpha_equity(self) -> None:
+        self.assertNotEqual(self.rgba_color_2, color.RGBAColor(170, 187, 204, 128))
+
+    def test_hash(self) -> None:
+        self.assertEqual(len({self.rgba_color_1, self.rgba_color_2, self.rgba_color_3}), 1)
+
+    def test_contrasted_color_is_reused(self) -> None:
+        self.assertIs(self.rgba_color_0.contrasted_color(), self.rgba_color_0.contrasted_color())
+
+    def test_packed_contrast(self) -> None:
+        for rgba_color in [color.RGBAColor(255, 128, 128), self.rgba_color_0, self.rgba_color_1]:
+            self.assertEqual(rgba_color.packed().contrasted_rgb(), rgba_color.contrasted_color().tuple())
+
+    def test_tuple_does_not_pack(self) -> None:
+        self.assertEqual(self.rgba_color_1.tuple(), (170, 187, 204))
+        self.assertIsNone(self.rgba_color_1._packed)
+
+
+class TestPackedColor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.packed_color = color.PackedColor(0xAABBCC80)
+
+    def test_values(self) -> None:
+        self.assertEqual(self.packed_color.rgb, (170, 187, 204))
+        self.assertEqual(self.packed_color.a, 128)
+        self.assertEqual(self.packed_color.contrast, 0)
+        self.assertEqual(color.PackedColor(0x000000FF).contrasted_rgb(), (255, 255, 255))
+
+    def test_from_rgba(self) -> None:
+        self.assertEqual(color.PackedColor.from_rgba(170, 187, 204, 128), self.packed_color)
+        self.assertEqual(hash(color.PackedColor.from_rgba(170, 187, 204, 128)), hash(self.packed_color))
+
+    def test_conversions(self) -> None:
+        self.assertEqual(self.packed_color.html_color().code, "#AABBCC")
+        self.assertEqual(self.packed_color.rgba_color(), color.RGBAColor(170, 187, 204, 128))
+
+    def test_invalid_value(self) -> None:
+        with self.assertRaises(ValueException):
+            color.PackedColor(0x100000000)
+        with self.assertRaises(ValueException):
+            color.PackedColor(-1)
+
+    def test_immutable(self) -> None:
+        with self.assertRaises(AttributeError):
+            self.packed_color.value = 0
+
+    def test_contrast(self) -> None:
+        self.assertEqual(color.PackedColor(0xFF8080FF).contrast, 0)
+        self.assertEqual(color.PackedColor(0xFF8080FF, 255).contrast, 255)
+        self.assertEqual(color.PackedColor.from_rgba(255, 128, 128, contrast=255).contrasted_rgb(), (255, 255, 255))
+
+    def test_default_packed(self) -> None:
+        class GreyColor(color.Color):
+            r = g = b = 100
+
+            def contrasted_color(self):
+                return color.RGBAColor(255, 255, 255)
+
+            @classmethod
+            def random(cls):
+                return cls()
+
+            def tuple(self):
+                return self.r, self.g, self.b
+
+        self.assertEqual(GreyColor().packed(), color.PackedColor(0x646464FF))
+
 
 class TestPalette(unittest.TestCase):
     def setUp(self) -> None:
@@ -125,6 +214,22 @@ class TestPalette(unittest.TestCase):
         palette.remove_color(palette.colors[0])
         self.assertEqual(len(palette), palette_length - 1)
 
+    def test_add_duplicated_color(self) -> None:
+        palette = color.Palette()
+        palette.add_colors(["#00FF00", self.html_color, self.rgba_color, "#00ff00"])
+        self.assertEqual(len(palette), 1)
+        self.assertIn(self.rgba_color, palette)
+        self.assertIn("#0F0", palette)
+
+    def test_remove_color_keeps_order(self) -> None:
+        palette = color.Palette()
+        palette.add_colors(["#000000", "#00FF00", "#0000FF"])
+        palette.remove_color(self.rgba_color)
+        self.assertEqual([c.code for c in palette.colors], ["#000000", "#0000FF"])
+        self.assertNotIn(self.html_color, palette)
+        palette.remove_color(self.html_color)
+        self.assertEqual(len(palette), 2)
+
     def test_equal_similar_colors(self) -> None:
         self.assertEqual(self.rgba_similar_colors, self.html_similar_colors)
 
@@ -135,3 +240,59 @@ class TestPalette(unittest.TestCase):
     @classmethod
     def tearDown(cls):
         cls.disconnect()
+
+
+class TestColorRaster(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.raster = color.ColorRaster(cols=3, rows=2)
+
+    def test_set_color(self) -> None:
+        self.raster.set_color(4, color.HtmlColor("#AABBCC"))
+        self.assertEqual(self.raster.rgb(4), (170, 187, 204))
+        self.assertEqual(self.raster.contrasted_rgb(4), (0, 0, 0))
+        self.assertEqual(self.raster.color(4), color.RGBAColor(170, 187, 204))
+
+    def test_fill(self) -> None:
+        self.raster.fill(bytes([0, 0, 0, 255, 255, 255] * 3))
+        self.assertEqual(self.raster.rgb(0), (0, 0, 0))
+        self.assertEqual(self.raster.rgb(5), (255, 255, 255))
+        self.assertEqual(self.raster.contrasted_rgb(0), (255, 255, 255))
+        self.assertEqual(self.raster.contrasted_rgb(5), (0, 0, 0))
+
+    def test_fill_with_invalid_size(self) -> None:
+        with self.assertRaises(ValueException):
+            self.raster.fill(bytes(3))
+
+    def test_fill_indexed(self) -> None:
+        self.raster.fill_indexed(bytes([0, 1, 2, 2, 1, 0]), [(0, 0, 0), (255, 255, 255), (10, 20, 30)])
+        self.assertEqual(self.raster.rgb(1), (255, 255, 255))
+        self.assertEqual(self.raster.rgb(3), (10, 20, 30))
+        self.assertEqual(self.raster.contrasted_rgb(0), (255, 255, 255))
+        self.assertEqual(self.raster.contrasted_rgb(4), (0, 0, 0))
+        self.assertEqual(self.raster.indexes, bytearray([0, 1, 2, 2, 1, 0]))
+        self.assertEqual(self.raster.table[2], ((10, 20, 30), 255))
+
+    def test_fill_indexed_with_contrast_table(self) -> None:
+        self.raster.fill_indexed(bytes(6), [(10, 20, 30)], bytes([7]))
+        self.assertEqual(self.raster.contrasted_rgb(5), (7, 7, 7))
+
+    def test_fill_indexed_with_invalid_indexes(self) -> None:
+        with self.assertRaises(ValueException):
+            self.raster.fill_indexed(bytes(3), [(0, 0, 0)])
+        with self.assertRaises(ValueException):
+            self.raster.fill_indexed(bytes([0, 1, 2, 3, 0, 0]), [(0, 0, 0), (1, 1, 1)])
+
+    def test_fill_removes_indexes(self) -> None:
+        self.raster.fill_indexed(bytes(6), [(10, 20, 30)])
+        self.raster.set_color(0, color.HtmlColor("#AABBCC"))
+        self.assertIsNone(self.raster.indexes)
+        self.assertIsNone(self.raster.table)
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()
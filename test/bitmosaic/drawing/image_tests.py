@@ -17,12 +17,15 @@
 
 import unittest
 import os
+from PIL import Image, ImageChops
 import bitmosaic.drawing.image as bitmosaic_image
+from bitmosaic.drawing.image import Margin
 import bitmosaic.core.data_domain as data_domain
 import bitmosaic.core.filler as filler
 import bitmosaic.core.matrix as matrix
 import bitmosaic.core.mosaic as mosaic
 import bitmosaic.core.secret as secret
+import bitmosaic.drawing.color as color
 import bitmosaic.util as util
 
 
@@ -100,6 +103,83 @@ class TestHtmlColor(unittest.TestCase):
         file = util.get_output_directory("bitmosaic.png")
         self.assertTrue(os.path.exists(file))
 
+    def test_bitmosaic_draw_with_processes(self) -> None:
+        self.delete_output_files()
+        self.bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            expected = image.tobytes()
+        self.bitmosaic.processes = 3
+        self.bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            self.assertEqual(image.tobytes(), expected)
+
+    def test_bitmosaic_draw_streamed(self) -> None:
+        self.delete_output_files()
+        self.bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            expected = image.tobytes()
+        for processes in [1, 2]:
+            self.bitmosaic.stream_rows = 3
+            self.bitmosaic.processes = processes
+            self.bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+            with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+                self.assertEqual(image.size, (self.bitmosaic.width, self.bitmosaic.height))
+                self.assertEqual(image.tobytes(), expected)
+
+    def test_bitmosaic_with_many_colors_is_rgb(self) -> None:
+        self.delete_output_files()
+        self.bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            self.assertEqual(image.mode, "RGB")
+
+    def test_bitmosaic_with_palette_filler_is_palette_image(self) -> None:
+        palette_mosaic = mosaic.Mosaic(domain=self.domain,
+                                       color_filler=filler.PaletteFiller(cols=self.cols, rows=self.rows,
+                                                                         palette=color.Palette.sample()))
+        palette_mosaic.hide_secrets(vault=self.vault)
+        palette_bitmosaic = bitmosaic_image.Bitmosaic(mosaic=palette_mosaic)
+        self.delete_output_files()
+        palette_bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            self.assertEqual(image.mode, "P")
+        palette_bitmosaic.use_palette = False
+        palette_bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            self.assertEqual(image.mode, "RGB")
+
+    def test_bitmosaic_palette_image_has_exact_colors(self) -> None:
+        palette_mosaic = mosaic.Mosaic(domain=self.domain,
+                                       color_filler=filler.PaletteFiller(cols=self.cols, rows=self.rows,
+                                                                         palette=color.Palette.sample()))
+        palette_mosaic.hide_secrets(vault=self.vault)
+        palette_bitmosaic = bitmosaic_image.Bitmosaic(mosaic=palette_mosaic)
+        self.delete_output_files()
+        palette_bitmosaic.use_palette = False
+        palette_bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            expected = image.convert("RGB")
+        palette_bitmosaic.use_palette = True
+        palette_bitmosaic.save(bitmosaic_txt=False, recovery_txt=False, recovery_cards=False)
+        with Image.open(util.get_output_directory("bitmosaic.png")) as image:
+            self.assertEqual(image.mode, "P")
+            actual = image.convert("RGB")
+        # The first tessera, inside the frame, has its fill next to its border
+        side = palette_bitmosaic.tessera_side
+        fill = palette_mosaic.get_color(matrix.Point(0, 0)).tuple()
+        border = palette_bitmosaic.tessera_border_color.tuple()
+        x = Margin.left + palette_bitmosaic.border_correction + side
+        y = Margin.top + palette_bitmosaic.border_correction + 2 * side - 5
+        self.assertEqual(actual.getpixel((x + 5, y)), fill)
+        self.assertEqual(actual.getpixel((x - 1, y)), border)
+        # The fills, the borders and the full coverage text pixels are the same as in the rgb image
+        exact = {fill, border, (0, 0, 0), (255, 255, 255)}
+        total = expected.width * expected.height
+        self.assertTrue(exact <= {color_tuple for _, color_tuple in expected.getcolors(total)})
+        different = ImageChops.difference(expected, actual).convert("L").point(lambda value: 255 if value else 0)
+        under_differences = Image.new("RGB", expected.size, (1, 2, 3))
+        under_differences.paste(expected, mask=different)
+        self.assertFalse(exact & {color_tuple for _, color_tuple in under_differences.getcolors(total)})
+
     def test_save_bitmosaic_recovery_txt_files(self) -> None:
         self.delete_output_files()
         self.bitmosaic.save()
@@ -0,0 +1,106 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# png_tests.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import random
+import tempfile
+import unittest
+from PIL import Image
+import bitmosaic.drawing.png as png
+import bitmosaic.util as util
+from bitmosaic.exception import InvalidFormatException
+from bitmosaic.exception import ValueException
+
+
+class TestPNGWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "bitmosaic.png")
+        self.expected_path = os.path.join(self.directory.name, "expected.png")
+        generator = random.Random(7)
+        self.image = Image.frombytes("RGB", (97, 53), bytes(generator.randrange(256) for _ in range(97 * 53 * 3)))
+
+    def write_bands(self, image: Image, bands: list, chunk_size: int = 1 << 20):
+        with png.PNGWriter(self.file_path, image.width, image.height, mode=image.mode, dpi=(150, 150),
+                           chunk_size=chunk_size) as writer:
+            for top, bottom in bands:
+                writer.write(image.crop((0, top, image.width, bottom)))
+
+    def test_write(self) -> None:
+        self.write_bands(self.image, [(0, 10), (10, 11), (11, 53)], chunk_size=512)
+        with Image.open(self.file_path) as image:
+            self.assertEqual(image.mode, "RGB")
+            self.assertEqual(image.tobytes(), self.image.tobytes())
+
+    def test_write_modes(self) -> None:
+        for mode in ["L", "RGBA"]:
+            converted = self.image.convert(mode)
+            self.write_bands(converted, [(0, 20), (20, 53)])
+            with Image.open(self.file_path) as image:
+                self.assertEqual(image.mode, mode)
+                self.assertEqual(image.tobytes(), converted.tobytes())
+
+    def test_write_palette_image(self) -> None:
+        palette = [(255, 153, 0), (0, 0, 0), (255, 255, 255), (60, 60, 60)]
+        converted = self.image.quantize(palette=self.image.quantize(colors=4), dither=Image.NONE)
+        palette = [tuple(converted.getpalette()[index * 3:index * 3 + 3]) for index in range(4)]
+        with png.PNGWriter(self.file_path, 97, 53, mode="P", palette=palette) as writer:
+            writer.write(converted.crop((0, 0, 97, 30)))
+            writer.write(converted.crop((0, 30, 97, 53)))
+        with Image.open(self.file_path) as image:
+            self.assertEqual(image.mode, "P")
+            self.assertEqual(image.tobytes(), converted.tobytes())
+            self.assertEqual(image.convert("RGB").tobytes(), converted.convert("RGB").tobytes())
+
+    def test_invalid_palette(self) -> None:
+        with self.assertRaises(InvalidFormatException):
+            png.PNGWriter(self.file_path, 10, 10, mode="P")
+        with self.assertRaises(InvalidFormatException):
+            png.PNGWriter(self.file_path, 10, 10, mode="P", palette=[(0, 0, 0)] * 257)
+
+    def test_dpi(self) -> None:
+        self.write_bands(self.image, [(0, 53)])
+        self.image.save(self.expected_path, dpi=(150, 150))
+        with Image.open(self.file_path) as image, Image.open(self.expected_path) as expected:
+            self.assertEqual(image.info["dpi"], expected.info["dpi"])
+
+    def test_invalid_mode(self) -> None:
+        with self.assertRaises(InvalidFormatException):
+            png.PNGWriter(self.file_path, 10, 10, mode="CMYK")
+
+    def test_invalid_band(self) -> None:
+        with png.PNGWriter(self.file_path, 97, 53) as writer:
+            with self.assertRaises(ValueException):
+                writer.write(self.image.crop((0, 0, 50, 10)))
+            with self.assertRaises(ValueException):
+                writer.write(Image.new("RGB", (97, 54)))
+            writer.write(self.image)
+
+    def test_missing_rows(self) -> None:
+        writer = png.PNGWriter(self.file_path, 97, 53)
+        writer.write(self.image.crop((0, 0, 97, 10)))
+        with self.assertRaises(ValueException):
+            writer.close()
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.disconnect()
@@ -0,0 +1,128 @@
+# Copyright 2021 by @bitmosaic <bitmosaic@protonmail.com>
+#
+# render_tests.py is part of Bitmosaic.
+#
+# Bitmosaic is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Bitmosaic is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Bitmosaic.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+from PIL import ImageChops
+import bitmosaic.core.data_domain as data_domain
+import bitmosaic.core.filler as filler
+import bitmosaic.core.matrix as matrix
+import bitmosaic.core.mosaic as mosaic
+import bitmosaic.core.secret as secret
+import bitmosaic.drawing.color as color
+import bitmosaic.drawing.render as render
+import bitmosaic.util as util
+
+
+class TestBandRenderer(unittest.TestCase):
+    def setUp(self) -> None:
+        util.testing = True
+        domain = data_domain.Domain()
+        domain.add(data_domain.DictionaryDomain("bip-0039_spanish.txt"))
+        domain.generate_domain(total_items=6 * 5)
+        self.mosaic = mosaic.Mosaic(domain=domain,
+                                    color_filler=filler.PaletteFiller(cols=6, rows=5, palette=color.Palette.sample()))
+        vault = secret.Vault()
+        vault.add_secret(secret.Secret(name="Secret", data=["ábaco", "acción"], origin=matrix.Point(1, 1),
+                                       v2_components=matrix.V2Component.components_from_string("a:1 b:2")))
+        self.mosaic.hide_secrets(vault)
+        self.spec = render.RenderSpec(cols=6, rows=5, records=self.mosaic.matrix.records(), colors=self.mosaic.colors,
+                                      font_path=str(util.get_fonts_directory("Code2003-W8nn.ttf")), tessera_side=61)
+
+    def test_size(self) -> None:
+        self.assertEqual((self.spec.width, self.spec.height), (40 + 8 * 61 + 2, 40 + 7 * 61 + 2))
+        self.assertEqual(render.BandRenderer(self.spec).render(0, self.spec.height).size,
+                         (self.spec.width, self.spec.height))
+
+    def test_bands(self) -> None:
+        bands = self.spec.bands(3)
+        self.assertEqual(bands[0], (0, 3 * 61))
+        self.assertEqual(bands[-1][1], self.spec.height)
+        self.assertTrue(all(band[1] == next_band[0] for band, next_band in zip(bands, bands[1:])))
+
+    def test_band_is_part_of_the_image(self) -> None:
+        renderer = render.BandRenderer(self.spec)
+        image = renderer.render(0, self.spec.height)
+        for top, bottom in [(0, 50), (50, 97), (97, 250), (250, self.spec.height)]:
+            self.assertEqual(renderer.render(top, bottom).tobytes(),
+                             image.crop((0, top, self.spec.width, bottom)).tobytes())
+
+    def test_background_pass(self) -> None:
+        for tessera_border_width in [0, 1, 3]:
+            self.spec.tessera_border_width = tessera_border_width
+            self.spec.background_pass = True
+            image = render.BandRenderer(self.spec).render(50, 300)
+            self.spec.background_pass = False
+            self.assertEqual(image.tobytes(), render.BandRenderer(self.spec).render(50, 300).tobytes())
+
+    def test_background_pass_without_frame(self) -> None:
+        self.spec.framed = False
+        image = render.render_image(self.spec)
+        self.spec.background_pass = False
+        self.assertEqual(image.tobytes(), render.render_image(self.spec).tobytes())
+
+    def test_background_pass_with_overflowing_text(self) -> None:
+        # The long words overflow their tessera into the next ones, in the content and into the frame
+        for index in [0, 7, 8, 14, 29]:
+            self.spec.words[self.spec.word_data[index]] = "supercalifragilisticexpialidocious"
+        for framed in [True, False]:
+            self.spec.framed = framed
+            self.spec.background_pass = False
+            expected = render.render_image(self.spec)
+            self.spec.background_pass = True
+            self.assertEqual(render.render_image(self.spec).tobytes(), expected.tobytes())
+            self.assertEqual(render.BandRenderer(self.spec).render(97, 250).tobytes(),
+                             expected.crop((0, 97, self.spec.width, 250)).tobytes())
+
+    def test_bounded_palette(self) -> None:
+        palette = self.spec.bounded_palette()
+        self.assertLessEqual(len(palette), 256)
+        self.assertEqual(len(palette), len(set(palette)))
+        data = self.mosaic.colors.data
+        for index in range(len(self.mosaic.colors)):
+            self.assertIn(tuple(data[index * 3:index * 3 + 3]), palette)
+        for the_color in [self.spec.color, self.spec.tessera_border_color, self.spec.frame_color, (0, 0, 0)]:
+            self.assertIn(the_color, palette)
+
+    def test_bounded_palette_with_many_colors(self) -> None:
+        colors = color.ColorRaster(cols=6, rows=5)
+        colors.fill(bytes(value for index in range(30) for value in (index * 8, 0, 255 - index * 8)))
+        self.spec.colors = colors
+        self.assertIsNone(self.spec.bounded_palette(max_colors=20))
+        self.assertIsNotNone(self.spec.bounded_palette(max_colors=64))
+
+    def test_render_palette_image(self) -> None:
+        expected = render.render_image(self.spec)
+        self.spec.palette = self.spec.bounded_palette()
+        image = render.render_image(self.spec)
+        self.assertEqual(self.spec.output_mode, "P")
+        self.assertEqual(image.mode, "P")
+        # Only the antialiased text can take a near color
+        difference = ImageChops.difference(image.convert("RGB"), expected)
+        self.assertTrue(all(high <= 8 for _, high in difference.getextrema()))
+        self.assertEqual(render.render_image(self.spec, processes=2).tobytes(), image.tobytes())
+
+    def test_render_image_with_processes(self) -> None:
+        self.assertEqual(render.render_image(self.spec, processes=2).tobytes(),
+                         render.render_image(self.spec).tobytes())
+
+    @staticmethod
+    def disconnect():
+        util.testing = False
+
+    @classmethod
+    def tearDown(cls):
+        cls.disconnect()